@@ -0,0 +1,152 @@
+"""
+Контроль допуску запитів за класами маршрутів.
+
+Кожен клас (auth, read, write, llm, pdf) має власний ліміт одночасних запитів
+і обмежену чергу з дедлайном очікування (settings.admission_limits). Якщо черга
+повна або дедлайн минув — одразу 503 з Retry-After, а не зависання в threadpool.
+
+Сума лімітів за замовчуванням (40) не перевищує threadpool anyio, тож повільні
+LLM/PDF-запити не можуть зайняти потоки, потрібні дешевим читанням.
+
+Глибина черг, кількість активних і відкинутих запитів — у метриках Prometheus.
+"""
+import asyncio
+import json
+from collections import deque
+
+from app.core import metrics, request_context
+from app.core.config import settings
+
+AUTH, READ, WRITE, LLM, PDF = "auth", "read", "write", "llm", "pdf"
+
+LLM_ROUTES = {
+    "/ai/ask",
+    "/ai/generate-application",
+    "/benefits/{benefit_id}/explain",
+    "/cases/{case_id}/ask",
+}
+PDF_ROUTES = {
+    "/ai/generate-application-pdf",
+    "/cases/{case_id}/application/pdf",
+    "/cases/{case_id}/dossier.pdf",
+}
+# довгоживучі або службові: не займають місць
+EXEMPT_ROUTES = {"/", "/metrics", "/events/cases"}
+
+
+def classify(method: str, route: str) -> str | None:
+    if route in EXEMPT_ROUTES:
+        return None
+    if route in LLM_ROUTES:
+        return LLM
+    if route in PDF_ROUTES:
+        return PDF
+    if route.startswith("/auth/"):
+        return AUTH
+    if method in ("GET", "HEAD"):
+        return READ
+    return WRITE
+
+
+class ClassLimiter:
+    """Лічильник місць + FIFO-черга очікувачів (працює в одному event loop)."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def _publish(self) -> None:
+        metrics.ADMISSION_IN_FLIGHT.labels(self.name).set(self.active)
+        metrics.ADMISSION_QUEUE_DEPTH.labels(self.name).set(len(self._waiters))
+
+    async def acquire(self) -> str | None:
+        """None — місце отримано, інакше причина відмови."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._publish()
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self._publish()
+        try:
+            await asyncio.wait_for(fut, self.timeout)
+            return None  # місце передав release()
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return None  # release() встиг передати місце в момент таймауту
+            return "timeout"
+        except asyncio.CancelledError:
+            # клієнт пішов; якщо місце вже передали — віддаємо далі
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        finally:
+            if not fut.done() or fut.cancelled():
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            self._publish()
+
+    def release(self) -> None:
+        # місце переходить першому живому очікувачу, active не змінюється
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                self._publish()
+                return
+        self.active -= 1
+        self._publish()
+
+
+def _reject(reason: str, klass: str):
+    body = json.dumps({"detail": "Server is busy, please retry later"}).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(settings.admission_retry_after_seconds).encode()),
+        (b"x-shed-reason", f"{klass}:{reason}".encode()),
+    ]
+    return headers, body
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.limiters = {
+            name: ClassLimiter(name, *limits) for name, limits in settings.admission_limits.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        ctx = request_context.current()
+        route = ctx.route if ctx else metrics.route_template(scope["app"], scope)
+        klass = classify(scope["method"], route)
+        limiter = self.limiters.get(klass) if klass else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await limiter.acquire()
+        if reason is not None:
+            metrics.ADMISSION_SHED.labels(klass, reason).inc()
+            headers, body = _reject(reason, klass)
+            await send({"type": "http.response.start", "status": 503, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,242 @@
+"""
+Стиснення відповідей за Accept-Encoding: brotli, zstd (пакети brotli / zstandard
+з requirements.txt) або gzip.
+
+- стискаються лише текстові типи (JSON, text/*, …) від settings.compression_min_size
+  байт; PDF/JPEG/PNG, SSE (text/event-stream) і вже стиснуті відповіді йдуть як є;
+- відповідь одним шматком стискається цілком (з Content-Length), стрімінгова —
+  потоково, без буферизації;
+- для GET-маршрутів із CACHEABLE_ROUTES (каталог гарантій) стиснений варіант
+  кешується за хешем тіла: однакове тіло стискається один раз (з найкращим рівнем),
+  далі віддається з кешу.
+"""
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+
+import anyio
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core import metrics, request_context
+from app.core.config import settings
+
+GZIP, BROTLI, ZSTD = "gzip", "br", "zstd"
+
+# порядок — перевага сервера за однакового q у клієнта
+AVAILABLE = [BROTLI, ZSTD, GZIP]
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+}
+SKIP_TYPES = {"text/event-stream"}
+
+# відповіді, що рідко змінюються: стиснений варіант кешується за хешем тіла
+CACHEABLE_ROUTES = {"/benefits", "/benefits/{benefit_id}"}
+
+# більші тіла стискаються в threadpool, щоб не блокувати event loop
+_OFFLOAD_BYTES = 256 * 1024
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Найкраще доступне кодування з Accept-Encoding (з урахуванням q), або None."""
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for enc in AVAILABLE:
+        q = accepted.get(enc, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if not mime or mime in SKIP_TYPES:
+        return False
+    return mime.startswith("text/") or mime in COMPRESSIBLE_TYPES or mime.endswith("+json")
+
+
+# =======================
+# КОДЕКИ
+# =======================
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """Стиснення цілого тіла; best=True — максимальний рівень (для кешованих варіантів)."""
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=11 if best else settings.compression_brotli_quality)
+    if encoding == ZSTD:
+        level = 19 if best else settings.compression_zstd_level
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=9 if best else settings.compression_gzip_level, mtime=0)
+
+
+class _StreamEncoder:
+    """Потокове стиснення для відповідей з кількох шматків."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._obj = brotli.Compressor(quality=settings.compression_brotli_quality)
+        elif encoding == ZSTD:
+            self._obj = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+        else:
+            self._obj = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            # flush після кожного шматка — клієнт отримує дані одразу, як без стиснення
+            return self._obj.process(data) + self._obj.flush()
+        if self.encoding == ZSTD:
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+class VariantCache:
+    """LRU стиснених варіантів: (кодування, хеш тіла) -> байти."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: tuple[str, bytes], value: bytes) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+
+# =======================
+# MIDDLEWARE
+# =======================
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.cache = VariantCache(settings.compression_cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.compression_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        ctx = request_context.current()
+        route = ctx.route if ctx else metrics.route_template(scope["app"], scope)
+        cacheable = scope["method"] == "GET" and route in CACHEABLE_ROUTES
+
+        start: dict | None = None
+        mode = None  # None — ще не вирішили, "plain" — як є, "stream" — потокове стиснення
+        encoder: _StreamEncoder | None = None
+
+        async def send_wrapper(message):
+            nonlocal start, mode, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or mode == "plain":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if mode == "stream":
+                data = encoder.chunk(body) if body else b""
+                if not more_body:
+                    data += encoder.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                start["status"] < 200
+                or start["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < settings.compression_min_size)
+            ):
+                mode = "plain"
+                if is_compressible(headers.get("content-type", "")):
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if more_body:
+                mode = "stream"
+                encoder = _StreamEncoder(encoding)
+                del headers["Content-Length"]
+                await send(start)
+                start = None
+                await send({"type": "http.response.body", "body": encoder.chunk(body), "more_body": True})
+                return
+
+            compressed = await self._compress_whole(body, encoding, cacheable)
+            metrics.COMPRESSION_BYTES.labels(encoding, "in").inc(len(body))
+            metrics.COMPRESSION_BYTES.labels(encoding, "out").inc(len(compressed))
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress_whole(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        key = None
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.COMPRESSION_CACHE.labels("hit").inc()
+                return cached
+            metrics.COMPRESSION_CACHE.labels("miss").inc()
+
+        if len(body) >= _OFFLOAD_BYTES or cacheable:
+            compressed = await anyio.to_thread.run_sync(compress, body, encoding, cacheable)
+        else:
+            compressed = compress(body, encoding)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
@@ -6,4 +6,96 @@ class Settings(BaseModel):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24h
 
+    # квоти на файли (рахуються по лічильниках у storage_usage)
+    user_storage_quota_bytes: int = 200 * 1024 * 1024  # 200 MB на користувача
+    case_storage_quota_bytes: int = 50 * 1024 * 1024   # 50 MB на справу
+
+    # GC завантажень: скільки справ перевіряти за один прохід і як часто
+    storage_gc_interval_seconds: int = 300
+    storage_gc_batch_size: int = 50
+    storage_gc_grace_seconds: int = 60 * 60  # не чіпаємо свіжі файли (upload ще може комітитись)
+
+    # скільки процесів збирають PDF-досьє справ
+    dossier_workers: int = 2
+
+    # стрічка змін справ (SSE): "local" — лише в межах процесу, "redis" — між воркерами
+    events_broker: str = "local"
+    events_redis_url: str = "redis://localhost:6379/0"
+    events_redis_channel: str = "veteran-aid:case-events"
+    events_queue_size: int = 100
+    events_keepalive_seconds: int = 15
+
+    # черга модерації: на скільки модератор "бере" документи і скільки максимум за раз
+    moderation_lease_seconds: int = 10 * 60
+    moderation_max_claim: int = 50
+
+    # журнал повільних SQL і детектор N+1 (однаковий запит > K разів за HTTP-запит)
+    slow_query_ms: int = 200
+    slow_query_log_params: bool = True
+    n_plus_one_threshold: int = 5
+    n_plus_one_strict: bool = False  # True — кидати NPlusOneError (для тестів/dev)
+
+    # профілювання запиту адміном (X-Profile: 1 або ?profile=1) і знімки пам'яті
+    profiler_interval_ms: int = 5
+    profiler_max_seconds: int = 60
+    profiler_keep: int = 50
+    tracemalloc_frames: int = 10
+
+    # локальні трейси: "memory" (буфер, GET /admin/traces), "jsonl" (файл) або "none"
+    tracing_exporter: str = "memory"
+    tracing_buffer_size: int = 5000
+    tracing_jsonl_path: str = "traces.jsonl"
+
+    # контроль допуску: клас маршруту -> (одночасно, місць у черзі, очікування в черзі, с)
+    # сума лімітів не більша за threadpool anyio (40), щоб LLM/PDF не витісняли читання
+    admission_enabled: bool = True
+    admission_limits: dict[str, tuple[int, int, float]] = {
+        "auth": (4, 32, 5.0),
+        "read": (16, 128, 2.0),
+        "write": (8, 64, 5.0),
+        "llm": (8, 16, 10.0),
+        "pdf": (4, 8, 10.0),
+    }
+    admission_retry_after_seconds: int = 5
+
+    # LLM: таймаут одного виклику і загальний бюджет HTTP-запиту (дедлайн = менше з двох)
+    llm_timeout_seconds: float = 20.0
+    llm_request_budget_seconds: float = 30.0
+    llm_min_call_seconds: float = 1.0  # якщо від бюджету лишилось менше — не кличемо модель
+    # запобіжник: вікно останніх викликів; відкривається, коли частка збоїв/повільних >= ratio
+    llm_breaker_window: int = 20
+    llm_breaker_min_calls: int = 5
+    llm_breaker_failure_ratio: float = 0.5
+    llm_breaker_slow_seconds: float = 10.0
+    llm_breaker_open_seconds: float = 30.0
+    # скільки останніх успішних відповідей тримати для деградованого режиму
+    llm_fallback_cache_size: int = 500
+
+    # Idempotency-Key: скільки зберігати відповідь, скільки дублікат чекає на перший запит
+    # (далі 409 з Retry-After) і через скільки "завислий" перший запит може підхопити повтор
+    idempotency_ttl_hours: int = 24
+    idempotency_wait_seconds: float = 5.0
+    idempotency_lock_seconds: int = 120
+
+    # стиснення відповідей (brotli / zstd / gzip за Accept-Encoding)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    compression_zstd_level: int = 3
+    compression_cache_size: int = 64  # стиснених варіантів кешованих маршрутів (каталог гарантій)
+
+    # архів закритих справ (done / rejected): через скільки днів без змін переносити
+    # (0 — не архівувати), як часто запускати перенос, розмір порції і пауза між порціями
+    archive_after_days: int = 180
+    archive_interval_seconds: int = 60 * 60
+    archive_batch_size: int = 200
+    archive_pause_seconds: float = 0.1
+
+    # міграції: скільки DDL чекає на блокування таблиці (Postgres), розмір порції backfill
+    # і пауза між порціями, щоб перенесення даних не витісняло робоче навантаження
+    migration_lock_timeout_seconds: int = 5
+    backfill_batch_size: int = 5000
+    backfill_pause_seconds: float = 0.05
+
 settings = Settings()
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
@@ -8,12 +8,9 @@ from app.db.session import get_db
 from app.models.user import User
 
 bearer_scheme = HTTPBearer()
+optional_bearer_scheme = HTTPBearer(auto_error=False)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-) -> User:
-    token = creds.credentials
+def user_from_token(db: Session, token: str) -> User:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         user_id = int(payload.get("sub"))
@@ -25,6 +22,23 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> User:
+    return user_from_token(db, creds.credentials)
+
+def get_current_user_token_or_query(
+    db: Session = Depends(get_db),
+    creds: HTTPAuthorizationCredentials | None = Depends(optional_bearer_scheme),
+    token: str | None = Query(default=None),
+) -> User:
+    # EventSource у браузері не вміє слати заголовки — дозволяємо ?token=
+    raw = creds.credentials if creds else token
+    if not raw:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return user_from_token(db, raw)
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
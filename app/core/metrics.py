@@ -0,0 +1,244 @@
+"""
+Метрики Prometheus (GET /metrics).
+
+- HTTP: латентність по шаблону маршруту ("/cases/{case_id}"), запити в обробці;
+- БД: кількість і сумарний час SQL-запитів на HTTP-запит (хуки engine);
+- LLM: латентність generate_text, помилки, розміри промпту/відповіді, стан
+  запобіжника і кількість деградованих відповідей;
+- PDF: час рендеру application_text_to_pdf_bytes і розмір результату;
+- стиснення відповідей: байти до/після і влучання в кеш стиснених варіантів.
+
+Для кількох воркерів uvicorn задайте PROMETHEUS_MULTIPROC_DIR — тоді /metrics
+збирає значення з усіх процесів.
+"""
+import functools
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from app.core import request_context
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_SIZE_BUCKETS = (100, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 500_000)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ("method", "route"),
+    multiprocess_mode="livesum",
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Single SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Number of SQL statements per HTTP request",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total SQL time per HTTP request",
+    ("method", "route"),
+    buckets=_LATENCY_BUCKETS,
+)
+
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "generate_text latency",
+    ("outcome",),
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+LLM_ERRORS = Counter("llm_errors_total", "generate_text failures", ("error",))
+LLM_PROMPT_CHARS = Histogram("llm_prompt_chars", "Prompt size in characters", buckets=_SIZE_BUCKETS)
+LLM_RESPONSE_CHARS = Histogram("llm_response_chars", "Response size in characters", buckets=_SIZE_BUCKETS)
+LLM_CIRCUIT_STATE = Gauge(
+    "llm_circuit_state",
+    "LLM circuit breaker state: 0 closed, 1 half-open, 2 open",
+    multiprocess_mode="max",
+)
+LLM_CIRCUIT_TRANSITIONS = Counter("llm_circuit_transitions_total", "Breaker state changes", ("state",))
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "Degraded answers served instead of the LLM", ("source",))
+
+PDF_RENDER_LATENCY = Histogram(
+    "pdf_render_duration_seconds",
+    "application_text_to_pdf_bytes render time",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PDF_SIZE_BYTES = Histogram(
+    "pdf_size_bytes",
+    "Rendered application PDF size",
+    buckets=(5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000),
+)
+
+COMPRESSION_BYTES = Counter(
+    "compression_bytes_total",
+    "Response bytes before (in) and after (out) compression",
+    ("encoding", "direction"),
+)
+COMPRESSION_CACHE = Counter("compression_cache_total", "Precompressed variant cache lookups", ("result",))
+
+CASES_ARCHIVED = Counter("cases_archived_total", "Closed cases moved to the archive tables")
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Requests admitted and running, by route class",
+    ("route_class",),
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for a slot, by route class",
+    ("route_class",),
+    multiprocess_mode="livesum",
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 by admission control",
+    ("route_class", "reason"),
+)
+
+
+# =======================
+# HTTP
+# =======================
+def route_template(app, scope: dict) -> str:
+    """Шаблон маршруту замість сирого шляху, щоб не роздувати кардинальність міток."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Чиста ASGI-middleware: не буферизує відповідь, тож працює і з SSE/стрімінгом."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope["app"], scope)
+        method = scope["method"]
+        ctx, token = request_context.start(scope, route)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers") or [])
+                headers.append((request_context.REQUEST_ID_HEADER.encode(), ctx.request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.labels(method, route, str(status["code"])).observe(time.perf_counter() - started)
+            DB_QUERIES_PER_REQUEST.labels(method, route).observe(ctx.db_queries)
+            DB_TIME_PER_REQUEST.labels(method, route).observe(ctx.db_time)
+            in_flight.dec()
+            request_context.reset(token)
+
+
+def render() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# =======================
+# БД
+# =======================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_LATENCY.observe(elapsed)
+    ctx = request_context.current()
+    if ctx is not None:
+        ctx.db_queries += 1
+        ctx.db_time += elapsed
+
+
+def install_engine_hooks(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_engine_hooks(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =======================
+# LLM / PDF
+# =======================
+def instrument_llm(fn):
+    @functools.wraps(fn)
+    def wrapper(prompt: str, *args, **kwargs):
+        LLM_PROMPT_CHARS.observe(len(prompt or ""))
+        started = time.perf_counter()
+        try:
+            result = fn(prompt, *args, **kwargs)
+        except Exception as e:
+            LLM_LATENCY.labels("error").observe(time.perf_counter() - started)
+            LLM_ERRORS.labels(type(e).__name__).inc()
+            raise
+        LLM_LATENCY.labels("ok").observe(time.perf_counter() - started)
+        LLM_RESPONSE_CHARS.observe(len(result or ""))
+        return result
+
+    return wrapper
+
+
+def instrument_pdf(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        PDF_RENDER_LATENCY.observe(time.perf_counter() - started)
+        PDF_SIZE_BYTES.observe(len(result))
+        return result
+
+    return wrapper
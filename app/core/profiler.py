@@ -0,0 +1,303 @@
+"""
+Профілювання окремого запиту на вимогу адміна.
+
+Запит із заголовком "X-Profile: 1" або параметром ?profile=1 від адміна виконується
+під семплюючим профайлером. Спершу без БД перевіряється JWT і claim role=admin —
+запити інших користувачів не відкривають сесію; для admin роль підтверджується
+через require_admin. Результат у форматі speedscope (https://www.speedscope.app)
+зберігається як <profile_id>.speedscope.json, де profile_id генерує сервер
+(X-Request-ID задає клієнт, тож ним не можна перезаписати чужий профіль);
+id повертається в заголовку X-Profile-Id, забрати — GET /admin/profiles/{profile_id}.
+
+Семплер читає стеки через sys._current_frames(), тож бачить і потоки threadpool,
+де виконуються sync-хендлери. Простої (очікування в threading/selectors/queue)
+відкидаються; на завантаженому воркері в профіль можуть потрапити й сусідні запити.
+
+Для інших користувачів прапорець мовчки ігнорується.
+"""
+import json
+import logging
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core import request_context
+from app.core.config import settings
+from app.core.deps import require_admin, user_from_token
+from app.db.session import SessionLocal
+from app.services.storage_service import UPLOADS_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = UPLOADS_DIR / "_profiles"
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "thread.py")
+
+
+# =======================
+# СЕМПЛЕР
+# =======================
+class SamplingProfiler:
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._frames: list[dict] = []
+        self._frame_index: dict[tuple, int] = {}
+        # thread id -> (назва, [стек індексів], [ваги])
+        self._samples: dict[int, tuple[str, list, list]] = {}
+        self.started = 0.0
+        self.ended = 0.0
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        idx = self._frame_index.get(key)
+        if idx is None:
+            idx = len(self._frames)
+            self._frame_index[key] = idx
+            self._frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return idx
+
+    def _sample(self, own_ident: int, names: dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            entry = self._samples.get(ident)
+            if entry is None:
+                entry = self._samples[ident] = (names.get(ident, str(ident)), [], [])
+            entry[1].append(stack)
+            entry[2].append(self.interval)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        deadline = self.started + self.max_seconds
+        while True:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample(own, names)
+            if self._stop.wait(self.interval) or time.perf_counter() >= deadline:
+                break
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.ended = time.perf_counter()
+
+    def speedscope(self, name: str) -> dict:
+        duration = self.ended - self.started
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "veteran-aid",
+            "shared": {"frames": self._frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": duration,
+                    "samples": stacks,
+                    "weights": weights,
+                }
+                for thread_name, stacks, weights in self._samples.values()
+            ],
+        }
+
+
+# =======================
+# ЗБЕРІГАННЯ
+# =======================
+def new_profile_id() -> str:
+    # час — для впорядкування, випадкова частина — щоб id не можна було вгадати чи повторити
+    return f"{time.time_ns()}-{secrets.token_hex(4)}"
+
+
+def safe_id(profile_id: str) -> str:
+    # id приходить у шляху GET /admin/profiles/{profile_id} — в ім'я файлу лише безпечні символи
+    return "".join(ch for ch in profile_id if ch.isalnum() or ch in "-_")[:64]
+
+
+def profile_path(profile_id: str) -> Path:
+    return PROFILES_DIR / f"{safe_id(profile_id)}.speedscope.json"
+
+
+def save_profile(profile_id: str, data: dict) -> Path:
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    path = profile_path(profile_id)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    # зберігаємо лише останні settings.profiler_keep профілів
+    files = sorted(PROFILES_DIR.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[settings.profiler_keep:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles() -> list[dict]:
+    if not PROFILES_DIR.exists():
+        return []
+    files = sorted(PROFILES_DIR.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            "profile_id": p.name.removesuffix(".speedscope.json"),
+            "size_bytes": p.stat().st_size,
+            "created_at": p.stat().st_mtime,
+        }
+        for p in files
+    ]
+
+
+# =======================
+# MIDDLEWARE
+# =======================
+def _wants_profile(scope: dict) -> bool:
+    for name, value in scope.get("headers") or ():
+        if name == PROFILE_HEADER.encode() and value not in (b"", b"0", b"false"):
+            return True
+    flag = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile")
+    return bool(flag) and flag[-1] not in ("", "0", "false")
+
+
+def _bearer_token(scope: dict) -> str | None:
+    for name, value in scope.get("headers") or ():
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+    return None
+
+
+def _claims_admin(token: str) -> bool:
+    # без БД: невалідний/прострочений токен або не-admin — одразу відмова
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return False
+    return payload.get("role") == "admin"
+
+
+def _is_admin(token: str) -> bool:
+    # роль у токені могли вже відкликати — підтверджуємо за users.role
+    db = SessionLocal()
+    try:
+        require_admin(user_from_token(db, token))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        token = _bearer_token(scope)
+        if not token or not _claims_admin(token) or not await run_in_threadpool(_is_admin, token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        ctx = request_context.current()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((PROFILE_ID_HEADER.encode(), profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = SamplingProfiler(
+            interval=settings.profiler_interval_ms / 1000,
+            max_seconds=settings.profiler_max_seconds,
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            request_id = ctx.request_id if ctx else "-"
+            name = f"{scope['method']} {scope['path']} (request {request_id})"
+            try:
+                await run_in_threadpool(save_profile, profile_id, profiler.speedscope(name))
+            except OSError:
+                logger.warning("Could not save request profile %s", profile_id, exc_info=True)
+
+
+# =======================
+# ПАМ'ЯТЬ (tracemalloc)
+# =======================
+_last_snapshot: tracemalloc.Snapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def memory_snapshot(top: int) -> dict:
+    """
+    Топ алокацій за рядками коду і приріст відносно попереднього знімка.
+    Перший виклик вмикає tracemalloc (має накладні витрати — вимкнути через stop_memory_tracing).
+    """
+    global _last_snapshot
+    with _snapshot_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.tracemalloc_frames)
+            _last_snapshot = None
+            return {"tracing": True, "started": True, "top": [], "growth": []}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        top_stats = [
+            {"where": str(s.traceback), "size_bytes": s.size, "count": s.count}
+            for s in snapshot.statistics("lineno")[:top]
+        ]
+        growth = []
+        if _last_snapshot is not None:
+            growth = [
+                {"where": str(s.traceback), "size_diff_bytes": s.size_diff, "count_diff": s.count_diff}
+                for s in snapshot.compare_to(_last_snapshot, "lineno")[:top]
+                if s.size_diff
+            ]
+        _last_snapshot = snapshot
+        return {
+            "tracing": True,
+            "started": False,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": top_stats,
+            "growth": growth,
+        }
+
+
+def stop_memory_tracing() -> None:
+    global _last_snapshot
+    with _snapshot_lock:
+        tracemalloc.stop()
+        _last_snapshot = None
@@ -0,0 +1,97 @@
+"""
+Журнал повільних SQL-запитів і детектор N+1.
+
+Хуки engine (before/after_cursor_execute):
+- запит довший за settings.slow_query_ms пишеться в лог з маршрутом, request id і параметрами;
+- у межах HTTP-запиту кожен SQL зводиться до відбитка (літерали й списки IN прибрано);
+  якщо той самий відбиток виконано більше ніж settings.n_plus_one_threshold разів —
+  попередження в лог (один раз на відбиток), а в strict-режимі — NPlusOneError.
+
+Вартість на запит — регулярка над текстом SQL і інкремент у dict, тож хуки можна
+лишати увімкненими і в продакшені.
+"""
+import logging
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import request_context
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_MAX_LOGGED_CHARS = 1000
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+def fingerprint(statement: str) -> str:
+    """Нормалізований текст SQL: однакові запити з різними значеннями дають один відбиток."""
+    s = _STRING.sub("?", statement)
+    s = _NUMBER.sub("?", s)
+    s = _POSTCOMPILE.sub("(?+)", s)
+    s = _IN_LIST.sub("(?+)", s)
+    return _SPACES.sub(" ", s).strip()
+
+
+def _short(value) -> str:
+    text = str(value)
+    return text if len(text) <= _MAX_LOGGED_CHARS else text[:_MAX_LOGGED_CHARS] + "…"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._inspector_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_inspector_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    ctx = request_context.current()
+
+    if elapsed_ms >= settings.slow_query_ms:
+        logger.warning(
+            "slow query %.1f ms route=%s request_id=%s sql=%s params=%s",
+            elapsed_ms,
+            f"{ctx.method} {ctx.route}" if ctx else "-",
+            ctx.request_id if ctx else "-",
+            _short(statement),
+            _short(parameters) if settings.slow_query_log_params else "<hidden>",
+        )
+
+    # executemany — вже пакетний запис, не N+1
+    if ctx is None or executemany:
+        return
+    fp = fingerprint(statement)
+    n = ctx.query_fingerprints.get(fp, 0) + 1
+    ctx.query_fingerprints[fp] = n
+    if n == settings.n_plus_one_threshold + 1:
+        msg = (
+            f"possible N+1: same query ran {n}+ times in {ctx.method} {ctx.route} "
+            f"(request_id={ctx.request_id}): {_short(fp)}"
+        )
+        if settings.n_plus_one_strict:
+            raise NPlusOneError(msg)
+        logger.warning(msg)
+
+
+def install_engine_hooks(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_engine_hooks(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,51 @@
+"""
+Контекст поточного HTTP-запиту (request id, маршрут, лічильники БД).
+
+Зберігається в ContextVar: sync-хендлери й залежності виконуються в threadpool
+з копією контексту, тому бачать той самий об'єкт і можуть його доповнювати.
+"""
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+@dataclass(eq=False)
+class RequestContext:
+    request_id: str
+    method: str
+    route: str
+    # time.monotonic() на вході — від нього рахується бюджет часу запиту (дедлайн LLM)
+    started: float = field(default_factory=time.monotonic)
+    db_queries: int = 0
+    db_time: float = 0.0
+    # відбиток SQL -> скільки разів виконано в цьому запиті (детектор N+1)
+    query_fingerprints: dict[str, int] = field(default_factory=dict)
+
+
+_current: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def current() -> RequestContext | None:
+    return _current.get()
+
+
+def start(scope: dict, route: str) -> tuple[RequestContext, object]:
+    """Створює контекст для ASGI-запиту; повертає (контекст, токен для reset)."""
+    incoming = None
+    for name, value in scope.get("headers") or ():
+        if name == REQUEST_ID_HEADER.encode():
+            incoming = value.decode("latin-1")[:64]
+            break
+    ctx = RequestContext(
+        request_id=incoming or uuid.uuid4().hex,
+        method=scope.get("method", ""),
+        route=route,
+    )
+    return ctx, _current.set(ctx)
+
+
+def reset(token) -> None:
+    _current.reset(token)
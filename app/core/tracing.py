@@ -0,0 +1,321 @@
+"""
+Локальний трейсинг запитів (спани у форматі, сумісному з OpenTelemetry/OTLP JSON).
+
+Кореневий спан створює TracingMiddleware (маршрут, статус, request id), дочірні —
+SQL-запити (хуки engine), generate_text, розбір і верстка PDF, файловий I/O.
+Поза HTTP-запитом (фонові задачі, воркер досьє) спани не пишуться.
+
+Експортер без зовнішнього колектора (settings.tracing_exporter):
+- "memory" — кільцевий буфер останніх спанів, GET /admin/traces;
+- "jsonl"  — по рядку JSON на спан у settings.tracing_jsonl_path;
+- "none"   — вимкнено.
+
+Вхідний заголовок W3C traceparent підхоплюється, тож ідентифікатори можна
+зіставити з трейсами фронтенду чи проксі.
+"""
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi.responses import FileResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import request_context
+from app.core.config import settings
+
+_MAX_STATEMENT_CHARS = 2000
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass(eq=False)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    kind: str = "INTERNAL"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    status: str = "UNSET"
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"[:500]
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+        }
+
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+# =======================
+# ЕКСПОРТЕРИ
+# =======================
+class MemoryExporter:
+    def __init__(self, size: int):
+        self._spans: deque[dict] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span.to_dict())
+
+    def spans(self) -> list[dict]:
+        with self._lock:
+            return list(self._spans)
+
+
+class JsonlExporter:
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self._path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def spans(self) -> list[dict]:
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                tail = deque(f, maxlen=settings.tracing_buffer_size)
+        except FileNotFoundError:
+            return []
+        return [json.loads(line) for line in tail]
+
+
+exporter: MemoryExporter | JsonlExporter | None = None
+
+
+def configure() -> None:
+    global exporter
+    if settings.tracing_exporter == "memory":
+        exporter = MemoryExporter(settings.tracing_buffer_size)
+    elif settings.tracing_exporter == "jsonl":
+        exporter = JsonlExporter(settings.tracing_jsonl_path)
+    else:
+        exporter = None
+
+
+def _export(span: Span) -> None:
+    if exporter is not None:
+        exporter.export(span)
+
+
+# =======================
+# API СПАНІВ
+# =======================
+def start_span(name: str, kind: str = "INTERNAL", attributes: dict | None = None) -> Span | None:
+    """Дочірній спан поточного; None, якщо трейсинг вимкнено або немає кореневого спану."""
+    parent = _current.get()
+    if exporter is None or parent is None:
+        return None
+    return Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=_new_id(8),
+        parent_span_id=parent.span_id,
+        kind=kind,
+        attributes=dict(attributes or {}),
+    )
+
+
+def end_span(span: Span | None) -> None:
+    if span is None:
+        return
+    span.end_ns = time.time_ns()
+    if span.status == "UNSET":
+        span.status = "OK"
+    _export(span)
+
+
+@contextmanager
+def span(name: str, kind: str = "INTERNAL", **attributes):
+    s = start_span(name, kind, attributes)
+    if s is None:
+        yield None
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        end_span(s)
+
+
+def traced(name: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# =======================
+# HTTP (кореневий спан)
+# =======================
+def _parent_from_headers(scope: dict) -> tuple[str | None, str | None]:
+    for name, value in scope.get("headers") or ():
+        if name == b"traceparent":
+            m = _TRACEPARENT.match(value.decode("latin-1").strip().lower())
+            if m:
+                return m.group(1), m.group(2)
+    return None, None
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        ctx = request_context.current()
+        route = ctx.route if ctx else scope["path"]
+        trace_id, parent_id = _parent_from_headers(scope)
+        root = Span(
+            name=f"{scope['method']} {route}",
+            trace_id=trace_id or _new_id(16),
+            span_id=_new_id(8),
+            parent_span_id=parent_id,
+            kind="SERVER",
+            attributes={
+                "http.method": scope["method"],
+                "http.route": route,
+                "http.target": scope["path"],
+                "request.id": ctx.request_id if ctx else "",
+            },
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "ERROR"
+                headers = list(message.get("headers") or [])
+                headers.append((b"traceparent", f"00-{root.trace_id}-{root.span_id}-01".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.set_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            end_span(root)
+
+
+# =======================
+# SQL
+# =======================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    s = start_span("db.query", "CLIENT", {
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:_MAX_STATEMENT_CHARS],
+        "db.executemany": bool(executemany),
+    })
+    if s is not None and context is not None:
+        context._trace_span = s
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    s = getattr(context, "_trace_span", None)
+    if s is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            s.set_attribute("db.rowcount", cursor.rowcount)
+        end_span(s)
+        context._trace_span = None
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    s = getattr(context, "_trace_span", None)
+    if s is not None:
+        s.set_error(exception_context.original_exception)
+        end_span(s)
+        context._trace_span = None
+
+
+def install_engine_hooks(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def remove_engine_hooks(engine: Engine) -> None:
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+    event.remove(engine, "handle_error", _handle_error)
+
+
+# =======================
+# ФАЙЛИ
+# =======================
+class TracedFileResponse(FileResponse):
+    """FileResponse зі спаном file.read навколо віддачі файлу клієнту."""
+
+    async def __call__(self, scope, receive, send):
+        with span("file.read", **{"file.path": str(self.path)}):
+            await super().__call__(scope, receive, send)
+
+
+def recent_traces(limit: int) -> list[dict]:
+    """Кореневі спани останніх трейсів (нові першими)."""
+    if exporter is None:
+        return []
+    roots = [s for s in exporter.spans() if s["kind"] == "SPAN_KIND_SERVER"]
+    return roots[::-1][:limit]
+
+
+def trace_spans(trace_id: str) -> list[dict]:
+    if exporter is None:
+        return []
+    return sorted(
+        (s for s in exporter.spans() if s["traceId"] == trace_id),
+        key=lambda s: s["startTimeUnixNano"],
+    )
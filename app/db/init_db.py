@@ -0,0 +1,59 @@
+"""
+Створення схеми і початкові дані — явною командою (manage.py), а не при імпорті
+app.main: воркери й тести стартують без звернень до БД.
+"""
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+
+# ВАЖЛИВО: імпортуємо всі моделі, щоб Base “побачив” таблиці
+from app.models import (  # noqa: F401
+    benefit, case, case_archive, case_artifact, case_document, case_history, case_stat, idempotency_key,
+    job_cursor, schema_version, storage_usage, user,
+)
+from app.models.benefit import Benefit
+
+DEFAULT_BENEFITS = [
+    dict(
+        title="Компенсація за житлово-комунальні послуги",
+        category="housing",
+        description="Пільги/компенсації на оплату ЖКП для визначених категорій.",
+        authority="Органи соцзахисту / ЦНАП",
+        required_documents="Паспорт\nІПН\nПідтвердження статусу\nЗаява",
+        eligible_statuses="veteran,ubd,family,disabled",
+    ),
+    dict(
+        title="Одноразова грошова допомога (приклад)",
+        category="payments",
+        description="Приклад виплати за певних умов (для демонстрації).",
+        authority="Соцзахист / ЦНАП",
+        required_documents="Паспорт\nІПН\nДокумент про статус\nРеквізити IBAN\nЗаява",
+        eligible_statuses="veteran,ubd",
+    ),
+    dict(
+        title="Пільги на медичні послуги (приклад)",
+        category="medical",
+        description="Пріоритет/пільгові умови отримання медичних послуг (демо).",
+        authority="Медзаклад / сімейний лікар / НСЗУ",
+        required_documents="Паспорт\nПідтвердження статусу",
+        eligible_statuses="veteran,ubd,disabled",
+    ),
+]
+
+
+def create_schema(engine: Engine) -> None:
+    """Таблиці моделей + повнотекстовий індекс справ (ідемпотентно)."""
+    from app.services import case_search
+
+    Base.metadata.create_all(bind=engine)
+    case_search.ensure_index(engine)
+
+
+def seed_benefits(db: Session) -> int:
+    """Кілька гарантій для порожньої БД; повертає кількість доданих."""
+    if db.query(Benefit).count() > 0:
+        return 0
+    db.add_all([Benefit(**data) for data in DEFAULT_BENEFITS])
+    db.commit()
+    return len(DEFAULT_BENEFITS)
@@ -0,0 +1,18 @@
+"""
+Версіоновані міграції схеми (SQLite і Postgres).
+
+    python manage.py migrate            # застосувати всі нові
+    python manage.py migrate --status   # поточна версія і що не застосовано
+
+Міграції — функції з versions.py під декоратором @migration(N, "назва"), застосовуються
+за зростанням N; застосовані записуються в schema_version. Кожна міграція ідемпотентна
+(ops.add_column / ops.create_index перевіряють, чи є вже колонка/індекс), тож базу,
+оновлену колись старими скриптами migrate_*.py, можна мігрувати з нуля.
+
+Перенесення даних (backfill) — ops.backfill: порціями по первинному ключу, кожна порція
+в окремій короткій транзакції, позиція зберігається в job_cursors, тож переривання
+не страшне — повторний запуск продовжить з місця зупинки.
+"""
+from app.db.migrations.runner import MIGRATIONS, Migration, current_version, migration, pending, upgrade
+
+__all__ = ["MIGRATIONS", "Migration", "current_version", "migration", "pending", "upgrade"]
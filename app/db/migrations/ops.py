@@ -0,0 +1,154 @@
+"""
+Ідемпотентні операції для міграцій і пакетний backfill.
+"""
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import Column, MetaData, Table, func, inspect, select, table, column, text, update, insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn, CreateTable
+from sqlalchemy.types import TypeEngine
+
+from app.core.config import settings
+from app.models.job_cursor import JobCursor
+
+logger = logging.getLogger("app.migrations")
+
+
+# =======================
+# СХЕМА
+# =======================
+def has_table(conn: Connection, name: str) -> bool:
+    return inspect(conn).has_table(name)
+
+
+def has_column(conn: Connection, table_name: str, name: str) -> bool:
+    return any(c["name"] == name for c in inspect(conn).get_columns(table_name))
+
+
+def has_index(conn: Connection, table_name: str, name: str) -> bool:
+    return any(ix["name"] == name for ix in inspect(conn).get_indexes(table_name))
+
+
+def column_type(conn: Connection, table_name: str, name: str) -> TypeEngine | None:
+    """Тип колонки в базі (рефлексія), None — колонки нема."""
+    return next((c["type"] for c in inspect(conn).get_columns(table_name) if c["name"] == name), None)
+
+
+def add_column(conn: Connection, table_name: str, col: Column) -> bool:
+    """
+    ALTER TABLE ... ADD COLUMN, якщо колонки ще нема. DDL компілюється під діалект
+    (типи, DEFAULT, NOT NULL); зовнішній ключ — REFERENCES у тому ж реченні.
+    NOT NULL потребує server_default, інакше наявні рядки не пройдуть перевірку.
+    """
+    if not has_table(conn, table_name) or has_column(conn, table_name, col.name):
+        return False
+    ddl = str(CreateColumn(col).compile(dialect=conn.dialect))
+    for fk in col.foreign_keys:
+        target_table, _, target_column = fk.target_fullname.partition(".")
+        ddl += f" REFERENCES {target_table}({target_column})"
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+    return True
+
+
+def create_index(conn: Connection, name: str, table_name: str, columns: list[str], unique: bool = False) -> bool:
+    if not has_table(conn, table_name) or has_index(conn, table_name, name):
+        return False
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} {name} ON {table_name} ({', '.join(columns)})"))
+    return True
+
+
+def rebuild_table(conn: Connection, target: Table, exprs: dict[str, str] | None = None) -> None:
+    """
+    Перестворює таблицю за описом моделі target (типи, NOT NULL, CHECK, зовнішні
+    ключі) з копіюванням рядків — для SQLite, де нема ALTER COLUMN і ADD CONSTRAINT.
+    exprs — SQL-вирази над старою таблицею для колонок, які не копіюються як є.
+    Індекси моделі створюються заново. Виконувати в одній транзакції.
+    """
+    exprs = exprs or {}
+    tmp = f"{target.name}__new"
+    # копія всіх таблиць — щоб зовнішні ключі нової таблиці мали на що посилатися
+    scratch = MetaData()
+    for t in target.metadata.sorted_tables:
+        t.to_metadata(scratch)
+    conn.execute(text(f"DROP TABLE IF EXISTS {tmp}"))
+    conn.execute(CreateTable(target.to_metadata(scratch, name=tmp)))
+
+    names = [c.name for c in target.columns]
+    conn.execute(text(
+        f"INSERT INTO {tmp} ({', '.join(names)}) "
+        f"SELECT {', '.join(exprs.get(n, n) for n in names)} FROM {target.name}"
+    ))
+    conn.execute(text(f"DROP TABLE {target.name}"))
+    conn.execute(text(f"ALTER TABLE {tmp} RENAME TO {target.name}"))
+    for ix in target.indexes:
+        ix.create(conn)
+
+
+# =======================
+# BACKFILL
+# =======================
+def _save_position(conn: Connection, name: str, position: int) -> None:
+    updated = conn.execute(
+        update(JobCursor).where(JobCursor.name == name).values(position=position, updated_at=func.now())
+    ).rowcount
+    if not updated:
+        conn.execute(insert(JobCursor).values(name=name, position=position, updated_at=func.now()))
+
+
+def backfill(
+    engine: Engine,
+    name: str,
+    table_name: str,
+    step: str | Callable[[Connection, int, int], None],
+    batch_size: int | None = None,
+    pause_seconds: float | None = None,
+    key: str = "id",
+) -> int:
+    """
+    Оновлює таблицю порціями по первинному ключу key.
+
+    step — SQL з параметрами :lo і :hi (рядки з lo < key <= hi) або функція
+    step(conn, lo, hi). Кожна порція — окрема транзакція разом зі збереженням
+    позиції в job_cursors[name]; між порціями пауза, щоб не витісняти робоче
+    навантаження. Повертає кількість оброблених рядків.
+    """
+    batch_size = batch_size or settings.backfill_batch_size
+    pause_seconds = settings.backfill_pause_seconds if pause_seconds is None else pause_seconds
+    t = table(table_name, column(key))
+    pk = t.c[key]
+
+    with engine.connect() as conn:
+        position = conn.execute(select(JobCursor.position).where(JobCursor.name == name)).scalar() or 0
+        upper = conn.execute(select(func.max(pk))).scalar() or 0
+    if position:
+        logger.info("backfill %s: resuming after %s=%s", name, key, position)
+
+    done = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            # межа порції — batch_size-й ключ після позиції (індексний скан, без OFFSET)
+            keys = conn.execute(
+                select(pk).where(pk > position).order_by(pk).limit(batch_size)
+            ).scalars().all()
+            if not keys:
+                break
+            hi = keys[-1]
+            if isinstance(step, str):
+                conn.execute(text(step), {"lo": position, "hi": hi})
+            else:
+                step(conn, position, hi)
+            _save_position(conn, name, hi)
+
+        done += len(keys)
+        position = hi
+        logger.info(
+            "backfill %s: %s rows, %s=%s of ~%s (%.1fs)",
+            name, done, key, position, upper, time.perf_counter() - started,
+        )
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return done
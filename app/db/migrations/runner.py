@@ -0,0 +1,112 @@
+"""
+Реєстр міграцій і їх застосування з записом у schema_version.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.models.job_cursor import JobCursor
+from app.models.schema_version import SchemaVersion
+
+logger = logging.getLogger("app.migrations")
+
+# ключ pg_advisory_lock: два одночасні `manage.py migrate` не виконують міграції двічі
+_PG_LOCK_KEY = 7_420_250_047
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    # зміни схеми — в одній транзакції разом із записом у schema_version
+    schema: Callable[[Connection], None] | None = None
+    # перенесення даних — порціями поза транзакцією схеми (ops.backfill), до запису версії
+    data: Callable[[Engine], None] | None = None
+
+
+MIGRATIONS: dict[int, Migration] = {}
+
+
+def migration(version: int, name: str, data: Callable[[Engine], None] | None = None):
+    """Реєструє функцію зміни схеми як міграцію з номером version."""
+
+    def decorator(fn: Callable[[Connection], None]):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = Migration(version, name, schema=fn, data=data)
+        return fn
+
+    return decorator
+
+
+def _load() -> list[Migration]:
+    from app.db.migrations import versions  # noqa: F401  — реєстрація @migration
+
+    return [MIGRATIONS[v] for v in sorted(MIGRATIONS)]
+
+
+def _ensure_tables(engine: Engine) -> None:
+    SchemaVersion.__table__.create(bind=engine, checkfirst=True)
+    JobCursor.__table__.create(bind=engine, checkfirst=True)
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    _ensure_tables(engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(SchemaVersion.version)).scalars())
+
+
+def current_version(engine: Engine) -> int:
+    return max(applied_versions(engine), default=0)
+
+
+def pending(engine: Engine) -> list[Migration]:
+    done = applied_versions(engine)
+    return [m for m in _load() if m.version not in done]
+
+
+def _apply(engine: Engine, m: Migration) -> None:
+    started = time.perf_counter()
+    if m.schema is not None:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # DDL не чекає вічно за довгими транзакціями і не блокує все за собою
+                conn.execute(text(f"SET LOCAL lock_timeout = '{int(settings.migration_lock_timeout_seconds)}s'"))
+            m.schema(conn)
+    if m.data is not None:
+        m.data(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(SchemaVersion).values(
+            version=m.version,
+            name=m.name,
+            applied_at=datetime.utcnow(),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        ))
+
+
+def upgrade(engine: Engine, target: int | None = None) -> list[Migration]:
+    """Застосовує всі незастосовані міграції до target (включно); повертає застосовані."""
+    _ensure_tables(engine)
+    lock_conn = None
+    if engine.dialect.name == "postgresql":
+        lock_conn = engine.connect()
+        lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _PG_LOCK_KEY})
+    try:
+        applied = []
+        for m in pending(engine):
+            if target is not None and m.version > target:
+                break
+            logger.info("applying migration %04d %s", m.version, m.name)
+            _apply(engine, m)
+            applied.append(m)
+        return applied
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _PG_LOCK_KEY})
+            lock_conn.close()
@@ -0,0 +1,137 @@
+"""
+Міграції схеми за зростанням версії. Нова міграція — наступний номер, ніколи
+не змінювати вже застосовані: схема бази = create_all + усі версії по порядку.
+"""
+from functools import partial
+
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Integer, SmallInteger, String, delete, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.migrations import ops
+from app.db.migrations.runner import migration
+from app.models import history_event
+from app.models.case import Case
+from app.models.case_archive import ArchivedCase, ArchivedCaseArtifact, ArchivedCaseDocument, ArchivedCaseHistory
+from app.models.case_document import CaseDocument
+from app.models.case_history import CaseHistory
+from app.models.job_cursor import JobCursor
+
+
+@migration(1, "cases: title, description")
+def add_case_title_description(conn: Connection) -> None:
+    ops.add_column(conn, "cases", Column("title", String(255), nullable=False, server_default=""))
+    ops.add_column(conn, "cases", Column("description", String(2000), nullable=False, server_default=""))
+
+
+@migration(2, "users: full_name, region")
+def add_user_profile_fields(conn: Connection) -> None:
+    ops.add_column(conn, "users", Column("full_name", String(255), nullable=True))
+    ops.add_column(conn, "users", Column("region", String(100), nullable=True))
+
+
+@migration(3, "case_documents: moderation queue")
+def add_moderation_queue(conn: Connection) -> None:
+    ops.add_column(conn, "case_documents", Column("claimed_by", Integer, ForeignKey("users.id"), nullable=True))
+    ops.add_column(conn, "case_documents", Column("lease_expires_at", DateTime, nullable=True))
+    ops.create_index(conn, "ix_case_documents_status_updated_at", "case_documents", ["status", "updated_at"])
+
+
+@migration(4, "archive tables for closed cases")
+def add_case_archive(conn: Connection) -> None:
+    for model in (ArchivedCase, ArchivedCaseDocument, ArchivedCaseHistory, ArchivedCaseArtifact):
+        model.__table__.create(bind=conn, checkfirst=True)
+
+
+# =======================
+# 5: статуси — SMALLINT-коди, історія — шаблон + параметри
+# =======================
+# Порядок: колонки status_code (і event/params в історії) -> backfill порціями, поки
+# стара версія застосунку працює -> коротка заміна на таблицю: дозаповнити рядки,
+# записані під час backfill, прибрати старі колонки, NOT NULL + CHECK.
+_CODED = (Case, CaseDocument, CaseHistory, ArchivedCase, ArchivedCaseDocument, ArchivedCaseHistory)
+_HISTORY = (CaseHistory, ArchivedCaseHistory)
+
+
+def _legacy(conn: Connection, model) -> bool:
+    """Таблиця ще зі статусом-рядком."""
+    name = model.__tablename__
+    return ops.has_table(conn, name) and not isinstance(ops.column_type(conn, name, "status"), Integer)
+
+
+def _codes(model):
+    return model.__table__.c.status.type
+
+
+def _check_statuses(conn: Connection, model, where: str = "1 = 1") -> None:
+    name = model.__tablename__
+    found = set(conn.execute(text(f"SELECT DISTINCT status FROM {name} WHERE {where}")).scalars())
+    unknown = sorted(found - set(_codes(model).values), key=str)
+    if unknown:
+        raise RuntimeError(f"{name}: unknown status values {unknown}, fix them before migrating")
+
+
+def _encode_comments(conn: Connection, name: str, where: str, params: dict) -> None:
+    rows = conn.execute(text(f"SELECT id, status, comment FROM {name} WHERE {where}"), params).all()
+    values = []
+    for id_, status, comment in rows:
+        event, packed = history_event.parse(comment or "", status)
+        values.append({"id": id_, "event": event, "params": packed})
+    if values:
+        conn.execute(text(f"UPDATE {name} SET event = :event, params = :params WHERE id = :id"), values)
+
+
+def _backfill_history(name: str, sql: str, conn: Connection, lo: int, hi: int) -> None:
+    conn.execute(text(sql), {"lo": lo, "hi": hi})
+    _encode_comments(conn, name, "id > :lo AND id <= :hi", {"lo": lo, "hi": hi})
+
+
+def _swap(conn: Connection, model, job: str) -> None:
+    name = model.__tablename__
+    recode = _codes(model).case_sql("status")
+    history = model in _HISTORY
+    # рядки, записані або змінені старою версією застосунку під час backfill
+    conn.execute(text(f"UPDATE {name} SET status_code = {recode} WHERE status_code IS NULL OR status_code <> {recode}"))
+    _check_statuses(conn, model, "status_code IS NULL")
+    if history:
+        _encode_comments(conn, name, "event IS NULL", {})
+
+    if conn.dialect.name == "sqlite":
+        ops.rebuild_table(conn, model.__table__, {"status": "status_code"})
+    else:
+        check = next(c for c in model.__table__.constraints if isinstance(c, CheckConstraint))
+        # індекси зі status зникають разом з колонкою — створюємо наново нижче
+        conn.execute(text(f"ALTER TABLE {name} DROP COLUMN status"))
+        conn.execute(text(f"ALTER TABLE {name} RENAME COLUMN status_code TO status"))
+        conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN status SET NOT NULL"))
+        conn.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {check.name} CHECK ({check.sqltext})"))
+        if history:
+            conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN event SET NOT NULL"))
+            conn.execute(text(f"ALTER TABLE {name} DROP COLUMN comment"))
+        for ix in model.__table__.indexes:
+            ix.create(conn, checkfirst=True)
+    conn.execute(delete(JobCursor).where(JobCursor.name == job))
+
+
+def recode_statuses(engine: Engine) -> None:
+    for model in _CODED:
+        name = model.__tablename__
+        with engine.connect() as conn:
+            if not _legacy(conn, model):
+                continue
+            _check_statuses(conn, model)
+        job = f"migration_0005_{name}"
+        sql = f"UPDATE {name} SET status_code = {_codes(model).case_sql('status')} WHERE id > :lo AND id <= :hi"
+        ops.backfill(engine, job, name, partial(_backfill_history, name, sql) if model in _HISTORY else sql)
+        with engine.begin() as conn:
+            _swap(conn, model, job)
+
+
+@migration(5, "coded statuses, templated case history", data=recode_statuses)
+def add_status_codes(conn: Connection) -> None:
+    for model in _CODED:
+        if not _legacy(conn, model):
+            continue
+        ops.add_column(conn, model.__tablename__, Column("status_code", SmallInteger, nullable=True))
+        if model in _HISTORY:
+            ops.add_column(conn, model.__tablename__, Column("event", SmallInteger, nullable=True))
+            ops.add_column(conn, model.__tablename__, Column("params", String(255), nullable=True))
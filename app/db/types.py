@@ -0,0 +1,53 @@
+"""
+Власні типи колонок.
+"""
+from sqlalchemy import CheckConstraint, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedEnum(TypeDecorator):
+    """
+    Значення з фіксованого набору: у Python — рядок ("draft"), у базі — SMALLINT (1).
+
+    codes — {значення: код}. Коди вже записаних рядків не змінюються і не
+    перевикористовуються: нове значення — лише новий код (і нова CHECK-умова).
+    Порівняння з рядками в запитах (status == "done", status.in_(...)) кодуються
+    автоматично; невідоме значення — ValueError ще до звернення до бази.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes: dict[str, int]):
+        super().__init__()
+        # кортеж — хешований ключ кешу скомпільованих запитів
+        self.codes = tuple(codes.items())
+        self._by_value = dict(codes)
+        self._by_code = {code: value for value, code in codes.items()}
+
+    @property
+    def values(self) -> tuple[str, ...]:
+        return tuple(self._by_value)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self._by_value[value]
+        except KeyError:
+            raise ValueError(f"Unknown value {value!r}, expected one of {self.values}") from None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._by_code[value]
+
+    def check(self, column: str, name: str) -> CheckConstraint:
+        """CHECK: у колонці лише відомі коди."""
+        codes = ", ".join(str(code) for code in sorted(self._by_code))
+        return CheckConstraint(f"{column} IN ({codes})", name=name)
+
+    def case_sql(self, column: str) -> str:
+        """SQL-вираз рядок → код (для міграції наявних даних); невідоме значення — NULL."""
+        whens = " ".join(f"WHEN '{value}' THEN {code}" for value, code in self._by_value.items())
+        return f"CASE {column} {whens} END"
@@ -1,8 +1,11 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db.session import engine, SessionLocal
-from app.db.base import Base
 from app.routers.admin import router as admin_router
 
 # ВАЖЛИВО: імпортуємо моделі, щоб Base “побачив” таблиці
@@ -17,15 +20,65 @@ from app.routers.cases import router as cases_router
 from app.routers.ai import router as ai_router
 from app.models.case_document import CaseDocument  # noqa: F401
 from app.models.case_history import CaseHistory  # noqa: F401
+from app.models.storage_usage import StorageUsage  # noqa: F401
+from app.models.job_cursor import JobCursor  # noqa: F401
+from app.models.case_stat import CaseStat  # noqa: F401
+from app.models.idempotency_key import IdempotencyKey  # noqa: F401
+from app.routers.events import router as events_router
+from app.routers.moderation import router as moderation_router
+from app.routers.metrics import router as metrics_router
+from app.core import admission, compression, metrics, profiler, query_inspector, tracing
+from app.services import case_archive, case_search, dossier_service, events, storage_service
+from app.services.ai_client import LLMUnavailable
+
+
+def install_db_hooks() -> None:
+    # події змін справ: після коміту транзакції з CaseHistory
+    events.install_session_hooks(SessionLocal)
+    # повнотекстовий індекс справ: оновлюється в тій самій транзакції
+    case_search.install_session_hooks(SessionLocal)
+    # лічильники SQL-запитів на HTTP-запит
+    metrics.install_engine_hooks(engine)
+    # повільні запити і N+1 (пороги в settings)
+    query_inspector.install_engine_hooks(engine)
+    # локальні трейси (спани SQL, LLM, PDF, файлів)
+    tracing.install_engine_hooks(engine)
 
 
+def remove_db_hooks() -> None:
+    tracing.remove_engine_hooks(engine)
+    query_inspector.remove_engine_hooks(engine)
+    metrics.remove_engine_hooks(engine)
+    case_search.remove_session_hooks(SessionLocal)
+    events.remove_session_hooks(SessionLocal)
 
 
-Base.metadata.create_all(bind=engine)
+# Хуки БД, трейсинг і фонові задачі (GC завантажень, архів, брокер подій) — лише тут,
+# не при імпорті модуля. Хуки ставляться до воркерів, бо ті теж пишуть через
+# SessionLocal, і знімаються після їх зупинки.
+# Схема БД і стартові дані — окремою командою: python manage.py setup
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tracing.configure()
+    install_db_hooks()
+    storage_service.start_gc_worker()
+    case_archive.start_worker()
+    events.start_broker()
+    try:
+        yield
+    finally:
+        storage_service.stop_gc_worker()
+        case_archive.stop_worker()
+        dossier_service.shutdown()
+        events.stop_broker()
+        remove_db_hooks()
 
-app = FastAPI(title=settings.app_name)
 
+# orjson для всіх відповідей; списки віддають ORJSONResponse з легкими рядками напряму
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse, lifespan=lifespan)
 
+# контроль допуску — найглибше, щоб 503 теж отримували CORS-заголовки
+app.add_middleware(admission.AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5173"],
@@ -33,6 +86,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# стиснення за Accept-Encoding — всередині метрик і трейсів, щоб час стиснення входив у запит
+app.add_middleware(compression.CompressionMiddleware)
+# профайлер для адмінів — всередині метрик, щоб мати request id
+app.add_middleware(profiler.ProfilerMiddleware)
+# кореневий спан трейсу запиту
+app.add_middleware(tracing.TracingMiddleware)
+# метрики додаємо останньою — вона зовнішня і міряє весь запит
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -40,44 +101,22 @@ app.include_router(benefits_router)
 app.include_router(cases_router)
 app.include_router(ai_router)
 app.include_router(admin_router)
+app.include_router(events_router)
+app.include_router(moderation_router)
+app.include_router(metrics_router)
+
+
+# LLM недоступна, а деградованої відповіді в ендпоінта немає (генерація заяви/PDF)
+@app.exception_handler(LLMUnavailable)
+def llm_unavailable_handler(request: Request, exc: LLMUnavailable):
+    retry_after = exc.retry_after or settings.admission_retry_after_seconds
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI service is temporarily unavailable, please retry later"},
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
 
 
 @app.get("/")
 def root():
     return {"status": "ok", "app": settings.app_name}
-
-# Seed: заповнити кілька гарантій при першому запуску
-@app.on_event("startup")
-def seed_benefits():
-    db = SessionLocal()
-    try:
-        if db.query(Benefit).count() == 0:
-            db.add_all([
-                Benefit(
-                    title="Компенсація за житлово-комунальні послуги",
-                    category="housing",
-                    description="Пільги/компенсації на оплату ЖКП для визначених категорій.",
-                    authority="Органи соцзахисту / ЦНАП",
-                    required_documents="Паспорт\nІПН\nПідтвердження статусу\nЗаява",
-                    eligible_statuses="veteran,ubd,family,disabled",
-                ),
-                Benefit(
-                    title="Одноразова грошова допомога (приклад)",
-                    category="payments",
-                    description="Приклад виплати за певних умов (для демонстрації).",
-                    authority="Соцзахист / ЦНАП",
-                    required_documents="Паспорт\nІПН\nДокумент про статус\nРеквізити IBAN\nЗаява",
-                    eligible_statuses="veteran,ubd",
-                ),
-                Benefit(
-                    title="Пільги на медичні послуги (приклад)",
-                    category="medical",
-                    description="Пріоритет/пільгові умови отримання медичних послуг (демо).",
-                    authority="Медзаклад / сімейний лікар / НСЗУ",
-                    required_documents="Паспорт\nПідтвердження статусу",
-                    eligible_statuses="veteran,ubd,disabled",
-                ),
-            ])
-            db.commit()
-    finally:
-        db.close()
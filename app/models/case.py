@@ -4,10 +4,12 @@ from sqlalchemy import Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.models.status import CaseStatus
 
 
 class Case(Base):
     __tablename__ = "cases"
+    __table_args__ = (CaseStatus.check("status", name="ck_cases_status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -18,7 +20,7 @@ class Case(Base):
         Integer, ForeignKey("benefits.id"), nullable=False, index=True
     )
 
-    status: Mapped[str] = mapped_column(String(30), nullable=False, default="draft")
+    status: Mapped[str] = mapped_column(CaseStatus, nullable=False, default="draft")
 
     # NEW: назва та опис справи
     # залишаємо nullable=False + default="" щоб фронт/схеми не ловили None
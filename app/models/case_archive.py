@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.history_event import render
+from app.models.status import CaseStatus, DocumentStatus
+
+# Архів закритих справ (app/services/case_archive.py): ті самі колонки, що й у
+# "гарячих" таблицях, щоб переносити рядки INSERT ... SELECT і читати тими самими
+# схемами відповіді. Індекси — лише для читання однієї справи.
+
+
+class ArchivedCase(Base):
+    __tablename__ = "cases_archive"
+    __table_args__ = (CaseStatus.check("status", name="ck_cases_archive_status"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    benefit_id: Mapped[int] = mapped_column(Integer, ForeignKey("benefits.id"), nullable=False)
+    status: Mapped[str] = mapped_column(CaseStatus, nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    description: Mapped[str] = mapped_column(String(2000), nullable=False, default="")
+    note: Mapped[str] = mapped_column(String(500), nullable=False, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ArchivedCaseDocument(Base):
+    __tablename__ = "case_documents_archive"
+    __table_args__ = (DocumentStatus.check("status", name="ck_case_documents_archive_status"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    case_id = Column(Integer, ForeignKey("cases_archive.id"), index=True, nullable=False)
+
+    title = Column(String, nullable=False)
+    status = Column(DocumentStatus, nullable=False)
+    comment = Column(String, nullable=True)
+
+    file_name = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ArchivedCaseHistory(Base):
+    __tablename__ = "case_history_archive"
+    __table_args__ = (CaseStatus.check("status", name="ck_case_history_archive_status"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    case_id: Mapped[int] = mapped_column(Integer, ForeignKey("cases_archive.id"), nullable=False, index=True)
+
+    status: Mapped[str] = mapped_column(CaseStatus, nullable=False)
+    event: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    params: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    @property
+    def comment(self) -> str:
+        return render(self.event, self.params, self.status)
+
+
+class ArchivedCaseArtifact(Base):
+    __tablename__ = "case_artifacts_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    case_id = Column(Integer, ForeignKey("cases_archive.id"), index=True, nullable=False)
+
+    type = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    content_text = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,17 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 
 from app.db.base import Base
+from app.models.status import DocumentStatus
 
 
 class CaseDocument(Base):
     __tablename__ = "case_documents"
+    __table_args__ = (
+        # черга модерації: status = 'uploaded' від найстаріших
+        Index("ix_case_documents_status_updated_at", "status", "updated_at"),
+        DocumentStatus.check("status", name="ck_case_documents_status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"), index=True, nullable=False)
 
     title = Column(String, nullable=False)
-    status = Column(String, default="required", nullable=False)
+    status = Column(DocumentStatus, default="required", nullable=False)
 
     # ✅ коментар модератора/користувача
     comment = Column(String, nullable=True)
@@ -22,5 +28,9 @@ class CaseDocument(Base):
     content_type = Column(String, nullable=True)
     size_bytes = Column(Integer, nullable=True)
 
+    # ✅ оренда в черзі модерації: хто взяв документ і до якого часу (UTC)
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
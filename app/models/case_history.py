@@ -1,15 +1,24 @@
 from datetime import datetime
-from sqlalchemy import Integer, String, ForeignKey, DateTime
+from sqlalchemy import Integer, SmallInteger, String, ForeignKey, DateTime
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.models.history_event import render
+from app.models.status import CaseStatus
 
 class CaseHistory(Base):
     __tablename__ = "case_history"
+    __table_args__ = (CaseStatus.check("status", name="ck_case_history_status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     case_id: Mapped[int] = mapped_column(Integer, ForeignKey("cases.id"), nullable=False, index=True)
 
-    status: Mapped[str] = mapped_column(String(30), nullable=False)
-    comment: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    status: Mapped[str] = mapped_column(CaseStatus, nullable=False)
+    # шаблон запису (app/models/history_event.py) і його параметри замість готового тексту
+    event: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    params: Mapped[str | None] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def comment(self) -> str:
+        return render(self.event, self.params, self.status)
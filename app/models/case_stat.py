@@ -0,0 +1,24 @@
+from datetime import date
+
+from sqlalchemy import Integer, String, Date, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CaseStat(Base):
+    """Зведена таблиця для адмін-дашборду: кількість справ у кожній групі."""
+
+    __tablename__ = "case_stats"
+    __table_args__ = (
+        UniqueConstraint("status", "benefit_id", "region", "week", name="uq_case_stats_group"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    status: Mapped[str] = mapped_column(String(30), nullable=False)
+    benefit_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    region: Mapped[str] = mapped_column(String(100), nullable=False, default="")
+    week: Mapped[date] = mapped_column(Date, nullable=False)  # понеділок тижня створення справи
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
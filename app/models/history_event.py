@@ -0,0 +1,100 @@
+"""
+Події історії справи: код шаблону + компактні параметри замість готового речення.
+
+У case_history зберігаються event (SMALLINT) і params (параметри шаблону через
+SEP, NULL — без параметрів); текст comment збирається лише при читанні.
+{status} у шаблоні — статус справи з того ж рядка історії, тож не дублюється в params.
+Коди не змінювати — лише дописувати нові шаблони; TEXT — довільний текст як є.
+"""
+import re
+from enum import IntEnum
+from string import Formatter
+
+
+class HistoryEvent(IntEnum):
+    TEXT = 0
+    CASE_CREATED = 1
+    CASE_UPDATED = 2
+    DOCUMENT_UPDATED = 3
+    STATUS_AUTO = 4
+    STATUS_AUTO_SHORT = 5
+    FILE_UPLOADED = 6
+    FILE_DELETED = 7
+    PDF_GENERATED = 8
+    ADMIN_STATUS = 9
+    ADMIN_NOTE = 10
+
+
+TEMPLATES: dict[HistoryEvent, str] = {
+    HistoryEvent.TEXT: "{0}",
+    HistoryEvent.CASE_CREATED: "Справу створено",
+    HistoryEvent.CASE_UPDATED: "Оновлення справи",
+    HistoryEvent.DOCUMENT_UPDATED: "Оновлено документ: {0} → {1}",
+    HistoryEvent.STATUS_AUTO: "[AUTO] Статус справи оновлено автоматично → {status}",
+    HistoryEvent.STATUS_AUTO_SHORT: "[AUTO] Статус справи → {status}",
+    HistoryEvent.FILE_UPLOADED: "Завантажено файл для документа: {0}",
+    HistoryEvent.FILE_DELETED: "Видалено файл документа: {0}",
+    HistoryEvent.PDF_GENERATED: "Згенеровано PDF заяви",
+    HistoryEvent.ADMIN_STATUS: "[ADMIN] Зміна статусу",
+    HistoryEvent.ADMIN_NOTE: "[ADMIN] {0}",
+}
+
+# роздільник параметрів (ASCII unit separator — не трапляється у звичайному тексті)
+SEP = "\x1f"
+
+
+def _fields(template: str) -> list[str]:
+    return [name for _, name, _, _ in Formatter().parse(template) if name is not None]
+
+
+_ARITY = {e: sum(name.isdigit() for name in _fields(t)) for e, t in TEMPLATES.items()}
+
+
+def render(event: int, params: str | None, status: str) -> str:
+    """Текст запису історії (поле comment у відповіді API)."""
+    arity = _ARITY[HistoryEvent(event)]
+    args = (params or "").split(SEP, arity - 1) if arity else ()
+    return TEMPLATES[HistoryEvent(event)].format(*args, status=status)
+
+
+def encode(event: HistoryEvent, params: tuple[str, ...], status: str) -> tuple[int, str | None]:
+    """(event, params) для запису в case_history."""
+    params = tuple(str(p) for p in params)
+    if any(SEP in p for p in params[:-1]):
+        # роздільник усередині параметра не розібрати назад — зберігаємо готовий текст
+        return HistoryEvent.TEXT, TEMPLATES[event].format(*params, status=status)
+    return event, SEP.join(params) if params else None
+
+
+# =======================
+# РОЗБІР ГОТОВОГО ТЕКСТУ (міграція наявних рядків)
+# =======================
+def _pattern(template: str) -> re.Pattern:
+    parts = []
+    for literal, name, _, _ in Formatter().parse(template):
+        parts.append(re.escape(literal))
+        if name is not None:
+            parts.append(f"(?P<{'status' if name == 'status' else 'p' + name}>.*)")
+    return re.compile("".join(parts), re.DOTALL)
+
+
+# спершу шаблони з меншою кількістю параметрів: "[ADMIN] Зміна статусу" — ADMIN_STATUS, не ADMIN_NOTE
+_PATTERNS = [
+    (e, _pattern(t)) for e, t in sorted(TEMPLATES.items(), key=lambda et: (_ARITY[et[0]], et[0]))
+    if e is not HistoryEvent.TEXT
+]
+
+
+def parse(comment: str, status: str) -> tuple[int, str | None]:
+    """
+    Зворотне до render: (event, params) для наявного тексту. Шаблон приймається лише
+    якщо render дає той самий текст байт у байт, інакше — TEXT з текстом як є.
+    """
+    for event, pattern in _PATTERNS:
+        m = pattern.fullmatch(comment)
+        if m is None or m.groupdict().get("status", status) != status:
+            continue
+        encoded = encode(event, tuple(m[f"p{i}"] for i in range(_ARITY[event])), status)
+        if render(*encoded, status) == comment:
+            return encoded
+    return HistoryEvent.TEXT, comment
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """Запит з заголовком Idempotency-Key: повтор з тим самим ключем отримує збережену відповідь."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+
+    # sha256 від методу, шляху і тіла — той самий ключ з іншим запитом відхиляється
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress / completed
+
+    # вказівник на результат: "case:<id>" або шлях до файлу з відповіддю
+    response_code = Column(Integer, nullable=True)
+    response_ref = Column(String, nullable=True)
+    response_headers = Column(Text, nullable=True)  # JSON
+
+    # UTC; locked_at оновлюється, коли запит підхоплює інший воркер після завислого першого
+    created_at = Column(DateTime, nullable=False)
+    locked_at = Column(DateTime, nullable=False)
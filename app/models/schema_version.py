@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, String, DateTime, Float
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SchemaVersion(Base):
+    """Застосовані міграції (app/db/migrations): одна версія — один рядок."""
+
+    __tablename__ = "schema_version"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    duration_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,20 @@
+from app.db.types import CodedEnum
+
+# Статуси справ і документів: у коді — рядки, у базі — SMALLINT з CHECK.
+# Коди не змінювати: ними вже записані рядки (у т.ч. в архівних таблицях).
+
+CaseStatus = CodedEnum({
+    "draft": 1,
+    "submitted": 2,
+    "in_review": 3,
+    "approved": 4,
+    "rejected": 5,
+    "done": 6,
+})
+
+DocumentStatus = CodedEnum({
+    "required": 1,
+    "uploaded": 2,
+    "approved": 3,
+    "rejected": 4,
+})
@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StorageUsage(Base):
+    __tablename__ = "storage_usage"
+    __table_args__ = (
+        UniqueConstraint("scope", "owner_id", name="uq_storage_usage_scope_owner"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # "user" або "case"
+    scope: Mapped[str] = mapped_column(String(10), nullable=False)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    bytes_used: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,19 +1,28 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel
+from sqlalchemy import case as sql_case, literal, update
 from sqlalchemy.orm import Session
 
+from app.core import profiler, tracing
 from app.core.deps import get_current_user
 from app.db.session import get_db
 from app.models.case import Case
-from app.models.case_history import CaseHistory
+from app.models.case_archive import ArchivedCase
+from app.models.history_event import HistoryEvent
+from app.models.status import CaseStatus
 from app.models.user import User
-from app.schemas.case import CaseOut
+from app.schemas.case import CaseOut, CaseSearchOut
+from app.schemas.case_stats import CaseStatsOut
+from app.schemas.rows import CaseRow, columns
+from app.services import case_archive, case_search, case_stats, events, history_writer
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-ALLOWED_CASE_STATUSES = {"draft", "submitted", "in_review", "approved", "rejected", "done"}
+ALLOWED_CASE_STATUSES = set(CaseStatus.values)
+MAX_BULK_ITEMS = 1000
 
 
 class AdminCaseUpdate(BaseModel):
@@ -21,18 +30,128 @@ class AdminCaseUpdate(BaseModel):
     comment: Optional[str] = ""
 
 
+class AdminBulkCaseItem(BaseModel):
+    case_id: int
+    status: str
+    comment: Optional[str] = ""
+
+
+class AdminBulkCaseResult(BaseModel):
+    case_id: int
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
 def _admin_only(user: User):
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
 
 
+def _admin_event(comment: str | None) -> tuple:
+    """Шаблон запису історії для зміни статусу адміном: "[ADMIN] <коментар>"."""
+    return (HistoryEvent.ADMIN_NOTE, comment) if comment else (HistoryEvent.ADMIN_STATUS,)
+
+
 @router.get("/cases", response_model=list[CaseOut])
 def admin_list_cases(
+    include_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     _admin_only(current_user)
-    return db.query(Case).order_by(Case.id.desc()).all()
+    rows = list(db.query(*columns(Case, CaseRow)).order_by(Case.id.desc()))
+    if include_archived:
+        # закриті справи, перенесені в архів (case_archive)
+        rows.extend(db.query(*columns(ArchivedCase, CaseRow)))
+        rows.sort(key=lambda r: r[0], reverse=True)
+    return ORJSONResponse([CaseRow(*r) for r in rows])
+
+
+@router.get("/cases/search", response_model=CaseSearchOut)
+def admin_search_cases(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _admin_only(current_user)
+    total, items = case_search.search(db, q, limit=limit, offset=offset)
+    return CaseSearchOut(total=total, items=items)
+
+
+@router.patch("/cases:bulk", response_model=list[AdminBulkCaseResult])
+def admin_bulk_update_case_status(
+    items: list[AdminBulkCaseItem],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Масова зміна статусів: один UPDATE ... CASE, одна багаторядкова вставка в історію,
+    один коміт. Помилки окремих пунктів не зупиняють решту.
+    """
+    _admin_only(current_user)
+
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_BULK_ITEMS})")
+
+    errors: dict[int, str] = {}
+    seen: set[int] = set()
+    for i, item in enumerate(items):
+        if item.case_id in seen:
+            errors[i] = "Duplicate case_id in request"
+        elif item.status not in ALLOWED_CASE_STATUSES:
+            errors[i] = f"Invalid status: {item.status}"
+        seen.add(item.case_id)
+
+    wanted = {item.case_id: item for i, item in enumerate(items) if i not in errors}
+    found = {
+        row.id: row
+        for row in db.query(Case.id, Case.user_id, Case.benefit_id, Case.status, Case.created_at)
+        .filter(Case.id.in_(wanted.keys()))
+    } if wanted else {}
+
+    missing = wanted.keys() - found.keys()
+    archived = {
+        row.id for row in db.query(ArchivedCase.id).filter(ArchivedCase.id.in_(missing))
+    } if missing else set()
+    for i, item in enumerate(items):
+        if i not in errors and item.case_id not in found:
+            errors[i] = "Case is archived" if item.case_id in archived else "Case not found"
+
+    to_apply = {cid: item for cid, item in wanted.items() if cid in found}
+    if to_apply:
+        db.execute(
+            update(Case)
+            .where(Case.id.in_(to_apply.keys()))
+            .values(status=sql_case(
+                # literal з типом колонки: значення CASE кодуються так само, як status
+                {cid: literal(it.status, Case.status.type) for cid, it in to_apply.items()}, value=Case.id
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        history_writer.record_many(
+            db,
+            [history_writer.row(cid, it.status, *_admin_event(it.comment)) for cid, it in to_apply.items()],
+        )
+        case_stats.on_bulk_status_changed(
+            db,
+            [
+                (found[cid].user_id, found[cid].benefit_id, found[cid].created_at, found[cid].status, it.status)
+                for cid, it in to_apply.items()
+            ],
+        )
+        for cid, it in to_apply.items():
+            events.queue_case_event(db, cid, found[cid].user_id, it.status, {"case"})
+        db.commit()
+
+    return [
+        AdminBulkCaseResult(case_id=item.case_id, ok=False, error=errors[i])
+        if i in errors
+        else AdminBulkCaseResult(case_id=item.case_id, ok=True, status=item.status)
+        for i, item in enumerate(items)
+    ]
 
 
 @router.patch("/cases/{case_id}", response_model=CaseOut)
@@ -49,16 +168,80 @@ def admin_update_case_status(
 
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
+        if case_archive.is_archived(db, case_id):
+            raise HTTPException(status_code=409, detail="Case is archived")
         raise HTTPException(status_code=404, detail="Case not found")
 
+    old_status = c.status
     c.status = data.status
-    db.add(
-        CaseHistory(
-            case_id=case_id,
-            status=data.status,
-            comment=f"[ADMIN] {data.comment or 'Зміна статусу'}",
-        )
-    )
+    case_stats.on_status_changed(db, c, old_status)
+    history_writer.record(db, c, *_admin_event(data.comment))
     db.commit()
     db.refresh(c)
     return c
+
+
+@router.get("/stats", response_model=CaseStatsOut)
+def admin_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _admin_only(current_user)
+    # тільки зведена таблиця case_stats: O(кількість груп), а не O(кількість справ)
+    return case_stats.summary(db)
+
+
+# =======================
+# ДІАГНОСТИКА: профілі запитів і пам'ять
+# =======================
+@router.get("/profiles")
+def admin_list_profiles(current_user: User = Depends(get_current_user)):
+    _admin_only(current_user)
+    return profiler.list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def admin_get_profile(profile_id: str, current_user: User = Depends(get_current_user)):
+    _admin_only(current_user)
+    path = profiler.profile_path(profile_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # відкривається в https://www.speedscope.app
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@router.get("/memory")
+def admin_memory_snapshot(
+    top: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+):
+    _admin_only(current_user)
+    return profiler.memory_snapshot(top)
+
+
+@router.delete("/memory")
+def admin_stop_memory_tracing(current_user: User = Depends(get_current_user)):
+    _admin_only(current_user)
+    profiler.stop_memory_tracing()
+    return {"tracing": False}
+
+
+# =======================
+# ТРЕЙСИ (локальний експортер)
+# =======================
+@router.get("/traces")
+def admin_list_traces(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+):
+    _admin_only(current_user)
+    return tracing.recent_traces(limit)
+
+
+@router.get("/traces/{trace_id}")
+def admin_get_trace(trace_id: str, current_user: User = Depends(get_current_user)):
+    _admin_only(current_user)
+    spans = tracing.trace_spans(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return spans
@@ -2,7 +2,7 @@ import re
 from io import BytesIO
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
@@ -16,7 +16,9 @@ from app.schemas.ai import (
     AskRequest,
     AskResponse,
 )
-from app.services.ai_client import generate_text
+from app.services import idempotency
+from app.services.ai_client import generate_or_fallback, generate_text
+from app.services.benefit_context import DEGRADED_HEADER, benefit_context, fallback_answer
 from app.services.pdf_service import application_text_to_pdf_bytes
 
 router = APIRouter(prefix="/ai", tags=["ai"])
@@ -107,7 +109,11 @@ def generate_application_pdf(
     data: GenerateApplicationRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    idem: idempotency.Idempotency = Depends(idempotency.idempotency),
 ):
+    if idem.replay:
+        return idem.replay.file_response()
+
     benefit = db.query(Benefit).filter(Benefit.id == data.benefit_id).first()
     if not benefit:
         raise HTTPException(status_code=404, detail="Benefit not found")
@@ -120,30 +126,25 @@ def generate_application_pdf(
     slug = slugify_filename(benefit.title)
     today = date.today().isoformat()
     filename = f"zayava_{slug}_{today}.pdf"
+    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
+
+    idem.complete(
+        db, idem.save_file(pdf_bytes, ".pdf"),
+        headers={**headers, "Content-Type": "application/pdf"},
+    )
+    db.commit()
 
     return StreamingResponse(
         BytesIO(pdf_bytes),
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename=\"{filename}\"'},
-    )
-
-
-def _benefit_context(b: Benefit) -> str:
-    docs = [x.strip() for x in (b.required_documents or "").split("\n") if x.strip()]
-    statuses = [x.strip() for x in (b.eligible_statuses or "").split(",") if x.strip()]
-    return (
-        f"Назва: {b.title}\n"
-        f"Категорія: {b.category}\n"
-        f"Опис: {b.description}\n"
-        f"Куди звертатись: {b.authority}\n"
-        f"Хто має право: {', '.join(statuses) if statuses else '—'}\n"
-        f"Документи: {', '.join(docs) if docs else '—'}\n"
+        headers=headers,
     )
 
 
 @router.post("/ask", response_model=AskResponse)
 def ask(
     data: AskRequest,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -161,7 +162,7 @@ def ask(
     ranked = sorted(benefits, key=score, reverse=True)
     top = [b for b in ranked[:5] if score(b) > 0] or ranked[:3]
 
-    context = "\n---\n".join(_benefit_context(b) for b in top)
+    context = "\n---\n".join(benefit_context(b) for b in top)
 
     prompt = (
         "Ти консультант для ветеранів та їх сімей щодо соціальних гарантій.\n"
@@ -173,5 +174,7 @@ def ask(
         f"Регіон: {getattr(current_user, 'region', '')}\n"
     )
 
-    answer = generate_text(prompt)
+    answer, degraded = generate_or_fallback(prompt, lambda: fallback_answer(top))
+    if degraded:
+        response.headers[DEGRADED_HEADER] = "1"
     return AskResponse(answer=answer)
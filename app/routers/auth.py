@@ -31,7 +31,7 @@ def register(data: RegisterRequest, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(user)
 
-    token = create_access_token(subject=str(user.id))
+    token = create_access_token(subject=str(user.id), role=user.role)
     return TokenResponse(access_token=token)
 
 @router.post("/login", response_model=TokenResponse)
@@ -40,5 +40,5 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
     if not user or not verify_password(data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    token = create_access_token(subject=str(user.id))
+    token = create_access_token(subject=str(user.id), role=user.role)
     return TokenResponse(access_token=token)
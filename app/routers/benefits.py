@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
 from app.models.benefit import Benefit
 from app.schemas.benefit import BenefitCreate, BenefitUpdate, BenefitOut
+from app.schemas.rows import BenefitRow, columns
 from app.core.deps import get_current_user, require_admin
 from app.models.user import User
-from app.services.ai_client import generate_text
+from app.services.ai_client import generate_or_fallback
+from app.services.benefit_context import DEGRADED_HEADER, fallback_answer
 
 router = APIRouter(prefix="/benefits", tags=["benefits"])
 
@@ -24,12 +27,21 @@ def _to_out(b: Benefit) -> BenefitOut:
 
 @router.get("", response_model=List[BenefitOut])
 def list_benefits(db: Session = Depends(get_db)):
-    items = db.query(Benefit).order_by(Benefit.id.desc()).all()
-    return [_to_out(x) for x in items]
+    rows = db.query(*columns(Benefit, BenefitRow)).order_by(Benefit.id.desc())
+    return ORJSONResponse([
+        BenefitRow(
+            title, category, description, authority,
+            [x for x in required_documents.split("\n") if x.strip()],
+            [x for x in eligible_statuses.split(",") if x.strip()],
+            benefit_id,
+        )
+        for title, category, description, authority, required_documents, eligible_statuses, benefit_id in rows
+    ])
 
 @router.get("/{benefit_id}/explain")
 def explain_benefit(
     benefit_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -59,7 +71,9 @@ def explain_benefit(
         f"- Документи: {', '.join(docs) if docs else '—'}\n"
     )
 
-    text = generate_text(prompt)
+    text, degraded = generate_or_fallback(prompt, lambda: fallback_answer([benefit]))
+    if degraded:
+        response.headers[DEGRADED_HEADER] = "1"
     return {"explanation": text}
 
 
@@ -4,11 +4,14 @@ from pathlib import Path
 import mimetypes
 import shutil
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse, FileResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core import tracing
 from app.core.deps import get_current_user
+from app.core.tracing import TracedFileResponse
 from app.db.session import get_db
 
 from app.models.user import User
@@ -17,6 +20,8 @@ from app.models.case import Case
 from app.models.case_document import CaseDocument
 from app.models.case_history import CaseHistory
 from app.models.case_artifact import CaseArtifact
+from app.models.history_event import HistoryEvent, render as render_history
+from app.models.status import CaseStatus
 
 from app.schemas.case import CaseCreate, CaseOut, CaseUpdate
 from app.schemas.case_ai import CaseAskRequest, CaseAskResponse
@@ -24,20 +29,32 @@ from app.schemas.case_artifact import CaseArtifactOut
 from app.schemas.case_document import (
     CaseDocumentOut,
     CaseDocumentUpdate,
+    CaseDocumentBulkItem,
     ALLOWED_DOC_STATUSES,
 )
-from app.schemas.case_progress import CaseProgressOut
+from app.schemas.case_progress import CaseProgressOut, CaseWithProgressOut
+from app.schemas.case_history import CaseHistoryOut
+from app.schemas.rows import (
+    CaseDocumentRow,
+    CaseHistoryRow,
+    CaseRow,
+    CaseWithProgressRow,
+    columns,
+)
 
-from app.services.ai_client import generate_text
+from app.services import (
+    case_archive, case_stats, dossier_service, events, history_writer, idempotency, moderation_queue, storage_service,
+)
+from app.services.ai_client import generate_or_fallback, generate_text
+from app.services.benefit_context import DEGRADED_HEADER, fallback_answer
+from app.services.case_archive import ARCHIVE, HOT, CaseTables
 from app.services.pdf_service import application_text_to_pdf_bytes
+from app.services.storage_service import UPLOADS_DIR
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-UPLOADS_DIR = BASE_DIR / "uploads"
-UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
-
 MAX_UPLOAD_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB
+MAX_PROGRESS_BATCH = 200
 
 ALLOWED_MIME_TYPES = {
     "application/pdf",
@@ -47,6 +64,16 @@ ALLOWED_MIME_TYPES = {
 
 ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
 
+# проєкції для списків (порядок = поля схем, див. app.schemas.rows)
+_CASE_COLUMNS = {t.case: columns(t.case, CaseRow) for t in (HOT, ARCHIVE)}
+_DOCUMENT_COLUMNS = {t.document: columns(t.document, CaseDocumentRow) for t in (HOT, ARCHIVE)}
+# історія: comment збирається з event/params при читанні (app/models/history_event.py)
+_HISTORY_COLUMNS = {
+    t.history: [t.history.id, t.history.case_id, t.history.status, t.history.event, t.history.params,
+                t.history.created_at]
+    for t in (HOT, ARCHIVE)
+}
+
 def _get_extension(filename: str) -> str:
     return Path(filename or "").suffix.lower()
 
@@ -97,15 +124,30 @@ def _ensure_case_access(c: Case, current_user: User) -> None:
         raise HTTPException(status_code=403, detail="Not allowed")
 
 
-def _recalc_case_status(db: Session, case_id: int) -> str:
-    docs = db.query(CaseDocument).filter(CaseDocument.case_id == case_id).all()
-    total = len(docs)
+def _get_case(db: Session, case_id: int, current_user: User) -> tuple[Case, CaseTables]:
+    """Справа для читання — з гарячих таблиць або з архіву; другим — її таблиці."""
+    c, tables = case_archive.find_case(db, case_id)
+    if not c:
+        raise HTTPException(status_code=404, detail="Case not found")
+    _ensure_case_access(c, current_user)
+    return c, tables
+
+
+def _case_missing(db: Session, case_id: int) -> HTTPException:
+    """Справи нема серед гарячих: архівну не змінюють (409), інакше 404."""
+    if case_archive.is_archived(db, case_id):
+        return HTTPException(status_code=409, detail="Case is archived")
+    return HTTPException(status_code=404, detail="Case not found")
+
+
+def _case_status_from_docs(statuses: list[str]) -> str:
+    total = len(statuses)
     if total == 0:
         return "draft"
 
-    required = sum(1 for d in docs if d.status == "required")
-    rejected = sum(1 for d in docs if d.status == "rejected")
-    approved = sum(1 for d in docs if d.status == "approved")
+    required = sum(1 for x in statuses if x == "required")
+    rejected = sum(1 for x in statuses if x == "rejected")
+    approved = sum(1 for x in statuses if x == "approved")
 
     if approved == total:
         return "done"
@@ -116,6 +158,65 @@ def _recalc_case_status(db: Session, case_id: int) -> str:
     return "draft"
 
 
+def _recalc_case_status(db: Session, case_id: int) -> str:
+    # саме сутності (не колонки): autoflush вимкнено, а зміни документа ще в пам'яті
+    docs = db.query(CaseDocument).filter(CaseDocument.case_id == case_id).all()
+    return _case_status_from_docs([d.status for d in docs])
+
+
+def _progress_from_counts(case_id: int, counts: dict[str, int]) -> CaseProgressOut:
+    total = sum(counts.values())
+    approved = counts.get("approved", 0)
+    required = counts.get("required", 0)
+
+    return CaseProgressOut(
+        case_id=case_id,
+        total=total,
+        approved=approved,
+        uploaded=counts.get("uploaded", 0),
+        rejected=counts.get("rejected", 0),
+        required=required,
+        percent=int(round((approved / total) * 100)) if total > 0 else 0,
+        is_ready_to_submit=(required == 0) and (total > 0),
+        is_ready_for_approval=(approved == total) and (total > 0),
+    )
+
+
+def _progress_for_cases(
+    db: Session, case_ids: list[int], current_user: User, tables: CaseTables = HOT
+) -> dict[int, CaseProgressOut]:
+    """
+    Прогрес для багатьох справ одним GROUP BY case_id, status.
+    Доступ перевіряється в тому ж запиті: чужі/неіснуючі справи просто не повертаються.
+    """
+    case, doc = tables.case, tables.document
+    q = (
+        db.query(case.id, doc.status, func.count(doc.id))
+        .outerjoin(doc, doc.case_id == case.id)
+        .filter(case.id.in_(case_ids))
+    )
+    if getattr(current_user, "role", None) != "admin":
+        q = q.filter(case.user_id == current_user.id)
+
+    counts: dict[int, dict[str, int]] = {}
+    for case_id, doc_status, n in q.group_by(case.id, doc.status).all():
+        per_case = counts.setdefault(case_id, {})
+        if doc_status is not None:
+            per_case[doc_status] = n
+
+    return {case_id: _progress_from_counts(case_id, c) for case_id, c in counts.items()}
+
+
+def _parse_ids(raw: str) -> list[int]:
+    try:
+        ids = [int(x) for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(ids) > MAX_PROGRESS_BATCH:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {MAX_PROGRESS_BATCH})")
+    return list(dict.fromkeys(ids))
+
+
 # =======================
 # CREATE CASE
 # =======================
@@ -124,7 +225,15 @@ def create_case(
     data: CaseCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    idem: idempotency.Idempotency = Depends(idempotency.idempotency),
 ):
+    if idem.replay:
+        # повтор з тим самим Idempotency-Key — та сама справа, без дублікатів
+        c = db.get(Case, idem.replay.object_id("case"))
+        if not c:
+            raise HTTPException(status_code=404, detail="Case not found")
+        return c
+
     benefit = db.query(Benefit).filter(Benefit.id == data.benefit_id).first()
     if not benefit:
         raise HTTPException(status_code=404, detail="Benefit not found")
@@ -148,12 +257,14 @@ def create_case(
     db.add(c)
     db.flush()
     db.refresh(c)
+    case_stats.on_case_created(db, c, current_user.region)
 
     docs = [x.strip() for x in (benefit.required_documents or "").split("\n") if x.strip()]
     for t in docs:
         db.add(CaseDocument(case_id=c.id, title=t, status="required"))
 
-    db.add(CaseHistory(case_id=c.id, status="draft", comment="Справу створено"))
+    history_writer.record(db, c, HistoryEvent.CASE_CREATED)
+    idem.complete(db, f"case:{c.id}")
 
     db.commit()
     db.refresh(c)
@@ -163,15 +274,75 @@ def create_case(
 # =======================
 # LIST CASES
 # =======================
-@router.get("", response_model=list[CaseOut])
+@router.get("", response_model=list[CaseWithProgressOut], response_model_exclude_unset=True)
 def list_cases(
+    with_progress: bool = False,
+    include_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    q = db.query(Case)
-    if getattr(current_user, "role", None) != "admin":
-        q = q.filter(Case.user_id == current_user.id)
-    return q.order_by(Case.id.desc()).all()
+    # архівні справи (case_archive) — лише на явний запит
+    sources = (HOT, ARCHIVE) if include_archived else (HOT,)
+    is_admin = getattr(current_user, "role", None) == "admin"
+
+    # швидкий шлях: лише колонки схеми, без ORM-об'єктів і валідації Pydantic
+    if not with_progress:
+        rows = []
+        for t in sources:
+            q = db.query(*_CASE_COLUMNS[t.case])
+            if not is_admin:
+                q = q.filter(t.case.user_id == current_user.id)
+            rows.extend(q.order_by(t.case.id.desc()))
+        if include_archived:
+            rows.sort(key=lambda r: r[0], reverse=True)
+        return ORJSONResponse([CaseRow(*r) for r in rows])
+
+    # справи + лічильники документів одним запитом (на кожне джерело)
+    rows = []
+    for t in sources:
+        q = (
+            db.query(*_CASE_COLUMNS[t.case], t.document.status, func.count(t.document.id))
+            .outerjoin(t.document, t.document.case_id == t.case.id)
+        )
+        if not is_admin:
+            q = q.filter(t.case.user_id == current_user.id)
+        rows.extend(q.group_by(t.case.id, t.document.status).order_by(t.case.id.desc()))
+    if include_archived:
+        rows.sort(key=lambda r: r[0], reverse=True)
+
+    cases: dict[int, tuple] = {}
+    counts: dict[int, dict[str, int]] = {}
+    n_cols = len(_CASE_COLUMNS[Case])
+    for row in rows:
+        case_id, doc_status, n = row[0], row[n_cols], row[n_cols + 1]
+        cases[case_id] = row[:n_cols]
+        per_case = counts.setdefault(case_id, {})
+        if doc_status is not None:
+            per_case[doc_status] = n
+
+    return ORJSONResponse([
+        CaseWithProgressRow(*cols, progress=_progress_from_counts(case_id, counts[case_id]).model_dump())
+        for case_id, cols in cases.items()
+    ])
+
+
+# =======================
+# PROGRESS FOR MANY CASES ✅ GET /cases/progress?ids=1,2,3
+# =======================
+@router.get("/progress", response_model=list[CaseProgressOut])
+def get_cases_progress(
+    ids: str = Query(..., description="Comma-separated case ids"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    case_ids = _parse_ids(ids)
+    if not case_ids:
+        return []
+    progress = _progress_for_cases(db, case_ids, current_user)
+    missing = [x for x in case_ids if x not in progress]
+    if missing:
+        progress.update(_progress_for_cases(db, missing, current_user, ARCHIVE))
+    return [progress[x] for x in case_ids if x in progress]
 
 
 # =======================
@@ -183,10 +354,7 @@ def get_case(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
+    c, t = _get_case(db, case_id, current_user)
     return c
 
 
@@ -202,11 +370,16 @@ def update_case(
 ):
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
+        raise _case_missing(db, case_id)
     _ensure_case_access(c, current_user)
 
+    if data.status is not None and data.status not in CaseStatus.values:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {data.status}")
+
+    old_status = c.status
     if data.status is not None:
         c.status = data.status
+        case_stats.on_status_changed(db, c, old_status)
 
     if getattr(data, "title", None) is not None:
         c.title = (data.title or "").strip()
@@ -216,7 +389,7 @@ def update_case(
     if getattr(data, "note", None) is not None:
         c.note = data.note or ""
 
-    db.add(CaseHistory(case_id=c.id, status=c.status, comment="Оновлення справи"))
+    history_writer.record(db, c, HistoryEvent.CASE_UPDATED)
     db.commit()
     db.refresh(c)
     return c
@@ -231,24 +404,19 @@ def list_documents(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
+    c, t = _get_case(db, case_id, current_user)
 
-    docs = (
-        db.query(CaseDocument)
-        .filter(CaseDocument.case_id == case_id)
-        .order_by(CaseDocument.id)
-        .all()
+    rows = (
+        db.query(*_DOCUMENT_COLUMNS[t.document])
+        .filter(t.document.case_id == case_id)
+        .order_by(t.document.id)
     )
 
     # ✅ якщо в схемі comment: str (не optional) — прибираємо 500
-    for d in docs:
-        if getattr(d, "comment", None) is None:
-            d.comment = ""  # type: ignore[attr-defined]
-
-    return docs
+    return ORJSONResponse([
+        CaseDocumentRow(doc_id, cid, title, status, "" if comment is None else comment, file_name)
+        for doc_id, cid, title, status, comment, file_name in rows
+    ])
 
 
 # =======================
@@ -264,7 +432,7 @@ def update_case_document(
 ):
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
+        raise _case_missing(db, case_id)
     _ensure_case_access(c, current_user)
 
     d = (
@@ -278,29 +446,23 @@ def update_case_document(
     if data.status is not None:
         if data.status not in ALLOWED_DOC_STATUSES:
             raise HTTPException(status_code=400, detail=f"Invalid status: {data.status}")
+        if moderation_queue.held_by_other(d, current_user.id):
+            raise HTTPException(status_code=409, detail="Document is claimed by another moderator")
+        if data.status != d.status:
+            moderation_queue.clear_lease(d)
         d.status = data.status
 
     if getattr(data, "comment", None) is not None:
         d.comment = data.comment
 
-    db.add(
-        CaseHistory(
-            case_id=case_id,
-            status=c.status,
-            comment=f"Оновлено документ: {d.title} → {d.status}",
-        )
-    )
+    history_writer.record(db, c, HistoryEvent.DOCUMENT_UPDATED, d.title, d.status)
 
     new_status = _recalc_case_status(db, case_id)
     if c.status != new_status:
+        old_status = c.status
         c.status = new_status
-        db.add(
-            CaseHistory(
-                case_id=case_id,
-                status=new_status,
-                comment=f"[AUTO] Статус справи оновлено автоматично → {new_status}",
-            )
-        )
+        case_stats.on_status_changed(db, c, old_status)
+        history_writer.record(db, c, HistoryEvent.STATUS_AUTO)
 
     db.commit()
     db.refresh(d)
@@ -311,6 +473,75 @@ def update_case_document(
     return d
 
 
+# =======================
+# CASE DOCUMENTS (BULK UPDATE) ✅ PATCH /cases/{case_id}/documents:bulk
+# =======================
+@router.patch("/{case_id}/documents:bulk", response_model=list[CaseDocumentOut])
+def bulk_update_case_documents(
+    case_id: int,
+    items: list[CaseDocumentBulkItem],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Рецензія багатьох документів: одна транзакція, один перерахунок статусу справи."""
+    c = db.query(Case).filter(Case.id == case_id).first()
+    if not c:
+        raise _case_missing(db, case_id)
+    _ensure_case_access(c, current_user)
+
+    docs = (
+        db.query(CaseDocument)
+        .filter(CaseDocument.case_id == case_id)
+        .order_by(CaseDocument.id)
+        .all()
+    )
+    by_id = {d.id: d for d in docs}
+
+    for item in items:
+        if item.doc_id not in by_id:
+            raise HTTPException(status_code=404, detail=f"Document not found: {item.doc_id}")
+        if item.status is not None and item.status not in ALLOWED_DOC_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {item.status}")
+        if item.status is not None and moderation_queue.held_by_other(by_id[item.doc_id], current_user.id):
+            raise HTTPException(
+                status_code=409, detail=f"Document is claimed by another moderator: {item.doc_id}"
+            )
+
+    history = []
+    for item in items:
+        d = by_id[item.doc_id]
+        if item.status is not None:
+            if item.status != d.status:
+                moderation_queue.clear_lease(d)
+            d.status = item.status
+        if item.comment is not None:
+            d.comment = item.comment
+        history.append(
+            history_writer.row(case_id, c.status, HistoryEvent.DOCUMENT_UPDATED, d.title, d.status)
+        )
+    if history:
+        history_writer.record_many(db, history)
+        events.queue_case_event(db, case_id, c.user_id, c.status, {"documents", "progress"})
+
+    new_status = _case_status_from_docs([d.status for d in docs])
+    if c.status != new_status:
+        old_status = c.status
+        c.status = new_status
+        case_stats.on_status_changed(db, c, old_status)
+        history_writer.record(db, c, HistoryEvent.STATUS_AUTO)
+
+    db.commit()
+
+    updated = []
+    for item in items:
+        d = by_id[item.doc_id]
+        if getattr(d, "comment", None) is None:
+            d.comment = ""  # type: ignore[attr-defined]
+        if d not in updated:
+            updated.append(d)
+    return updated
+
+
 # =======================
 # CASE DOCUMENTS (UPLOAD FILE) ✅ POST /cases/{case_id}/documents/{doc_id}/upload
 # =======================
@@ -324,7 +555,7 @@ def upload_case_document(
 ):
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
+        raise _case_missing(db, case_id)
     _ensure_case_access(c, current_user)
 
     d = (
@@ -339,6 +570,11 @@ def upload_case_document(
     _validate_upload_file(file)
     ext = _get_extension(file.filename or "")
 
+    # ✅ квота: лічильники власника справи (старий файл при повторному завантаженні не рахується)
+    old_path = d.file_path
+    old_size = (d.size_bytes or 0) if old_path else 0
+    allowance = storage_service.upload_allowance(db, c.user_id, case_id, replacing=old_size)
+
     case_dir = UPLOADS_DIR / f"case_{case_id}"
     case_dir.mkdir(parents=True, exist_ok=True)
 
@@ -351,7 +587,7 @@ def upload_case_document(
     first_chunk = b""
 
     try:
-        with file_path.open("wb") as buffer:
+        with tracing.span("file.write", **{"file.path": str(file_path)}) as io_span, file_path.open("wb") as buffer:
             while True:
                 chunk = file.file.read(1024 * 1024)  # 1MB
                 if not chunk:
@@ -366,19 +602,22 @@ def upload_case_document(
                         status_code=400,
                         detail=f"Файл занадто великий. Максимум {MAX_UPLOAD_SIZE_BYTES // (1024*1024)} MB",
                     )
+                if size > allowance:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Перевищено ліміт сховища для файлів. Видаліть непотрібні файли",
+                    )
 
                 buffer.write(chunk)
+            if io_span is not None:
+                io_span.set_attribute("file.size", size)
 
         # сигнатура (магічні байти)
         _validate_magic_bytes(ext, first_chunk)
 
     except HTTPException:
         # якщо зловили валідацію — прибрати частково записаний файл
-        if file_path.exists():
-            try:
-                file_path.unlink()
-            except Exception:
-                pass
+        storage_service.remove_file(file_path)
         raise
 
     # ✅ update db (обережно з полями, якщо їх нема у твоїй БД)
@@ -392,36 +631,45 @@ def upload_case_document(
         d.size_bytes = size
 
     d.status = "uploaded"
-
-    db.add(
-        CaseHistory(
-            case_id=case_id,
-            status=c.status,
-            comment=f"Завантажено файл для документа: {d.title}",
+    if not storage_service.charge_usage(db, c.user_id, case_id, size - old_size):
+        # паралельні завантаження вже вибрали квоту, поки цей файл писався
+        db.rollback()
+        storage_service.remove_file(file_path)
+        raise HTTPException(
+            status_code=400,
+            detail="Перевищено ліміт сховища для файлів. Видаліть непотрібні файли",
         )
-    )
+
+    history_writer.record(db, c, HistoryEvent.FILE_UPLOADED, d.title)
 
     new_status = _recalc_case_status(db, case_id)
     if c.status != new_status:
+        old_status = c.status
         c.status = new_status
-        db.add(
-            CaseHistory(
-                case_id=case_id,
-                status=new_status,
-                comment=f"[AUTO] Статус справи → {new_status}",
-            )
-        )
+        case_stats.on_status_changed(db, c, old_status)
+        history_writer.record(db, c, HistoryEvent.STATUS_AUTO_SHORT)
+
+    try:
+        db.commit()
+    except Exception:
+        # коміт не пройшов — новий файл нікому не належить
+        db.rollback()
+        storage_service.remove_file(file_path)
+        raise
+
+    # старий файл більше не потрібен (повторне завантаження)
+    if old_path and old_path != d.file_path:
+        storage_service.remove_file(old_path)
 
-    db.commit()
     db.refresh(d)
     return d
 
 
 # =======================
-# CASE DOCUMENTS (DOWNLOAD FILE) ✅ GET /cases/{case_id}/documents/{doc_id}/download
+# CASE DOCUMENTS (DELETE FILE) ✅ DELETE /cases/{case_id}/documents/{doc_id}/file
 # =======================
-@router.get("/{case_id}/documents/{doc_id}/download")
-def download_case_document(
+@router.delete("/{case_id}/documents/{doc_id}/file", response_model=CaseDocumentOut)
+def delete_case_document_file(
     case_id: int,
     doc_id: int,
     db: Session = Depends(get_db),
@@ -429,7 +677,7 @@ def download_case_document(
 ):
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
+        raise _case_missing(db, case_id)
     _ensure_case_access(c, current_user)
 
     d = (
@@ -443,6 +691,56 @@ def download_case_document(
     if not getattr(d, "file_path", None):
         raise HTTPException(status_code=404, detail="File not uploaded")
 
+    old_path = d.file_path
+    storage_service.add_usage(db, c.user_id, case_id, -(d.size_bytes or 0))
+
+    d.file_name = None
+    d.file_path = None
+    d.content_type = None
+    d.size_bytes = None
+    d.status = "required"
+
+    history_writer.record(db, c, HistoryEvent.FILE_DELETED, d.title)
+
+    new_status = _recalc_case_status(db, case_id)
+    if c.status != new_status:
+        old_status = c.status
+        c.status = new_status
+        case_stats.on_status_changed(db, c, old_status)
+        history_writer.record(db, c, HistoryEvent.STATUS_AUTO_SHORT)
+
+    db.commit()
+    storage_service.remove_file(old_path)
+
+    db.refresh(d)
+    if getattr(d, "comment", None) is None:
+        d.comment = ""  # type: ignore[attr-defined]
+    return d
+
+
+# =======================
+# CASE DOCUMENTS (DOWNLOAD FILE) ✅ GET /cases/{case_id}/documents/{doc_id}/download
+# =======================
+@router.get("/{case_id}/documents/{doc_id}/download")
+def download_case_document(
+    case_id: int,
+    doc_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    c, t = _get_case(db, case_id, current_user)
+
+    d = (
+        db.query(t.document)
+        .filter(t.document.id == doc_id, t.document.case_id == case_id)
+        .first()
+    )
+    if not d:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if not getattr(d, "file_path", None):
+        raise HTTPException(status_code=404, detail="File not uploaded")
+
     path = Path(d.file_path)
     if not path.exists():
         raise HTTPException(status_code=404, detail="File missing on server")
@@ -450,7 +748,7 @@ def download_case_document(
     media_type = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
     filename = getattr(d, "file_name", None) or path.name
 
-    return FileResponse(
+    return TracedFileResponse(
         path=str(path),
         media_type=media_type,
         filename=filename,
@@ -460,23 +758,23 @@ def download_case_document(
 # =======================
 # CASE HISTORY
 # =======================
-@router.get("/{case_id}/history")
+@router.get("/{case_id}/history", response_model=list[CaseHistoryOut])
 def case_history(
     case_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
+    c, t = _get_case(db, case_id, current_user)
 
-    return (
-        db.query(CaseHistory)
-        .filter(CaseHistory.case_id == case_id)
-        .order_by(CaseHistory.created_at.desc())
-        .all()
+    rows = (
+        db.query(*_HISTORY_COLUMNS[t.history])
+        .filter(t.history.case_id == case_id)
+        .order_by(t.history.created_at.desc())
     )
+    return ORJSONResponse([
+        CaseHistoryRow(id_, case_id_, status, render_history(event, params, status), created_at)
+        for id_, case_id_, status, event, params, created_at in rows
+    ])
 
 
 # =======================
@@ -488,35 +786,9 @@ def get_case_progress(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
-
-    docs = db.query(CaseDocument).filter(CaseDocument.case_id == case_id).all()
-
-    total = len(docs)
-    approved = sum(1 for d in docs if d.status == "approved")
-    uploaded = sum(1 for d in docs if d.status == "uploaded")
-    rejected = sum(1 for d in docs if d.status == "rejected")
-    required = sum(1 for d in docs if d.status == "required")
-
-    percent = int(round((approved / total) * 100)) if total > 0 else 0
+    c, t = _get_case(db, case_id, current_user)
 
-    is_ready_to_submit = (required == 0) and (total > 0)
-    is_ready_for_approval = (approved == total) and (total > 0)
-
-    return CaseProgressOut(
-        case_id=case_id,
-        total=total,
-        approved=approved,
-        uploaded=uploaded,
-        rejected=rejected,
-        required=required,
-        percent=percent,
-        is_ready_to_submit=is_ready_to_submit,
-        is_ready_for_approval=is_ready_for_approval,
-    )
+    return _progress_for_cases(db, [case_id], current_user, t)[case_id]
 
 
 # =======================
@@ -526,6 +798,7 @@ def get_case_progress(
 def ask_about_case(
     case_id: int,
     data: CaseAskRequest,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -533,26 +806,23 @@ def ask_about_case(
     if not question:
         raise HTTPException(status_code=400, detail="Empty question")
 
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
+    c, t = _get_case(db, case_id, current_user)
 
     benefit = db.query(Benefit).filter(Benefit.id == c.benefit_id).first()
     if not benefit:
         raise HTTPException(status_code=404, detail="Benefit not found")
 
     docs = (
-        db.query(CaseDocument)
-        .filter(CaseDocument.case_id == case_id)
-        .order_by(CaseDocument.id)
+        db.query(t.document)
+        .filter(t.document.case_id == case_id)
+        .order_by(t.document.id)
         .all()
     )
 
     history = (
-        db.query(CaseHistory)
-        .filter(CaseHistory.case_id == case_id)
-        .order_by(CaseHistory.created_at.desc())
+        db.query(t.history)
+        .filter(t.history.case_id == case_id)
+        .order_by(t.history.created_at.desc())
         .limit(5)
         .all()
     )
@@ -575,7 +845,12 @@ def ask_about_case(
         f"Питання: {question}\n"
     )
 
-    answer = generate_text(prompt)
+    answer, degraded = generate_or_fallback(
+        prompt,
+        lambda: fallback_answer([benefit], note=f"Справа #{c.id}, статус: {c.status}\nДокументи:\n{docs_text}"),
+    )
+    if degraded:
+        response.headers[DEGRADED_HEADER] = "1"
     return CaseAskResponse(answer=answer)
 
 
@@ -588,15 +863,12 @@ def list_case_artifacts(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    c = db.query(Case).filter(Case.id == case_id).first()
-    if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
-    _ensure_case_access(c, current_user)
+    c, t = _get_case(db, case_id, current_user)
 
     return (
-        db.query(CaseArtifact)
-        .filter(CaseArtifact.case_id == case_id)
-        .order_by(CaseArtifact.created_at.desc())
+        db.query(t.artifact)
+        .filter(t.artifact.case_id == case_id)
+        .order_by(t.artifact.created_at.desc())
         .all()
     )
 
@@ -609,10 +881,14 @@ def generate_application_pdf_for_case(
     case_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    idem: idempotency.Idempotency = Depends(idempotency.idempotency),
 ):
+    if idem.replay:
+        return idem.replay.file_response()
+
     c = db.query(Case).filter(Case.id == case_id).first()
     if not c:
-        raise HTTPException(status_code=404, detail="Case not found")
+        raise _case_missing(db, case_id)
     _ensure_case_access(c, current_user)
 
     benefit = db.query(Benefit).filter(Benefit.id == c.benefit_id).first()
@@ -642,12 +918,54 @@ def generate_application_pdf_for_case(
     )
     db.add(artifact)
 
-    db.add(CaseHistory(case_id=c.id, status=c.status, comment="Згенеровано PDF заяви"))
-    db.commit()
+    history_writer.record(db, c, HistoryEvent.PDF_GENERATED)
 
     filename = f"zayava_case_{case_id}_{date.today().isoformat()}.pdf"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    idem.complete(
+        db, idem.save_file(pdf_bytes, ".pdf"),
+        headers={**headers, "Content-Type": "application/pdf"},
+    )
+    db.commit()
+
     return StreamingResponse(
         BytesIO(pdf_bytes),
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers=headers,
+    )
+
+
+# =======================
+# CASE DOSSIER: заява + усі завантажені документи одним PDF
+# =======================
+@router.get("/{case_id}/dossier.pdf")
+def download_case_dossier(
+    case_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    c, t = _get_case(db, case_id, current_user)
+
+    artifact = (
+        db.query(t.artifact)
+        .filter(t.artifact.case_id == case_id, t.artifact.type == "application_pdf")
+        .order_by(t.artifact.id.desc())
+        .first()
+    )
+    if not artifact or not artifact.content_text:
+        raise HTTPException(status_code=404, detail="Application not generated yet")
+
+    docs = (
+        db.query(t.document)
+        .filter(t.document.case_id == case_id)
+        .order_by(t.document.id)
+        .all()
+    )
+
+    path = dossier_service.get_or_build(case_id, artifact.content_text, docs)
+
+    return FileResponse(
+        path=str(path),
+        media_type="application/pdf",
+        filename=f"dossier_case_{case_id}_{date.today().isoformat()}.pdf",
     )
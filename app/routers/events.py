@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user_token_or_query
+from app.db.session import get_db
+from app.models.user import User
+from app.services.events import bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+# =======================
+# CASE CHANGE FEED (SSE) ✅ GET /events/cases?token=...
+# =======================
+@router.get("/cases")
+async def case_events_stream(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_token_or_query),
+):
+    user_id = current_user.id
+    is_admin = getattr(current_user, "role", None) == "admin"
+    # стрім живе довго — не тримаємо з'єднання з БД
+    db.close()
+
+    sub = bus.subscribe(user_id, is_admin)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    evt = await asyncio.wait_for(sub.queue.get(), timeout=settings.events_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: case\ndata: {json.dumps(evt, ensure_ascii=False)}\n\n"
+        finally:
+            bus.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from app.core import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+# =======================
+# PROMETHEUS ✅ GET /metrics
+# =======================
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.deps import require_admin
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.moderation import (
+    ModerationClaimRequest,
+    ModerationItemOut,
+    ModerationReleaseRequest,
+)
+from app.services import moderation_queue
+
+router = APIRouter(prefix="/moderation", tags=["moderation"])
+
+
+@router.get("/queue", response_model=list[ModerationItemOut])
+def moderation_queue_list(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    return moderation_queue.list_pending(db, limit=limit, offset=offset)
+
+
+@router.post("/claim", response_model=list[ModerationItemOut])
+def moderation_claim(
+    data: ModerationClaimRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    return moderation_queue.claim(db, admin.id, limit=data.limit, lease_seconds=data.lease_seconds)
+
+
+@router.get("/mine", response_model=list[ModerationItemOut])
+def moderation_my_claims(
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    return moderation_queue.list_claimed(db, admin.id)
+
+
+@router.post("/release")
+def moderation_release(
+    data: ModerationReleaseRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    released = moderation_queue.release(db, admin.id, data.doc_ids)
+    return {"released": released}
@@ -5,6 +5,7 @@ from app.schemas.user import UserPublic, UserProfileUpdate
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from pydantic import BaseModel
+from app.services import case_stats
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -19,6 +20,7 @@ def update_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    case_stats.on_user_region_changed(db, current_user.id, current_user.region, data.region)
     current_user.full_name = data.full_name
     current_user.region = data.region
     current_user.status = data.status
@@ -38,7 +40,9 @@ def update_me(
     if data.full_name is not None:
         current_user.full_name = data.full_name.strip() or None
     if data.region is not None:
-        current_user.region = data.region.strip() or None
+        new_region = data.region.strip() or None
+        case_stats.on_user_region_changed(db, current_user.id, current_user.region, new_region)
+        current_user.region = new_region
 
     db.commit()
     db.refresh(current_user)
@@ -43,3 +43,8 @@ class CaseOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CaseSearchOut(BaseModel):
+    total: int
+    items: list[CaseOut]
@@ -24,3 +24,7 @@ class CaseDocumentOut(BaseModel):
 class CaseDocumentUpdate(BaseModel):
     status: Optional[CaseDocumentStatus] = None
     comment: Optional[str] = None
+
+
+class CaseDocumentBulkItem(CaseDocumentUpdate):
+    doc_id: int
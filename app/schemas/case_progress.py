@@ -1,5 +1,9 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from app.schemas.case import CaseOut
+
 
 class CaseProgressOut(BaseModel):
     case_id: int
@@ -14,3 +18,8 @@ class CaseProgressOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CaseWithProgressOut(CaseOut):
+    # заповнюється лише для GET /cases?with_progress=true
+    progress: Optional[CaseProgressOut] = None
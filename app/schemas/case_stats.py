@@ -0,0 +1,22 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class BenefitCount(BaseModel):
+    benefit_id: int
+    title: str
+    count: int
+
+
+class WeekCount(BaseModel):
+    week: date
+    count: int
+
+
+class CaseStatsOut(BaseModel):
+    total: int
+    by_status: dict[str, int]
+    by_benefit: list[BenefitCount]
+    by_region: dict[str, int]
+    by_week: list[WeekCount]
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ModerationItemOut(BaseModel):
+    id: int
+    case_id: int
+    title: str
+    status: str
+    file_name: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    claimed_by: Optional[int] = None
+    lease_expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ModerationClaimRequest(BaseModel):
+    limit: int = 10
+    lease_seconds: Optional[int] = None
+
+
+class ModerationReleaseRequest(BaseModel):
+    doc_ids: list[int]
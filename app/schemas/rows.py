@@ -0,0 +1,85 @@
+"""
+Легкі рядки для швидких списків.
+
+Ендпоінти-списки вибирають лише потрібні колонки (кортежі, без ORM-об'єктів),
+складають їх у ці dataclass(slots=True) і віддають ORJSONResponse напряму:
+orjson серіалізує dataclass і datetime сам, без валідації Pydantic.
+
+Поля й порядок збігаються з відповідними *Out-схемами — це перевіряється
+при імпорті, тож відповідь API не може тихо розійтися зі схемою в OpenAPI.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.benefit import BenefitOut
+from app.schemas.case import CaseOut
+from app.schemas.case_document import CaseDocumentOut
+from app.schemas.case_history import CaseHistoryOut
+from app.schemas.case_progress import CaseWithProgressOut
+
+
+@dataclass(slots=True)
+class CaseRow:
+    id: int
+    user_id: int
+    benefit_id: int
+    status: str
+    title: str
+    description: str
+    note: str
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class CaseWithProgressRow(CaseRow):
+    progress: dict | None = None
+
+
+@dataclass(slots=True)
+class CaseDocumentRow:
+    id: int
+    case_id: int
+    title: str
+    status: str
+    comment: str | None
+    file_name: str | None
+
+
+@dataclass(slots=True)
+class CaseHistoryRow:
+    id: int
+    case_id: int
+    status: str
+    comment: str
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class BenefitRow:
+    title: str
+    category: str
+    description: str
+    authority: str
+    required_documents: list[str]
+    eligible_statuses: list[str]
+    id: int
+
+
+def columns(model, row_type) -> list:
+    """Колонки моделі в порядку полів рядка — для db.query(*columns(...))."""
+    return [getattr(model, f.name) for f in fields(row_type)]
+
+
+def _check(row_type, schema: type[BaseModel]) -> None:
+    names = [f.name for f in fields(row_type)]
+    if names != list(schema.model_fields):
+        raise TypeError(f"{row_type.__name__} fields {names} differ from {schema.__name__}")
+
+
+_check(CaseRow, CaseOut)
+_check(CaseWithProgressRow, CaseWithProgressOut)
+_check(CaseDocumentRow, CaseDocumentOut)
+_check(CaseHistoryRow, CaseHistoryOut)
+_check(BenefitRow, BenefitOut)
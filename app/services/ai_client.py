@@ -1,15 +1,212 @@
+"""
+Клієнт LLM із запобіжником (circuit breaker) і дедлайном.
+
+- кожен виклик має таймаут: менше з settings.llm_timeout_seconds і залишку
+  бюджету HTTP-запиту (settings.llm_request_budget_seconds від його початку);
+- запобіжник рахує збої і повільні відповіді у вікні останніх викликів; коли їх
+  частка перевищує поріг — "відкривається" і одразу кидає LLMUnavailable, а через
+  llm_breaker_open_seconds пропускає один пробний виклик (half-open);
+- успішні відповіді кешуються (LRU), щоб під час збою віддати останню відповідь
+  на той самий запит (generate_or_fallback).
+"""
+import hashlib
 import os
-from openai import OpenAI
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable
+
+from app.core import metrics, request_context
+from app.core.config import settings
+from app.core.metrics import instrument_llm
+from app.core.tracing import traced
+
+# клас клієнта; openai (важкий імпорт) підвантажується при першому виклику моделі
+OpenAI = None
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class LLMUnavailable(RuntimeError):
+    """Модель недоступна: запобіжник відкритий, вичерпано дедлайн або виклик упав."""
+
+    def __init__(self, reason: str, retry_after: float | None = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# =======================
+# ЗАПОБІЖНИК
+# =======================
+class CircuitBreaker:
+    def __init__(self, window: int, min_calls: int, failure_ratio: float, open_seconds: float):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True — збій або повільно
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.LLM_CIRCUIT_STATE.set(_STATE_VALUES[state])
+            metrics.LLM_CIRCUIT_TRANSITIONS.labels(state).inc()
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def before_call(self) -> None:
+        """Кидає LLMUnavailable, якщо виклик зараз не можна пропустити."""
+        with self._lock:
+            if self.state == OPEN:
+                left = self._opened_at + self.open_seconds - time.monotonic()
+                if left > 0:
+                    raise LLMUnavailable("circuit_open", retry_after=left)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise LLMUnavailable("circuit_half_open", retry_after=1.0)
+                self._probe_in_flight = True
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio:
+                    self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+
+breaker = CircuitBreaker(
+    window=settings.llm_breaker_window,
+    min_calls=settings.llm_breaker_min_calls,
+    failure_ratio=settings.llm_breaker_failure_ratio,
+    open_seconds=settings.llm_breaker_open_seconds,
+)
 
+
+# =======================
+# КЕШ ВІДПОВІДЕЙ
+# =======================
+class _AnswerCache:
+    def __init__(self, size: int):
+        self.size = size
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+answers = _AnswerCache(settings.llm_fallback_cache_size)
+
+
+def _cache_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+# =======================
+# ВИКЛИК МОДЕЛІ
+# =======================
+def _client_class():
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI as client_class
+
+        OpenAI = client_class
+    return OpenAI
+
+
+def _call_timeout() -> float:
+    """Таймаут виклику з урахуванням того, скільки вже йде HTTP-запит."""
+    timeout = settings.llm_timeout_seconds
+    ctx = request_context.current()
+    if ctx is not None:
+        left = settings.llm_request_budget_seconds - (time.monotonic() - ctx.started)
+        if left < settings.llm_min_call_seconds:
+            raise LLMUnavailable("deadline_exceeded")
+        timeout = min(timeout, left)
+    return timeout
+
+
+@instrument_llm
+@traced("llm.generate_text")
 def generate_text(prompt: str) -> str:
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
+    timeout = _call_timeout()
+    breaker.before_call()
+
+    started = time.monotonic()
+    try:
+        # немає ключа чи SDK — модель так само недоступна: збій для запобіжника і fallback
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        # без повторів SDK: інакше один виклик може тривати кілька таймаутів
+        client = _client_class()(api_key=api_key, timeout=timeout, max_retries=0)
+        resp = client.responses.create(
+            model="gpt-4.1-mini",
+            input=prompt,
+        )
+        text = resp.output_text
+    except Exception as e:
+        breaker.record(failed=True)
+        raise LLMUnavailable(f"provider_error: {type(e).__name__}") from e
+
+    breaker.record(failed=time.monotonic() - started >= settings.llm_breaker_slow_seconds)
+    answers.put(_cache_key(prompt), text)
+    return text
 
-    client = OpenAI(api_key=api_key)
 
-    resp = client.responses.create(
-        model="gpt-4.1-mini",
-        input=prompt,
-    )
-    return resp.output_text
+def generate_or_fallback(prompt: str, fallback: Callable[[], str]) -> tuple[str, bool]:
+    """
+    Відповідь моделі або деградована: остання закешована на цей промпт, інакше fallback().
+    Повертає (текст, degraded).
+    """
+    try:
+        return generate_text(prompt), False
+    except LLMUnavailable:
+        cached = answers.get(_cache_key(prompt))
+        if cached is not None:
+            metrics.LLM_FALLBACKS.labels("cache").inc()
+            return cached, True
+        metrics.LLM_FALLBACKS.labels("template").inc()
+        return fallback(), True
@@ -0,0 +1,32 @@
+"""
+Довідка про гарантії для промптів і шаблонна відповідь без LLM (спільне для
+/ai/ask, /benefits/{id}/explain і /cases/{id}/ask).
+"""
+from app.models.benefit import Benefit
+
+# відповідь зібрана без моделі (кеш або шаблон); схема відповіді та сама
+DEGRADED_HEADER = "X-Degraded"
+
+
+def benefit_context(b: Benefit) -> str:
+    docs = [x.strip() for x in (b.required_documents or "").split("\n") if x.strip()]
+    statuses = [x.strip() for x in (b.eligible_statuses or "").split(",") if x.strip()]
+    return (
+        f"Назва: {b.title}\n"
+        f"Категорія: {b.category}\n"
+        f"Опис: {b.description}\n"
+        f"Куди звертатись: {b.authority}\n"
+        f"Хто має право: {', '.join(statuses) if statuses else '—'}\n"
+        f"Документи: {', '.join(docs) if docs else '—'}\n"
+    )
+
+
+def fallback_answer(benefits: list[Benefit], note: str = "") -> str:
+    """Шаблонна відповідь, коли LLM недоступна: довідка з каталогу гарантій."""
+    context = "\n---\n".join(benefit_context(b) for b in benefits) or "—"
+    return (
+        "AI-консультант тимчасово недоступний, спробуйте повторити запит пізніше.\n"
+        "Нижче — довідкова інформація з каталогу гарантій.\n\n"
+        + (f"{note}\n\n" if note else "")
+        + context
+    )
@@ -0,0 +1,171 @@
+"""
+Архів закритих справ.
+
+Справи зі статусом done / rejected, які не змінювались довше за settings.archive_after_days
+(жодного запису в історії новішого за поріг), переносяться разом з документами, історією
+й артефактами в таблиці *_archive (app/models/case_archive.py). Гарячі таблиці та їхні
+індекси лишаються малими, а читання однієї справи (/cases/{id}/...) прозоро бере її
+з архіву (find_case); змінювати архівну справу не можна (409).
+
+Перенос робить фоновий потік (start_worker, з lifespan) або `python manage.py archive`:
+порції по archive_batch_size справ, кожна — одна коротка транзакція INSERT ... SELECT
+у архів + DELETE з гарячих таблиць, між порціями пауза. Файли документів лишаються
+на місці (GC сховища обходить лише гарячі справи), лічильники сховища і case_stats
+не змінюються — архівна справа рахується так само.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import DateTime, delete, exists, insert, literal, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import engine
+from app.models.case import Case
+from app.models.case_archive import ArchivedCase, ArchivedCaseArtifact, ArchivedCaseDocument, ArchivedCaseHistory
+from app.models.case_artifact import CaseArtifact
+from app.models.case_document import CaseDocument
+from app.models.case_history import CaseHistory
+from app.services import case_search
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_STATUSES = ("done", "rejected")
+
+
+class CaseTables(NamedTuple):
+    """Моделі, в яких лежить справа: гарячі або архівні."""
+
+    case: type
+    document: type
+    history: type
+    artifact: type
+    archived: bool
+
+
+HOT = CaseTables(Case, CaseDocument, CaseHistory, CaseArtifact, False)
+ARCHIVE = CaseTables(ArchivedCase, ArchivedCaseDocument, ArchivedCaseHistory, ArchivedCaseArtifact, True)
+
+# пари (гаряча, архівна) у порядку вставки; видаляємо у зворотному (спершу дочірні)
+_PAIRS = list(zip(HOT[:4], ARCHIVE[:4]))
+
+
+def _check() -> None:
+    for hot, archive in _PAIRS:
+        missing = set(hot.__table__.c.keys()) - set(archive.__table__.c.keys())
+        if missing:
+            raise TypeError(f"{archive.__tablename__} lacks columns of {hot.__tablename__}: {sorted(missing)}")
+
+
+_check()
+
+
+# =======================
+# ЧИТАННЯ
+# =======================
+def find_case(db: Session, case_id: int) -> tuple[Case | ArchivedCase | None, CaseTables]:
+    """Справа з гарячої таблиці, інакше з архіву; другим — де шукати її дані."""
+    c = db.get(Case, case_id)
+    if c is not None:
+        return c, HOT
+    archived = db.get(ArchivedCase, case_id)
+    if archived is not None:
+        return archived, ARCHIVE
+    return None, HOT
+
+
+def is_archived(db: Session, case_id: int) -> bool:
+    return db.query(exists().where(ArchivedCase.id == case_id)).scalar()
+
+
+# =======================
+# ПЕРЕНОС
+# =======================
+def candidates(conn: Connection, cutoff: datetime, limit: int) -> list[int]:
+    """Закриті справи без змін після cutoff (історія — по індексу case_history.case_id)."""
+    recent = exists().where(CaseHistory.case_id == Case.id, CaseHistory.created_at >= cutoff)
+    return list(conn.execute(
+        select(Case.id)
+        .where(Case.status.in_(ARCHIVE_STATUSES), Case.created_at < cutoff, ~recent)
+        .order_by(Case.id)
+        .limit(limit)
+    ).scalars())
+
+
+def move_cases(conn: Connection, case_ids: list[int]) -> None:
+    """Переносить справи з усіма даними в архів (в транзакції conn)."""
+    now = datetime.utcnow()
+    for hot, archive in _PAIRS:
+        table = hot.__table__
+        key = table.c.id if hot is Case else table.c.case_id
+        names = list(table.c.keys())
+        source = [table.c[n] for n in names]
+        if hot is Case:
+            names.append("archived_at")
+            source.append(literal(now, DateTime))
+        conn.execute(insert(archive).from_select(names, select(*source).where(key.in_(case_ids))))
+    for hot, _ in reversed(_PAIRS):
+        key = hot.__table__.c.id if hot is Case else hot.__table__.c.case_id
+        conn.execute(delete(hot).where(key.in_(case_ids)))
+    # справ уже нема в cases — reindex прибирає їх з повнотекстового індексу
+    case_search.reindex(conn, case_ids)
+
+
+def archive_batch(bind: Engine, batch_size: int | None = None, now: datetime | None = None) -> int:
+    """Одна порція в одній транзакції; повертає кількість перенесених справ."""
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = (now or datetime.utcnow()) - timedelta(days=settings.archive_after_days)
+    with bind.begin() as conn:
+        case_ids = candidates(conn, cutoff, batch_size)
+        if case_ids:
+            move_cases(conn, case_ids)
+    if case_ids:
+        metrics.CASES_ARCHIVED.inc(len(case_ids))
+    return len(case_ids)
+
+
+def archive_all(bind: Engine, batch_size: int | None = None, stop: threading.Event | None = None) -> int:
+    """Порції, доки є що переносити (або до stop); повертає загальну кількість."""
+    total = 0
+    while not (stop and stop.is_set()):
+        moved = archive_batch(bind, batch_size)
+        if not moved:
+            break
+        total += moved
+        time.sleep(settings.archive_pause_seconds)
+    if total:
+        logger.info("case archive: moved %s closed cases", total)
+    return total
+
+
+# =======================
+# ФОНОВИЙ ПОТІК
+# =======================
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+
+
+def _loop() -> None:
+    while not _stop.wait(settings.archive_interval_seconds):
+        try:
+            archive_all(engine, stop=_stop)
+        except Exception:
+            logger.exception("Case archive pass failed")
+
+
+def start_worker() -> None:
+    global _thread
+    if settings.archive_after_days <= 0 or (_thread and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="case-archive", daemon=True)
+    _thread.start()
+
+
+def stop_worker() -> None:
+    _stop.set()
@@ -0,0 +1,255 @@
+"""
+Повнотекстовий пошук по справах (адмінка).
+
+Індекс: Case.title, description, note + full_name/email власника.
+SQLite — віртуальна таблиця FTS5 (rowid = case id), Postgres — таблиця з tsvector і GIN.
+Синхронізація — ORM-хук after_flush у тій самій транзакції, що й зміна справи/користувача.
+
+Українська морфологія: текст нормалізується (регістр, апострофи), а слова запиту
+обрізаються до основи і шукаються як префікси ("ветеранів" → ветеран*).
+"""
+import re
+
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.case import Case
+from app.models.user import User
+
+TABLE = "case_search"
+REINDEX_BATCH = 500
+
+_APOSTROPHES = re.compile(r"['’ʼ`]")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# закінчення від довших до коротших; основа має лишитися щонайменше 3 літери
+_UK_ENDINGS = sorted(
+    [
+        "ами", "ями", "ові", "еві", "єві", "ого", "ому", "ими", "іми", "их", "іх",
+        "ій", "ої", "ою", "ею", "єю", "ах", "ях", "ам", "ям", "ів", "їв", "ом", "ем", "єм",
+        "ий", "а", "я", "у", "ю", "і", "ї", "и", "е", "є", "о", "ь",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# ваги колонок: title, description, note, full_name, email
+_FTS_WEIGHTS = (5.0, 2.0, 1.0, 3.0, 3.0)
+
+_CASE_FIELDS = ("title", "description", "note", "user_id")
+_USER_FIELDS = ("full_name", "email")
+
+
+def normalize(value: str | None) -> str:
+    return _APOSTROPHES.sub("", (value or "").lower())
+
+
+def stem(word: str) -> str:
+    for ending in _UK_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[: -len(ending)]
+    return word
+
+
+def query_terms(q: str) -> list[str]:
+    return [stem(w) for w in _WORD.findall(normalize(q))][:10]
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+# =======================
+# СТВОРЕННЯ ІНДЕКСУ
+# =======================
+def ensure_index(engine: Engine) -> None:
+    """Створює індекс, якщо його ще нема, і заповнює його наявними справами."""
+    with engine.begin() as conn:
+        dialect = _dialect(conn)
+        if dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": TABLE}
+            ).first()
+            if exists:
+                return
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+                "title, description, note, full_name, email, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+        elif dialect == "postgresql":
+            exists = conn.execute(text("SELECT to_regclass(:n)"), {"n": TABLE}).scalar()
+            if exists:
+                return
+            conn.execute(text(
+                f"CREATE TABLE {TABLE} ("
+                "case_id INTEGER PRIMARY KEY REFERENCES cases(id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            ))
+            conn.execute(text(f"CREATE INDEX ix_{TABLE}_document ON {TABLE} USING GIN (document)"))
+        else:
+            return
+
+        last_id = 0
+        while True:
+            ids = [
+                r[0]
+                for r in conn.execute(
+                    select(Case.id).where(Case.id > last_id).order_by(Case.id).limit(REINDEX_BATCH)
+                )
+            ]
+            if not ids:
+                break
+            reindex(conn, ids)
+            last_id = ids[-1]
+
+
+# =======================
+# ОНОВЛЕННЯ ІНДЕКСУ
+# =======================
+def reindex(conn: Connection, case_ids) -> None:
+    case_ids = list(case_ids)
+    if not case_ids:
+        return
+    dialect = _dialect(conn)
+    if dialect not in ("sqlite", "postgresql"):
+        return
+
+    rows = conn.execute(
+        select(Case.id, Case.title, Case.description, Case.note, User.full_name, User.email)
+        .join(User, User.id == Case.user_id)
+        .where(Case.id.in_(case_ids))
+    ).all()
+    params = [
+        {
+            "id": r.id,
+            "title": normalize(r.title),
+            "description": normalize(r.description),
+            "note": normalize(r.note),
+            "full_name": normalize(r.full_name),
+            "email": normalize(r.email),
+        }
+        for r in rows
+    ]
+
+    if dialect == "sqlite":
+        conn.execute(
+            text(f"DELETE FROM {TABLE} WHERE rowid IN ({','.join(str(int(x)) for x in case_ids)})")
+        )
+        if params:
+            conn.execute(
+                text(
+                    f"INSERT INTO {TABLE}(rowid, title, description, note, full_name, email) "
+                    "VALUES (:id, :title, :description, :note, :full_name, :email)"
+                ),
+                params,
+            )
+        return
+
+    if params:
+        conn.execute(
+            text(
+                f"INSERT INTO {TABLE}(case_id, document) VALUES (:id, "
+                "setweight(to_tsvector('simple', :title), 'A') || "
+                "setweight(to_tsvector('simple', :full_name || ' ' || :email), 'B') || "
+                "setweight(to_tsvector('simple', :description), 'C') || "
+                "setweight(to_tsvector('simple', :note), 'D')) "
+                "ON CONFLICT (case_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            params,
+        )
+
+
+def _changed(obj, fields) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[f].history.has_changes() for f in fields)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    dirty_cases: set[int] = set()
+    dirty_users: set[int] = set()
+    for obj in session.new:
+        if isinstance(obj, Case):
+            dirty_cases.add(obj.id)
+    for obj in session.dirty:
+        # зміна статусу не чіпає індекс — переіндексуємо лише при зміні тексту
+        if isinstance(obj, Case) and _changed(obj, _CASE_FIELDS):
+            dirty_cases.add(obj.id)
+        elif isinstance(obj, User) and _changed(obj, _USER_FIELDS):
+            dirty_users.add(obj.id)
+
+    conn = session.connection()
+    if dirty_users:
+        dirty_cases.update(
+            r[0] for r in conn.execute(select(Case.id).where(Case.user_id.in_(dirty_users)))
+        )
+    if dirty_cases:
+        reindex(conn, dirty_cases)
+
+
+def install_session_hooks(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _after_flush)
+
+
+def remove_session_hooks(session_factory) -> None:
+    event.remove(session_factory, "after_flush", _after_flush)
+
+
+# =======================
+# ПОШУК
+# =======================
+def search(db: Session, q: str, limit: int, offset: int) -> tuple[int, list[Case]]:
+    terms = query_terms(q)
+    if not terms:
+        return 0, []
+    dialect = _dialect(db.get_bind())
+
+    if dialect == "sqlite":
+        match = " ".join('"' + t.replace('"', "") + '"*' for t in terms)
+        weights = ", ".join(str(w) for w in _FTS_WEIGHTS)
+        total = db.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE {TABLE} MATCH :m"), {"m": match}
+        ).scalar()
+        ids = [
+            r[0]
+            for r in db.execute(
+                text(
+                    f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH :m "
+                    f"ORDER BY bm25({TABLE}, {weights}), rowid DESC LIMIT :limit OFFSET :offset"
+                ),
+                {"m": match, "limit": limit, "offset": offset},
+            )
+        ]
+    elif dialect == "postgresql":
+        tsquery = " & ".join(re.sub(r"\W", "", t) + ":*" for t in terms if re.sub(r"\W", "", t))
+        total = db.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE document @@ to_tsquery('simple', :q)"),
+            {"q": tsquery},
+        ).scalar()
+        ids = [
+            r[0]
+            for r in db.execute(
+                text(
+                    f"SELECT case_id FROM {TABLE} WHERE document @@ to_tsquery('simple', :q) "
+                    "ORDER BY ts_rank_cd(document, to_tsquery('simple', :q)) DESC, case_id DESC "
+                    "LIMIT :limit OFFSET :offset"
+                ),
+                {"q": tsquery, "limit": limit, "offset": offset},
+            )
+        ]
+    else:
+        # інші БД: простий LIKE без індексу
+        like = [f"%{t}%" for t in terms]
+        qry = db.query(Case).join(User, User.id == Case.user_id)
+        for pattern in like:
+            qry = qry.filter(
+                func.lower(Case.title + " " + Case.description + " " + Case.note + " "
+                           + func.coalesce(User.full_name, "") + " " + User.email).like(pattern)
+            )
+        return qry.count(), qry.order_by(Case.id.desc()).offset(offset).limit(limit).all()
+
+    if not ids:
+        return total or 0, []
+    cases = {c.id: c for c in db.query(Case).filter(Case.id.in_(ids))}
+    return total or 0, [cases[x] for x in ids if x in cases]
@@ -0,0 +1,173 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.benefit import Benefit
+from app.models.case import Case
+from app.models.case_archive import ArchivedCase
+from app.models.case_stat import CaseStat
+from app.models.user import User
+
+GROUP_COLUMNS = ("status", "benefit_id", "region", "week")
+
+
+def week_start(dt: datetime | date) -> date:
+    d = dt.date() if isinstance(dt, datetime) else dt
+    return d - timedelta(days=d.weekday())
+
+
+def _region(value: str | None) -> str:
+    return (value or "").strip()
+
+
+def _owner_region(db: Session, user_id: int) -> str:
+    return _region(db.query(User.region).filter(User.id == user_id).scalar())
+
+
+def _bump(db: Session, status: str, benefit_id: int, region: str, week: date, delta: int) -> None:
+    """Атомарно додає delta до лічильника групи (upsert у поточній транзакції)."""
+    if not delta:
+        return
+    key = {"status": status, "benefit_id": benefit_id, "region": region, "week": week}
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(CaseStat).values(**key, count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(GROUP_COLUMNS),
+            set_={"count": CaseStat.count + stmt.excluded.count},
+        )
+        db.execute(stmt)
+        return
+
+    updated = db.execute(
+        update(CaseStat)
+        .where(*(getattr(CaseStat, k) == v for k, v in key.items()))
+        .values(count=CaseStat.count + delta)
+    ).rowcount
+    if not updated:
+        db.execute(insert(CaseStat).values(**key, count=delta))
+
+
+# =======================
+# ХУКИ ДЛЯ РОУТЕРІВ (виклик у тій самій транзакції, що й зміна справи)
+# =======================
+def on_case_created(db: Session, c: Case, region: str | None) -> None:
+    _bump(db, c.status, c.benefit_id, _region(region), week_start(c.created_at), 1)
+
+
+def on_status_changed(db: Session, c: Case, old_status: str, region: str | None = None) -> None:
+    if old_status == c.status:
+        return
+    region = _owner_region(db, c.user_id) if region is None else _region(region)
+    week = week_start(c.created_at)
+    _bump(db, old_status, c.benefit_id, region, week, -1)
+    _bump(db, c.status, c.benefit_id, region, week, 1)
+
+
+def on_bulk_status_changed(db: Session, changes: list[tuple[int, int, datetime, str, str]]) -> None:
+    """
+    Для масових оновлень: changes = [(user_id, benefit_id, created_at, старий, новий статус)].
+    Регіони власників — одним запитом, дельти згруповані, по одному upsert на групу.
+    """
+    changes = [ch for ch in changes if ch[3] != ch[4]]
+    if not changes:
+        return
+    owner_ids = {ch[0] for ch in changes}
+    regions = {
+        uid: _region(r)
+        for uid, r in db.query(User.id, User.region).filter(User.id.in_(owner_ids))
+    }
+    deltas: Counter = Counter()
+    for user_id, benefit_id, created_at, old_status, new_status in changes:
+        region = regions.get(user_id, "")
+        week = week_start(created_at)
+        deltas[(old_status, benefit_id, region, week)] -= 1
+        deltas[(new_status, benefit_id, region, week)] += 1
+    for (status, benefit_id, region, week), n in deltas.items():
+        _bump(db, status, benefit_id, region, week, n)
+
+
+def on_user_region_changed(db: Session, user_id: int, old_region: str | None, new_region: str | None) -> None:
+    """Переносить справи користувача в групи нового регіону (по індексу cases.user_id)."""
+    old_region, new_region = _region(old_region), _region(new_region)
+    if old_region == new_region:
+        return
+    groups: Counter = Counter()
+    # архівні справи теж у статистиці (case_archive не змінює лічильники)
+    for model in (Case, ArchivedCase):
+        for status, benefit_id, created_at in (
+            db.query(model.status, model.benefit_id, model.created_at).filter(model.user_id == user_id)
+        ):
+            groups[(status, benefit_id, week_start(created_at))] += 1
+    for (status, benefit_id, week), n in groups.items():
+        _bump(db, status, benefit_id, old_region, week, -n)
+        _bump(db, status, benefit_id, new_region, week, n)
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """Повний перерахунок з cases (+ архів) і users (офлайн-команда). Повертає кількість груп."""
+    groups: Counter = Counter()
+    for model in (Case, ArchivedCase):
+        rows = (
+            db.query(model.status, model.benefit_id, User.region, model.created_at)
+            .join(User, User.id == model.user_id)
+            .yield_per(batch_size)
+        )
+        for status, benefit_id, region, created_at in rows:
+            groups[(status, benefit_id, _region(region), week_start(created_at))] += 1
+
+    db.execute(delete(CaseStat))
+    if groups:
+        db.execute(
+            insert(CaseStat),
+            [
+                {"status": s, "benefit_id": b, "region": r, "week": w, "count": n}
+                for (s, b, r, w), n in groups.items()
+            ],
+        )
+    db.commit()
+    return len(groups)
+
+
+# =======================
+# ЧИТАННЯ ДЛЯ ДАШБОРДУ (тільки зведена таблиця)
+# =======================
+def summary(db: Session) -> dict:
+    def grouped(col):
+        return (
+            db.query(col, func.sum(CaseStat.count))
+            .group_by(col)
+            .having(func.sum(CaseStat.count) != 0)
+            .order_by(col)
+            .all()
+        )
+
+    by_status = {s: int(n) for s, n in grouped(CaseStat.status)}
+    by_region = {r: int(n) for r, n in grouped(CaseStat.region)}
+    by_week = [{"week": w, "count": int(n)} for w, n in grouped(CaseStat.week)]
+
+    benefit_rows = grouped(CaseStat.benefit_id)
+    titles = dict(
+        db.query(Benefit.id, Benefit.title)
+        .filter(Benefit.id.in_([b for b, _ in benefit_rows]))
+        .all()
+    ) if benefit_rows else {}
+    by_benefit = [
+        {"benefit_id": b, "title": titles.get(b, ""), "count": int(n)} for b, n in benefit_rows
+    ]
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_benefit": by_benefit,
+        "by_region": by_region,
+        "by_week": by_week,
+    }
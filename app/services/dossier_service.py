@@ -0,0 +1,209 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.storage_service import UPLOADS_DIR
+
+DOSSIER_DIR = UPLOADS_DIR / "_dossiers"
+_DOSSIER_FILE = re.compile(r"case_(\d+)_[0-9a-f]+\.pdf")
+
+PDF_TYPES = {"application/pdf"}
+IMAGE_TYPES = {"image/jpeg", "image/png"}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _file_kind(path: str, content_type: str | None) -> str | None:
+    ct = (content_type or "").lower()
+    ext = Path(path).suffix.lower()
+    if ct in PDF_TYPES or ext == ".pdf":
+        return "pdf"
+    if ct in IMAGE_TYPES or ext in {".jpg", ".jpeg", ".png"}:
+        return "image"
+    return None
+
+
+def collect_inputs(docs) -> list[tuple[str, str, str]]:
+    """(path, kind, title) для кожного завантаженого PDF/зображення в порядку документів."""
+    out = []
+    for d in docs:
+        if not d.file_path:
+            continue
+        kind = _file_kind(d.file_path, d.content_type)
+        if kind:
+            out.append((d.file_path, kind, d.title))
+    return out
+
+
+def cache_key(application_text: str, files: list[tuple[str, str, str]]) -> str:
+    """Хеш входів: текст заяви + шлях/розмір/mtime кожного файлу."""
+    h = hashlib.sha256()
+    h.update(application_text.encode("utf-8"))
+    for path, kind, title in files:
+        try:
+            st = os.stat(path)
+            stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        except FileNotFoundError:
+            stamp = "missing"
+        h.update(f"\0{path}\0{kind}\0{title}\0{stamp}".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def cached_path(case_id: int, key: str) -> Path:
+    return DOSSIER_DIR / f"case_{case_id}_{key}.pdf"
+
+
+# =======================
+# РОБОТА У ВОРКЕР-ПРОЦЕСІ
+# =======================
+def _single_page_pdf(draw) -> BytesIO:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    draw(c, *A4)
+    c.showPage()
+    c.save()
+    buf.seek(0)
+    return buf
+
+
+def _image_page(path: str) -> BytesIO:
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+
+    img = ImageReader(path)
+    iw, ih = img.getSize()
+
+    def draw(c, w, h):
+        margin = 10 * mm
+        scale = min((w - 2 * margin) / iw, (h - 2 * margin) / ih)
+        dw, dh = iw * scale, ih * scale
+        c.drawImage(img, (w - dw) / 2, (h - dh) / 2, width=dw, height=dh)
+
+    return _single_page_pdf(draw)
+
+
+def _placeholder_page(title: str) -> BytesIO:
+    from reportlab.lib.units import mm
+
+    from app.services.pdf_service import FONT_NAME, _ensure_font_registered
+
+    _ensure_font_registered()
+
+    def draw(c, w, h):
+        c.setFont(FONT_NAME, 12)
+        c.drawString(18 * mm, h - 30 * mm, f"Не вдалося додати файл документа: {title}")
+
+    return _single_page_pdf(draw)
+
+
+def build_dossier(application_text: str, files: list[tuple[str, str, str]], out_path: str) -> str:
+    """
+    Збирає досьє сторінка за сторінкою: заява, далі кожен PDF/зображення.
+    Виконується у воркер-процесі; результат пишеться атомарно в out_path.
+    """
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.errors import PdfReadError
+
+    from app.services.pdf_service import application_text_to_pdf_bytes
+
+    writer = PdfWriter()
+    for page in PdfReader(BytesIO(application_text_to_pdf_bytes(application_text, title="ЗАЯВА"))).pages:
+        writer.add_page(page)
+
+    for path, kind, title in files:
+        try:
+            source = _image_page(path) if kind == "image" else path
+            for page in PdfReader(source).pages:
+                writer.add_page(page)
+        except (OSError, PdfReadError, ValueError):
+            for page in PdfReader(_placeholder_page(title)).pages:
+                writer.add_page(page)
+
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        writer.write(f)
+    os.replace(tmp, out)
+    return str(out)
+
+
+# =======================
+# API ДЛЯ РОУТЕРА
+# =======================
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: воркер не успадковує потоки/з'єднання сервера
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.dossier_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def get_or_build(case_id: int, application_text: str, docs) -> Path:
+    files = collect_inputs(docs)
+    key = cache_key(application_text, files)
+    path = cached_path(case_id, key)
+    try:
+        # mtime = остання видача: purge_outdated не чіпає версію, яку щойно віддали
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    # попередні версії не видаляємо тут: інший запит міг уже отримати їхній шлях
+    # і ще не відкрити файл — їх прибирає purge_outdated (GC сховища)
+    _get_executor().submit(build_dossier, application_text, files, str(path)).result()
+    return path
+
+
+def purge_outdated(max_age_seconds: int) -> int:
+    """
+    Видаляє застарілі версії досьє: для кожної справи лишається найновіша, решта —
+    якщо їх не видавали довше за max_age_seconds. Також недописані *.tmp.
+    """
+    if not DOSSIER_DIR.is_dir():
+        return 0
+    threshold = time.time() - max_age_seconds
+    by_case: dict[int, list[tuple[float, Path]]] = {}
+    stale: list[Path] = []
+    for f in DOSSIER_DIR.iterdir():
+        try:
+            mtime = f.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        m = _DOSSIER_FILE.fullmatch(f.name)
+        if m:
+            by_case.setdefault(int(m.group(1)), []).append((mtime, f))
+        elif f.name.endswith(".tmp") and mtime < threshold:
+            stale.append(f)
+    for versions in by_case.values():
+        versions.sort()
+        stale.extend(f for mtime, f in versions[:-1] if mtime < threshold)
+
+    removed = 0
+    for f in stale:
+        try:
+            f.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
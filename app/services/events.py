@@ -0,0 +1,261 @@
+"""
+Стрічка змін справ (для SSE).
+
+Коли в транзакції пишеться CaseHistory, після коміту публікується компактна подія
+{"case_id", "user_id", "status", "topics"}, де topics — що саме змінилося
+(case / documents / history / progress / artifacts), щоб клієнт перезапитав лише це.
+
+Події розходяться через in-process pub/sub. Для кількох воркерів можна увімкнути
+брокер Redis (settings.events_broker = "redis"): кожен воркер публікує в канал
+і слухає його, тож підписники отримують події з усіх процесів.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.config import settings
+from app.models.case import Case
+from app.models.case_artifact import CaseArtifact
+from app.models.case_document import CaseDocument
+from app.models.case_history import CaseHistory
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = "case_events"
+
+
+# =======================
+# IN-PROCESS PUB/SUB
+# =======================
+@dataclass(eq=False)
+class Subscription:
+    user_id: int
+    is_admin: bool
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=settings.events_queue_size))
+
+    def wants(self, evt: dict) -> bool:
+        return self.is_admin or evt.get("user_id") == self.user_id
+
+    def _put(self, evt: dict) -> None:
+        # повільний клієнт: викидаємо найстарішу подію, а не блокуємо видавця
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(evt)
+
+
+class EventBus:
+    def __init__(self):
+        self._subs: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, is_admin: bool) -> Subscription:
+        sub = Subscription(user_id=user_id, is_admin=is_admin, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def dispatch(self, evt: dict) -> None:
+        """Потокобезпечно: хендлери працюють у threadpool, черги — в event loop."""
+        with self._lock:
+            subs = [s for s in self._subs if s.wants(evt)]
+        for s in subs:
+            try:
+                s.loop.call_soon_threadsafe(s._put, evt)
+            except RuntimeError:
+                # loop уже закритий — підписка мертва
+                self.unsubscribe(s)
+
+
+bus = EventBus()
+
+
+# =======================
+# БРОКЕРИ
+# =======================
+class LocalBroker:
+    def publish(self, evt: dict) -> None:
+        bus.dispatch(evt)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """Fan-out між воркерами через Redis pub/sub."""
+
+    def __init__(self, url: str, channel: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def publish(self, evt: dict) -> None:
+        # локальним підписникам — одразу, іншим воркерам — через канал
+        bus.dispatch(evt)
+        try:
+            self._redis.publish(self._channel, json.dumps({"origin": self._origin, "event": evt}))
+        except Exception:
+            logger.warning("Could not publish case event to redis", exc_info=True)
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self._channel)
+                while not self._stop.is_set():
+                    msg = pubsub.get_message(timeout=1.0)
+                    if not msg:
+                        continue
+                    payload = json.loads(msg["data"])
+                    if payload.get("origin") != self._origin:
+                        bus.dispatch(payload["event"])
+            except Exception:
+                logger.warning("Redis case events listener failed, reconnecting", exc_info=True)
+                self._stop.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="case-events-redis", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+broker: LocalBroker | RedisBroker = LocalBroker()
+
+
+def start_broker() -> None:
+    global broker
+    if settings.events_broker == "redis":
+        broker = RedisBroker(settings.events_redis_url, settings.events_redis_channel)
+    elif settings.events_broker == "local":
+        broker = LocalBroker()
+    else:
+        raise ValueError(f"Unknown events_broker: {settings.events_broker!r} (expected 'local' or 'redis')")
+    broker.start()
+
+
+def stop_broker() -> None:
+    broker.stop()
+
+
+# =======================
+# ЗБІР ПОДІЙ ІЗ СЕСІЇ
+# =======================
+def _pending(session: Session) -> dict:
+    return session.info.setdefault(SESSION_KEY, {})
+
+
+def _entry(session: Session, case_id: int) -> dict:
+    return _pending(session).setdefault(
+        case_id, {"user_id": None, "status": None, "topics": set(), "history": False}
+    )
+
+
+def queue_case_event(session: Session, case_id: int, user_id: int | None, status: str | None, topics) -> None:
+    """Явно поставити подію в чергу (для bulk-операцій, що пишуть історію Core-запитами)."""
+    e = _entry(session, case_id)
+    e["history"] = True
+    e["topics"].update(topics)
+    e["topics"].add("history")
+    if user_id is not None:
+        e["user_id"] = user_id
+    if status is not None:
+        e["status"] = status
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, CaseHistory):
+            e = _entry(session, obj.case_id)
+            e["history"] = True
+            e["status"] = obj.status
+            e["topics"].add("history")
+        elif isinstance(obj, Case):
+            e = _entry(session, obj.id)
+            e["user_id"] = obj.user_id
+            e["status"] = obj.status
+            e["topics"].add("case")
+        elif isinstance(obj, CaseDocument):
+            _entry(session, obj.case_id)["topics"].update(("documents", "progress"))
+        elif isinstance(obj, CaseArtifact):
+            _entry(session, obj.case_id)["topics"].add("artifacts")
+
+    # власник справи: з identity map, інакше один запит на всі справи
+    missing = []
+    for case_id, e in _pending(session).items():
+        if e["user_id"] is not None:
+            continue
+        c = session.identity_map.get(identity_key(Case, case_id))
+        if c is not None:
+            e["user_id"] = c.user_id
+        else:
+            missing.append(case_id)
+    if missing:
+        rows = session.connection().execute(
+            select(Case.id, Case.user_id).where(Case.id.in_(missing))
+        )
+        for case_id, user_id in rows:
+            _pending(session)[case_id]["user_id"] = user_id
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(SESSION_KEY, None)
+    if not pending:
+        return
+    ts = time.time()
+    for case_id, e in pending.items():
+        if not e["history"]:
+            continue
+        evt = {
+            "case_id": case_id,
+            "user_id": e["user_id"],
+            "status": e["status"],
+            "topics": sorted(e["topics"]),
+            "ts": ts,
+        }
+        try:
+            broker.publish(evt)
+        except Exception:
+            logger.warning("Could not publish case event", exc_info=True)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(SESSION_KEY, None)
+
+
+def install_session_hooks(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
+
+
+def remove_session_hooks(session_factory) -> None:
+    event.remove(session_factory, "after_flush", _after_flush)
+    event.remove(session_factory, "after_commit", _after_commit)
+    event.remove(session_factory, "after_rollback", _after_rollback)
@@ -0,0 +1,32 @@
+"""
+Запис історії справ (case_history) — завжди в транзакції хендлера, атомарно зі
+зміною справи: закомічена справа не лишається без свого запису, а архіватор і
+SSE-події бачать історію одразу після коміту.
+
+Хендлери пишуть історію лише через record / record_many: кілька записів одного
+запиту йдуть одним executemany (без RETURNING на кожен рядок), без окремого коміту.
+"""
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.case import Case
+from app.models import history_event
+from app.models.case_history import CaseHistory
+from app.models.history_event import HistoryEvent
+
+
+def row(case_id: int, status: str, event: HistoryEvent, *params) -> dict:
+    """Рядок case_history для record_many: шаблон event з параметрами params."""
+    code, packed = history_event.encode(event, params, status)
+    return {"case_id": case_id, "status": status, "event": code, "params": packed}
+
+
+def record(db: Session, c: Case, event: HistoryEvent, *params) -> None:
+    """Запис в історію справи зі статусом c.status (на момент виклику)."""
+    db.add(CaseHistory(**row(c.id, c.status, event, *params)))
+
+
+def record_many(db: Session, rows: list[dict]) -> None:
+    """Кілька записів (рядки з row(...)); події ставить викликач."""
+    if rows:
+        db.execute(insert(CaseHistory), rows)
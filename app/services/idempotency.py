@@ -0,0 +1,283 @@
+"""
+Ідемпотентні POST-запити (заголовок Idempotency-Key).
+
+Перший запит із ключем вставляє рядок idempotency_keys у статусі in_progress
+(унікальність (user_id, key) гарантує, що виконується лише один), а хендлер
+у власній транзакції позначає його completed і зберігає вказівник на результат:
+id створеного об'єкта або файл із відповіддю (PDF). Повтор із тим самим ключем
+отримує збережений результат, одночасний дублікат кілька секунд чекає на перший,
+далі — 409 з Retry-After.
+
+Якщо хендлер упав — рядок видаляється, і повтор виконається заново. Якщо завис
+воркер — після settings.idempotency_lock_seconds запит підхоплює наступний повтор.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.models.user import User
+from app.services.storage_service import UPLOADS_DIR, remove_file
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+RESULTS_DIR = UPLOADS_DIR / "_idempotency"
+
+IN_PROGRESS, COMPLETED = "in_progress", "completed"
+
+
+@dataclass
+class StoredResponse:
+    code: int
+    ref: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def object_id(self, kind: str) -> int:
+        """Id об'єкта з вказівника виду "<kind>:<id>"."""
+        prefix, _, value = self.ref.partition(":")
+        if prefix != kind or not value.isdigit():
+            raise HTTPException(status_code=500, detail="Stored idempotent response is invalid")
+        return int(value)
+
+    def file_response(self) -> FileResponse:
+        path = Path(self.ref)
+        if not path.is_file():
+            raise HTTPException(status_code=410, detail="Stored response is no longer available")
+        headers = {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
+        headers[REPLAYED_HEADER] = "true"
+        return FileResponse(
+            path=str(path),
+            status_code=self.code,
+            media_type=self.headers.get("content-type"),
+            headers=headers,
+        )
+
+
+class Idempotency:
+    """
+    Стан ключа для поточного запиту. Без заголовка (record_id=None і replay=None)
+    усі методи нічого не роблять, тож хендлер пишеться однаково.
+    """
+
+    def __init__(self, record_id: int | None = None, replay: StoredResponse | None = None):
+        self.record_id = record_id
+        self.replay = replay
+        self.completed = False
+
+    def save_file(self, data: bytes, suffix: str) -> str | None:
+        """Зберігає тіло відповіді для повторів; повертає шлях (вказівник) або None без ключа."""
+        if self.record_id is None:
+            return None
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{self.record_id}{suffix}"
+        path.write_bytes(data)
+        return str(path)
+
+    def complete(self, db: Session, ref: str | None, code: int = 200, headers: dict | None = None) -> None:
+        """Позначає ключ виконаним у транзакції хендлера — коміт робить сам хендлер."""
+        if self.record_id is None or ref is None:
+            return
+        db.query(IdempotencyKey).filter(IdempotencyKey.id == self.record_id).update(
+            {
+                "status": COMPLETED,
+                "response_code": code,
+                "response_ref": ref,
+                "response_headers": json.dumps({k.lower(): v for k, v in (headers or {}).items()}),
+            },
+            synchronize_session=False,
+        )
+        self.completed = True
+
+    def release(self) -> None:
+        """Хендлер не завершився — прибираємо ключ, щоб повтор виконався заново."""
+        if self.record_id is None:
+            return
+        db = SessionLocal()
+        try:
+            deleted = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.id == self.record_id, IdempotencyKey.status == IN_PROGRESS)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        if deleted:
+            for path in RESULTS_DIR.glob(f"{self.record_id}.*"):
+                remove_file(path)
+
+
+def request_hash(method: str, path: str, body: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"{method} {path}\0".encode("utf-8"))
+    h.update(body)
+    return h.hexdigest()
+
+
+def _stored(rec: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(
+        code=rec.response_code or 200,
+        ref=rec.response_ref or "",
+        headers=json.loads(rec.response_headers or "{}"),
+    )
+
+
+def _try_claim(user_id: int, key: str, req_hash: str) -> Idempotency | None:
+    """
+    Одна спроба захопити ключ (виконується в threadpool, не спить). Повертає новий
+    запис (виконуємо хендлер) або збережену відповідь; None — перший запит ще виконується.
+    """
+    ttl = timedelta(hours=settings.idempotency_ttl_hours)
+    lock = timedelta(seconds=settings.idempotency_lock_seconds)
+
+    while True:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            rec = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .first()
+            )
+            if rec is not None and rec.created_at < now - ttl:
+                # прострочений ключ — звільняємо і беремо заново
+                _delete(db, [rec])
+                db.commit()
+                continue
+
+            if rec is None:
+                rec = IdempotencyKey(
+                    user_id=user_id, key=key, request_hash=req_hash,
+                    status=IN_PROGRESS, created_at=now, locked_at=now,
+                )
+                db.add(rec)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # такий самий запит вставив ключ одночасно з нами — перечитуємо
+                    db.rollback()
+                    continue
+                return Idempotency(record_id=rec.id)
+
+            if rec.request_hash != req_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key has already been used with a different request",
+                )
+            if rec.status == COMPLETED:
+                return Idempotency(replay=_stored(rec))
+
+            if rec.locked_at < now - lock:
+                # перший запит завис або воркер упав — підхоплюємо (compare-and-set по locked_at)
+                taken = (
+                    db.query(IdempotencyKey)
+                    .filter(
+                        IdempotencyKey.id == rec.id,
+                        IdempotencyKey.status == IN_PROGRESS,
+                        IdempotencyKey.locked_at == rec.locked_at,
+                    )
+                    .update({"locked_at": now}, synchronize_session=False)
+                )
+                db.commit()
+                if taken:
+                    logger.warning("idempotency key %s of user %s taken over after stale lock", rec.id, user_id)
+                    return Idempotency(record_id=rec.id)
+                continue
+            return None
+        finally:
+            db.close()
+
+
+async def claim(user_id: int, key: str, req_hash: str) -> Idempotency:
+    """
+    Захват ключа. Поки перший запит виконується, дублікат чекає асинхронно (не тримає
+    потік threadpool) з наростаючою паузою до settings.idempotency_wait_seconds,
+    потім 409 з Retry-After — клієнт повторить і отримає збережену відповідь.
+    """
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    delay = 0.05
+
+    while True:
+        idem = await run_in_threadpool(_try_claim, user_id, key, req_hash)
+        if idem is not None:
+            return idem
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+async def idempotency(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    """Залежність для ідемпотентних ендпоінтів: захоплює ключ і звільняє його, якщо хендлер упав."""
+    key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+    if not key:
+        yield Idempotency()
+        return
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} is too long")
+
+    body = await request.body()
+    idem = await claim(current_user.id, key, request_hash(request.method, request.url.path, body))
+    if idem.replay is not None:
+        response.headers[REPLAYED_HEADER] = "true"
+        yield idem
+        return
+
+    try:
+        yield idem
+    except BaseException:
+        await run_in_threadpool(idem.release)
+        raise
+    if not idem.completed:
+        await run_in_threadpool(idem.release)
+
+
+# =======================
+# ОЧИЩЕННЯ
+# =======================
+def _delete(db: Session, records: list[IdempotencyKey]) -> None:
+    for rec in records:
+        if rec.response_ref and Path(rec.response_ref).parent == RESULTS_DIR:
+            remove_file(rec.response_ref)
+        db.delete(rec)
+
+
+def purge_expired(db: Session, batch_size: int = 500) -> int:
+    """Видаляє ключі, старші за settings.idempotency_ttl_hours, разом зі збереженими файлами."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.idempotency_ttl_hours)
+    records = (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.created_at < cutoff)
+        .order_by(IdempotencyKey.id)
+        .limit(batch_size)
+        .all()
+    )
+    _delete(db, records)
+    db.commit()
+    return len(records)
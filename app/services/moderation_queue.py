@@ -0,0 +1,134 @@
+"""
+Черга модерації документів зі статусом "uploaded".
+
+Модератор "бере" порцію документів в оренду на settings.moderation_lease_seconds.
+Поки оренда діє, ці документи не видаються іншим; прострочена оренда вважається вільною
+і знімається автоматично при наступному claim.
+
+Postgres: SELECT ... FOR UPDATE SKIP LOCKED, SQLite: один UPDATE з умовою
+"вільний або прострочений" (compare-and-set під єдиним write-lock).
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.case_document import CaseDocument
+
+PENDING_STATUS = "uploaded"
+
+
+# оренда не є зміною документа: updated_at (порядок черги) лишаємо як є
+_KEEP_UPDATED_AT = {"updated_at": CaseDocument.updated_at}
+
+
+def _is_free(now: datetime):
+    return or_(CaseDocument.claimed_by.is_(None), CaseDocument.lease_expires_at < now)
+
+
+def _pending(now: datetime):
+    return select(CaseDocument.id).where(
+        CaseDocument.status == PENDING_STATUS, _is_free(now)
+    ).order_by(CaseDocument.updated_at, CaseDocument.id)
+
+
+def list_pending(db: Session, limit: int, offset: int = 0) -> list[CaseDocument]:
+    """Вільні документи в черзі, від найстаріших (індекс status, updated_at)."""
+    now = datetime.utcnow()
+    return (
+        db.query(CaseDocument)
+        .filter(CaseDocument.status == PENDING_STATUS, _is_free(now))
+        .order_by(CaseDocument.updated_at, CaseDocument.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def release_expired(db: Session, now: datetime | None = None) -> int:
+    now = now or datetime.utcnow()
+    return db.execute(
+        update(CaseDocument)
+        .where(CaseDocument.claimed_by.isnot(None), CaseDocument.lease_expires_at < now)
+        .values(claimed_by=None, lease_expires_at=None, **_KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def claim(db: Session, moderator_id: int, limit: int, lease_seconds: int | None = None) -> list[CaseDocument]:
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=lease_seconds or settings.moderation_lease_seconds)
+    limit = max(1, min(limit, settings.moderation_max_claim))
+
+    release_expired(db, now)
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        ids = list(db.execute(_pending(now).limit(limit).with_for_update(skip_locked=True)).scalars())
+        if ids:
+            db.execute(
+                update(CaseDocument)
+                .where(CaseDocument.id.in_(ids))
+                .values(claimed_by=moderator_id, lease_expires_at=lease_until, **_KEEP_UPDATED_AT)
+                .execution_options(synchronize_session=False)
+            )
+    else:
+        # compare-and-set: умова "вільний" перевіряється в самому UPDATE
+        db.execute(
+            update(CaseDocument)
+            .where(
+                CaseDocument.id.in_(_pending(now).limit(limit).scalar_subquery()),
+                CaseDocument.status == PENDING_STATUS,
+                _is_free(now),
+            )
+            .values(claimed_by=moderator_id, lease_expires_at=lease_until, **_KEEP_UPDATED_AT)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    return (
+        db.query(CaseDocument)
+        .filter(CaseDocument.claimed_by == moderator_id, CaseDocument.lease_expires_at == lease_until)
+        .order_by(CaseDocument.updated_at, CaseDocument.id)
+        .all()
+    )
+
+
+def list_claimed(db: Session, moderator_id: int) -> list[CaseDocument]:
+    return (
+        db.query(CaseDocument)
+        .filter(
+            CaseDocument.claimed_by == moderator_id,
+            CaseDocument.lease_expires_at >= datetime.utcnow(),
+            CaseDocument.status == PENDING_STATUS,
+        )
+        .order_by(CaseDocument.updated_at, CaseDocument.id)
+        .all()
+    )
+
+
+def release(db: Session, moderator_id: int, doc_ids: list[int]) -> int:
+    n = db.execute(
+        update(CaseDocument)
+        .where(CaseDocument.id.in_(doc_ids), CaseDocument.claimed_by == moderator_id)
+        .values(claimed_by=None, lease_expires_at=None, **_KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return n
+
+
+def held_by_other(d: CaseDocument, user_id: int) -> bool:
+    """Документ в активній оренді іншого модератора."""
+    return (
+        d.claimed_by is not None
+        and d.claimed_by != user_id
+        and d.lease_expires_at is not None
+        and d.lease_expires_at > datetime.utcnow()
+    )
+
+
+def clear_lease(d: CaseDocument) -> None:
+    d.claimed_by = None
+    d.lease_expires_at = None
@@ -2,11 +2,8 @@ from io import BytesIO
 from pathlib import Path
 import re
 
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from app.core.metrics import instrument_pdf
+from app.core.tracing import traced
 
 
 FONT_PATH = Path(__file__).resolve().parent.parent / "assets" / "fonts" / "DejaVuSans.ttf"
@@ -20,6 +17,10 @@ def _ensure_font_registered():
     global _registered
     if _registered:
         return
+    # reportlab імпортується при першому PDF, а не при старті воркера
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
     if not FONT_PATH.exists():
         raise FileNotFoundError(
             f"Font file not found: {FONT_PATH}. "
@@ -54,6 +55,7 @@ def _wrap(c, text, font, size, max_width):
     return lines
 
 
+@traced("pdf.parse")
 def _parse(text: str) -> dict:
     def grab(tag: str) -> str:
         m = re.search(rf"\[{tag}\]\s*(.*?)(?=\n\[[A-Z_]+\]|\Z)", text, re.S)
@@ -74,9 +76,18 @@ def _parse(text: str) -> dict:
     }
 
 
+@instrument_pdf
+@traced("pdf.render")
 def application_text_to_pdf_bytes(text: str, title: str = "ЗАЯВА") -> bytes:
     _ensure_font_registered()
-    parts = _parse(text)
+    return _layout(_parse(text), title)
+
+
+@traced("pdf.layout")
+def _layout(parts: dict, title: str) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
 
     buf = BytesIO()
     c = canvas.Canvas(buf, pagesize=A4)
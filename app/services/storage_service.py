@@ -0,0 +1,320 @@
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import case as sql_case, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.case import Case
+from app.models.case_archive import ArchivedCase
+from app.models.case_document import CaseDocument
+from app.models.job_cursor import JobCursor
+from app.models.storage_usage import StorageUsage
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# каталог створюється при старті GC-воркера (і mkdir перед кожним записом), не при імпорті
+UPLOADS_DIR = BASE_DIR / "uploads"
+
+GC_CURSOR_NAME = "storage_gc"
+_CASE_DIR = re.compile(r"case_(\d+)")
+
+
+# =======================
+# ЛІЧИЛЬНИКИ / КВОТИ
+# =======================
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(StorageUsage)
+
+
+def _ensure_counter(db: Session, scope: str, owner_id: int) -> None:
+    """Рядок лічильника (0 байтів), якщо його ще нема; паралельна вставка не падає."""
+    stmt = _insert(db)
+    if stmt is not None:
+        db.execute(
+            stmt.values(scope=scope, owner_id=owner_id, bytes_used=0)
+            .on_conflict_do_nothing(index_elements=["scope", "owner_id"])
+        )
+        return
+    exists = db.query(StorageUsage.id).filter(StorageUsage.scope == scope, StorageUsage.owner_id == owner_id).first()
+    if not exists:
+        db.execute(insert(StorageUsage).values(scope=scope, owner_id=owner_id, bytes_used=0))
+
+
+def get_usage(db: Session, scope: str, owner_id: int) -> int:
+    used = (
+        db.query(StorageUsage.bytes_used)
+        .filter(StorageUsage.scope == scope, StorageUsage.owner_id == owner_id)
+        .scalar()
+    )
+    return used or 0
+
+
+def _clamped(expr):
+    # лічильник не йде нижче нуля (розбіжність із диском вирівнює GC)
+    return sql_case((expr < 0, 0), else_=expr)
+
+
+def add_usage(db: Session, user_id: int, case_id: int, delta: int) -> None:
+    """Атомарно змінює лічильники власника і справи на delta байтів (в поточній транзакції)."""
+    if not delta:
+        return
+    for scope, owner_id in (("user", user_id), ("case", case_id)):
+        stmt = _insert(db)
+        if stmt is None:
+            _ensure_counter(db, scope, owner_id)
+            db.execute(
+                update(StorageUsage)
+                .where(StorageUsage.scope == scope, StorageUsage.owner_id == owner_id)
+                .values(bytes_used=_clamped(StorageUsage.bytes_used + delta))
+            )
+            continue
+        stmt = stmt.values(scope=scope, owner_id=owner_id, bytes_used=max(0, delta))
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["scope", "owner_id"],
+            set_={"bytes_used": _clamped(StorageUsage.bytes_used + delta)},
+        ))
+
+
+def charge_usage(db: Session, user_id: int, case_id: int, delta: int) -> bool:
+    """
+    Списує delta байтів з квот власника і справи, лише якщо обидві квоти не
+    перевищуються: умовний UPDATE перевіряє ліміт у тій самій транзакції, що й
+    запис документа, тож паралельні завантаження не проходять разом понад квоту.
+    False — квоту перевищено; викликач відкочує транзакцію і видаляє файл.
+    """
+    if delta <= 0:
+        add_usage(db, user_id, case_id, delta)
+        return True
+    for scope, owner_id, quota in (
+        ("user", user_id, settings.user_storage_quota_bytes),
+        ("case", case_id, settings.case_storage_quota_bytes),
+    ):
+        _ensure_counter(db, scope, owner_id)
+        charged = db.execute(
+            update(StorageUsage)
+            .where(
+                StorageUsage.scope == scope,
+                StorageUsage.owner_id == owner_id,
+                StorageUsage.bytes_used + delta <= quota,
+            )
+            .values(bytes_used=StorageUsage.bytes_used + delta)
+        ).rowcount
+        if not charged:
+            return False
+    return True
+
+
+def upload_allowance(db: Session, user_id: int, case_id: int, replacing: int = 0) -> int:
+    """
+    Скільки байтів ще можна записати (файл, що замінюється, вже не рахується) —
+    лише для раннього відсікання під час запису; остаточно квоту перевіряє charge_usage.
+    """
+    user_left = settings.user_storage_quota_bytes - get_usage(db, "user", user_id) + replacing
+    case_left = settings.case_storage_quota_bytes - get_usage(db, "case", case_id) + replacing
+    return max(0, min(user_left, case_left))
+
+
+def remove_file(path) -> bool:
+    if not path:
+        return False
+    try:
+        Path(path).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError:
+        logger.warning("Could not remove file %s", path, exc_info=True)
+        return False
+
+
+# =======================
+# GC ЗАВАНТАЖЕНЬ
+# =======================
+def gc_step(db: Session, batch_size: int | None = None, grace_seconds: int | None = None) -> dict:
+    """
+    Один інкрементальний прохід GC: бере наступні batch_size справ після курсора,
+    видаляє файли в uploads/case_*, на які не посилається жоден CaseDocument,
+    і вирівнює лічильники цих справ з фактичними size_bytes.
+    Повний обхід дерева розтягується на багато проходів; наприкінці обходу
+    прибираються каталоги справ, яких нема ні в cases, ні в cases_archive.
+    """
+    batch_size = batch_size or settings.storage_gc_batch_size
+    grace_seconds = settings.storage_gc_grace_seconds if grace_seconds is None else grace_seconds
+
+    cursor = db.get(JobCursor, GC_CURSOR_NAME)
+    if not cursor:
+        cursor = JobCursor(name=GC_CURSOR_NAME, position=0)
+        db.add(cursor)
+
+    cases = (
+        db.query(Case.id, Case.user_id)
+        .filter(Case.id > cursor.position)
+        .order_by(Case.id)
+        .limit(batch_size)
+        .all()
+    )
+    if not cases:
+        # дійшли до кінця — наступний прохід почнеться спочатку
+        cursor.position = 0
+        db.commit()
+        removed = _gc_deleted_cases(db, time.time() - grace_seconds)
+        if removed:
+            logger.info("storage gc: removed %s files of deleted cases", removed)
+        return {"cases": 0, "removed_files": removed, "fixed_counters": 0}
+
+    case_ids = [cid for cid, _ in cases]
+
+    rows = (
+        db.query(CaseDocument.case_id, CaseDocument.file_path, CaseDocument.size_bytes)
+        .filter(CaseDocument.case_id.in_(case_ids), CaseDocument.file_path.isnot(None))
+        .all()
+    )
+    known: set[Path] = set()
+    actual_bytes: dict[int, int] = {}
+    for case_id, file_path, size_bytes in rows:
+        known.add(Path(file_path).resolve())
+        actual_bytes[case_id] = actual_bytes.get(case_id, 0) + (size_bytes or 0)
+
+    removed = 0
+    threshold = time.time() - grace_seconds
+    for case_id in case_ids:
+        removed += _remove_unknown(UPLOADS_DIR / f"case_{case_id}", known, threshold)
+
+    fixed = 0
+    for case_id, user_id in cases:
+        delta = actual_bytes.get(case_id, 0) - get_usage(db, "case", case_id)
+        if delta:
+            add_usage(db, user_id, case_id, delta)
+            fixed += 1
+
+    cursor.position = case_ids[-1]
+    db.commit()
+
+    if removed or fixed:
+        logger.info("storage gc: removed %s orphan files, fixed %s counters", removed, fixed)
+    return {"cases": len(case_ids), "removed_files": removed, "fixed_counters": fixed}
+
+
+def _remove_unknown(case_dir: Path, known: set[Path], threshold: float) -> int:
+    """Видаляє файли каталогу справи поза known, старші за threshold (mtime)."""
+    if not case_dir.is_dir():
+        return 0
+    removed = 0
+    for f in case_dir.iterdir():
+        if not f.is_file() or f.resolve() in known:
+            continue
+        try:
+            if f.stat().st_mtime > threshold:
+                continue
+        except FileNotFoundError:
+            continue
+        if remove_file(f):
+            removed += 1
+    return removed
+
+
+def _gc_deleted_cases(db: Session, threshold: float) -> int:
+    """
+    Каталоги uploads/case_* справ, яких уже нема ні в cases, ні в cases_archive
+    (файли архівних справ лишаються на місці): видаляє файли, старші за threshold,
+    і порожній каталог.
+    """
+    if not UPLOADS_DIR.is_dir():
+        return 0
+    dirs = {}
+    for d in UPLOADS_DIR.iterdir():
+        m = _CASE_DIR.fullmatch(d.name)
+        if m and d.is_dir():
+            dirs[int(m.group(1))] = d
+    if not dirs:
+        return 0
+
+    ids = sorted(dirs)
+    alive: set[int] = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for model in (Case, ArchivedCase):
+            alive.update(cid for (cid,) in db.query(model.id).filter(model.id.in_(chunk)))
+
+    removed = 0
+    for case_id, case_dir in dirs.items():
+        if case_id in alive:
+            continue
+        removed += _remove_unknown(case_dir, set(), threshold)
+        try:
+            case_dir.rmdir()
+        except OSError:
+            pass  # лишились свіжі файли — наступного проходу
+    return removed
+
+
+_gc_stop = threading.Event()
+_gc_thread: threading.Thread | None = None
+
+
+def _gc_loop() -> None:
+    while not _gc_stop.wait(settings.storage_gc_interval_seconds):
+        db = SessionLocal()
+        try:
+            gc_step(db)
+        except Exception:
+            logger.exception("storage gc step failed")
+            db.rollback()
+        finally:
+            db.close()
+        _purge_idempotency_keys()
+        _purge_dossiers()
+
+
+def _purge_idempotency_keys() -> None:
+    # імпорт тут: idempotency сам залежить від storage_service (UPLOADS_DIR)
+    from app.services import idempotency
+
+    db = SessionLocal()
+    try:
+        idempotency.purge_expired(db)
+    except Exception:
+        logger.exception("idempotency keys purge failed")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _purge_dossiers() -> None:
+    # імпорт тут: dossier_service сам залежить від storage_service (UPLOADS_DIR)
+    from app.services import dossier_service
+
+    try:
+        removed = dossier_service.purge_outdated(settings.storage_gc_grace_seconds)
+    except Exception:
+        logger.exception("dossier purge failed")
+        return
+    if removed:
+        logger.info("storage gc: removed %s outdated dossier files", removed)
+
+
+def start_gc_worker() -> None:
+    global _gc_thread
+    if _gc_thread and _gc_thread.is_alive():
+        return
+    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    _gc_stop.clear()
+    _gc_thread = threading.Thread(target=_gc_loop, name="storage-gc", daemon=True)
+    _gc_thread.start()
+
+
+def stop_gc_worker() -> None:
+    _gc_stop.set()
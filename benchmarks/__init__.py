@@ -0,0 +1,15 @@
+"""
+Навантажувальні бенчмарки бекенду.
+
+    # 1) синтетичні дані (окрема БД, bulk-вставки)
+    python -m benchmarks.datagen --db sqlite:///./benchmarks/out/bench.db --users 2000
+
+    # 2) сервер на цій БД з фейковим LLM (без OpenAI, із заданою затримкою)
+    python -m benchmarks.serve --db sqlite:///./benchmarks/out/bench.db --llm-latency-ms 300
+
+    # 3) сценарії навантаження -> JSON-звіт (перцентилі, пропускна здатність, коміт)
+    python -m benchmarks.load --scenario mix --concurrency 16 --duration 30
+
+    # 4) порівняння двох прогонів (ненульовий код виходу при регресії p95)
+    python -m benchmarks.compare benchmarks/out/results/a.json benchmarks/out/results/b.json
+"""
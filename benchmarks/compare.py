@@ -0,0 +1,69 @@
+"""
+Порівняння двох звітів benchmarks.load (базовий і новий прогін).
+
+    python -m benchmarks.compare base.json new.json --threshold 10
+
+Код виходу 1, якщо p95 будь-якого кроку виріс більше ніж на --threshold відсотків
+або з'явилися помилки, — зручно для CI.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.stats import format_table
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def _delta(old: float, new: float) -> float | None:
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(base: dict, new: dict, threshold: float) -> tuple[list[list], list[str]]:
+    rows, regressions = [], []
+    for step in sorted(set(base["steps"]) | set(new["steps"])):
+        b, n = base["steps"].get(step), new["steps"].get(step)
+        if b is None or n is None:
+            rows.append([step] + ["—"] * len(METRICS) + ["only in " + ("new" if b is None else "base")])
+            continue
+        cells = []
+        for m in METRICS:
+            d = _delta(b[m], n[m])
+            cells.append(f"{b[m]}→{n[m]}" + (f" ({d:+.1f}%)" if d is not None else ""))
+        p95 = _delta(b["p95_ms"], n["p95_ms"])
+        flag = ""
+        if p95 is not None and p95 > threshold:
+            flag = "REGRESSION"
+            regressions.append(f"{step}: p95 {b['p95_ms']} → {n['p95_ms']} ms ({p95:+.1f}%)")
+        if n["errors"] > b["errors"]:
+            flag = "ERRORS"
+            regressions.append(f"{step}: errors {b['errors']} → {n['errors']}")
+        rows.append([step] + cells + [flag])
+    return rows, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two load reports")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 growth, %%")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    if base["params"]["scenario"] != new["params"]["scenario"] or base.get("data") != new.get("data"):
+        print("warning: reports differ in scenario or data size — numbers are not directly comparable")
+
+    rows, regressions = compare(base, new, args.threshold)
+    print(f"{base['commit']} → {new['commit']}")
+    print(format_table(rows, ["step", *METRICS, ""]))
+    if regressions:
+        print("\nregressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Генератор синтетичних даних для бенчмарків.
+
+Створює в ОКРЕМІЙ БД користувачів, гарантії, справи, документи й історію
+пакетними Core-вставками (executemany), потім перебудовує case_stats і
+повнотекстовий індекс. Дані детерміновані (--seed), тож прогони на різних
+комітах порівнювані.
+
+Пише manifest.json: пароль і для кожного користувача email, id справ і документів —
+його читає benchmarks.load.
+
+    python -m benchmarks.datagen --db sqlite:///./benchmarks/out/bench.db --users 2000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_PASSWORD = "benchpass123"
+INSERT_BATCH = 5000
+
+OUT_DIR = Path(__file__).resolve().parent / "out"
+
+CASE_STATUSES = ["draft", "submitted", "in_review", "approved", "rejected", "done"]
+DOC_STATUSES = ["required", "uploaded", "approved", "rejected"]
+REGIONS = ["Київ", "Львівська", "Харківська", "Одеська", "Дніпропетровська", "Вінницька", "Полтавська", ""]
+USER_STATUSES = ["veteran", "ubd", "family", "disabled"]
+FIRST_NAMES = ["Олександр", "Марʼяна", "Іван", "Оксана", "Петро", "Наталія", "Андрій", "Юлія", "Тарас", "Ганна"]
+LAST_NAMES = ["Шевченко", "Коваленко", "Бондаренко", "Ткаченко", "Кравченко", "Олійник", "Мельник", "Лисенко"]
+
+BENEFIT_TEMPLATES = [
+    ("Компенсація за житлово-комунальні послуги", "housing", "Органи соцзахисту / ЦНАП"),
+    ("Одноразова грошова допомога", "payments", "Соцзахист / ЦНАП"),
+    ("Пільги на медичні послуги", "medical", "Медзаклад / НСЗУ"),
+    ("Безоплатний проїзд у транспорті", "transport", "Перевізник / ЦНАП"),
+    ("Земельна ділянка для ветеранів", "land", "Держгеокадастр"),
+    ("Психологічна реабілітація", "medical", "Мінветеранів"),
+    ("Професійна адаптація та навчання", "education", "Центр зайнятості"),
+    ("Санаторно-курортне лікування", "medical", "Соцзахист"),
+]
+DOCUMENTS = [
+    "Паспорт", "ІПН", "Посвідчення УБД", "Довідка про склад сімʼї", "Реквізити IBAN",
+    "Заява", "Медична довідка", "Витяг з ЄДРПОУ", "Довідка про доходи",
+]
+HISTORY_COMMENTS = [
+    "Справу створено", "Оновлено документ: Паспорт → uploaded", "Завантажено файл для документа: ІПН",
+    "[AUTO] Статус справи оновлено автоматично → in_review", "[ADMIN] Перевірено документи",
+    "Згенеровано PDF заяви",
+]
+LOREM = (
+    "Прошу розглянути мою заяву щодо надання гарантії відповідно до чинного законодавства. "
+    "Додаю необхідні документи та підтвердження статусу учасника бойових дій. "
+    "Прошу повідомити про результати розгляду на електронну пошту."
+)
+
+
+def _chunks(rows: list[dict], size: int = INSERT_BATCH):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def generate(db_url: str, users: int, benefits: int, cases_per_user: int, seed: int, manifest_path: Path) -> dict:
+    os.environ["DATABASE_URL"] = db_url
+    # імпорти після DATABASE_URL: engine створюється при імпорті app.db.session
+    from sqlalchemy import insert
+
+    from app.core.security import hash_password
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models import (  # noqa: F401  — реєстрація всіх таблиць у metadata
+        benefit, case, case_artifact, case_document, case_history, case_stat, idempotency_key, job_cursor,
+        storage_usage, user,
+    )
+    from app.models.benefit import Benefit
+    from app.models.case import Case
+    from app.models.case_document import CaseDocument
+    from app.models.case_history import CaseHistory
+    from app.models import history_event
+    from app.models.user import User
+    from app.services import case_search, case_stats
+
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # індекс пошуку створюється окремо від metadata — прибираємо і його
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {case_search.TABLE}")
+
+    # bcrypt дорогий — один хеш на всіх користувачів
+    password_hash = hash_password(BENCH_PASSWORD)
+
+    benefit_rows, benefit_docs = [], {}
+    for i in range(1, benefits + 1):
+        title, category, authority = BENEFIT_TEMPLATES[(i - 1) % len(BENEFIT_TEMPLATES)]
+        docs = rnd.sample(DOCUMENTS, rnd.randint(2, 6))
+        benefit_docs[i] = docs
+        benefit_rows.append({
+            "id": i,
+            "title": title if i <= len(BENEFIT_TEMPLATES) else f"{title} ({i})",
+            "category": category,
+            "description": LOREM[: rnd.randint(60, len(LOREM))],
+            "authority": authority,
+            "required_documents": "\n".join(docs),
+            "eligible_statuses": ",".join(rnd.sample(USER_STATUSES, rnd.randint(1, 4))),
+        })
+
+    user_rows, case_rows, doc_rows, history_rows = [], [], [], []
+    manifest_users = []
+    now = datetime.utcnow()
+    case_id = doc_id = history_id = 0
+    for uid in range(1, users + 1):
+        email = f"bench{uid}@example.com"
+        user_rows.append({
+            "id": uid,
+            "email": email,
+            "password_hash": password_hash,
+            "role": "admin" if uid == 1 else "user",
+            "status": rnd.choice(USER_STATUSES),
+            "full_name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+            "region": rnd.choice(REGIONS),
+        })
+        entry = {"email": email, "cases": []}
+        for _ in range(cases_per_user):
+            case_id += 1
+            benefit_id = rnd.randint(1, benefits)
+            created = now - timedelta(days=rnd.randint(0, 180), minutes=rnd.randint(0, 1440))
+            case_rows.append({
+                "id": case_id,
+                "user_id": uid,
+                "benefit_id": benefit_id,
+                "status": rnd.choice(CASE_STATUSES),
+                "title": f"{benefit_rows[benefit_id - 1]['title']} — справа {case_id}",
+                "description": LOREM[: rnd.randint(0, len(LOREM))],
+                "note": rnd.choice(["", "", "Терміново", "Потрібна консультація"]),
+                "created_at": created,
+            })
+            doc_ids = []
+            for title in benefit_docs[benefit_id]:
+                doc_id += 1
+                doc_ids.append(doc_id)
+                doc_rows.append({
+                    "id": doc_id,
+                    "case_id": case_id,
+                    "title": title,
+                    "status": rnd.choice(DOC_STATUSES),
+                    "comment": None,
+                    "created_at": created,
+                    "updated_at": created + timedelta(hours=rnd.randint(0, 240)),
+                })
+            for n in range(rnd.randint(2, 8)):
+                history_id += 1
+                status = rnd.choice(CASE_STATUSES)
+                event, params = history_event.parse(HISTORY_COMMENTS[n % len(HISTORY_COMMENTS)], status)
+                history_rows.append({
+                    "id": history_id,
+                    "case_id": case_id,
+                    "status": status,
+                    "event": event,
+                    "params": params,
+                    "created_at": created + timedelta(hours=n),
+                })
+            entry["cases"].append({"id": case_id, "doc_ids": doc_ids})
+        manifest_users.append(entry)
+
+    with engine.begin() as conn:
+        for model, rows in (
+            (Benefit, benefit_rows),
+            (User, user_rows),
+            (Case, case_rows),
+            (CaseDocument, doc_rows),
+            (CaseHistory, history_rows),
+        ):
+            for chunk in _chunks(rows):
+                conn.execute(insert(model), chunk)
+            if conn.dialect.name == "postgresql" and rows:
+                # id задані явно — зсуваємо послідовність, інакше нові вставки API впадуть
+                table = model.__tablename__
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+
+    db = SessionLocal()
+    try:
+        case_stats.rebuild(db)
+    finally:
+        db.close()
+    case_search.ensure_index(engine)
+
+    manifest = {
+        "db_url": db_url,
+        "seed": seed,
+        "password": BENCH_PASSWORD,
+        "counts": {
+            "users": len(user_rows),
+            "benefits": len(benefit_rows),
+            "cases": len(case_rows),
+            "documents": len(doc_rows),
+            "history": len(history_rows),
+        },
+        "users": manifest_users,
+    }
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    manifest["seconds"] = round(time.perf_counter() - started, 2)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic data for benchmarks (DROPS all tables in --db)")
+    parser.add_argument("--db", default=f"sqlite:///{OUT_DIR / 'bench.db'}")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--benefits", type=int, default=20)
+    parser.add_argument("--cases-per-user", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", type=Path, default=OUT_DIR / "manifest.json")
+    args = parser.parse_args()
+
+    if args.db.startswith("sqlite:///"):
+        Path(args.db.removeprefix("sqlite:///")).parent.mkdir(parents=True, exist_ok=True)
+
+    m = generate(args.db, args.users, args.benefits, args.cases_per_user, args.seed, args.manifest)
+    print(f"generated in {m['seconds']}s: {m['counts']} -> {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
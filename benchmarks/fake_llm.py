@@ -0,0 +1,46 @@
+"""
+Фейковий LLM-провайдер: підміняє клієнт OpenAI в app.services.ai_client.
+
+generate_text лишається справжнім (з метриками й спанами), а "мережевий" виклик
+спить задану затримку і повертає заяву у форматі [TO]/[FROM]/[BODY]/[ATTACHMENTS],
+яку розбирає pdf_service.
+"""
+import os
+import random
+import time
+from types import SimpleNamespace
+
+FAKE_APPLICATION = (
+    "[TO]\nДо управління соціального захисту населення\n"
+    "[FROM]\nВід ветерана, учасника бойових дій\n"
+    "[BODY]\n" + ("Прошу надати передбачену законодавством соціальну гарантію. " * 12).strip() + "\n"
+    "[ATTACHMENTS]\n- Паспорт\n- ІПН\n- Посвідчення УБД\n- Реквізити IBAN\n"
+)
+
+
+class FakeResponses:
+    def __init__(self, latency: float, jitter: float):
+        self._latency = latency
+        self._jitter = jitter
+
+    def create(self, model: str, input: str, **kwargs):
+        delay = self._latency + random.uniform(-self._jitter, self._jitter)
+        time.sleep(max(0.0, delay))
+        return SimpleNamespace(output_text=FAKE_APPLICATION)
+
+
+class FakeOpenAI:
+    latency = 0.3
+    jitter = 0.05
+
+    def __init__(self, api_key: str | None = None, **kwargs):
+        self.responses = FakeResponses(self.latency, self.jitter)
+
+
+def install(latency_ms: int = 300, jitter_ms: int = 50) -> None:
+    from app.services import ai_client
+
+    FakeOpenAI.latency = latency_ms / 1000
+    FakeOpenAI.jitter = jitter_ms / 1000
+    os.environ.setdefault("OPENAI_API_KEY", "fake-benchmark-key")
+    ai_client.OpenAI = FakeOpenAI
@@ -0,0 +1,278 @@
+"""
+Сценарії навантаження на живий сервер (див. benchmarks.serve).
+
+Сценарії:
+- login      — POST /auth/login;
+- case_page  — сторінка справи як у фронтенді: справа, документи, історія, артефакти паралельно;
+- upload     — завантаження PNG у документ справи;
+- ask        — POST /ai/ask (фейковий LLM);
+- pdf        — POST /cases/{id}/application/pdf (LLM + ReportLab);
+- mix        — зважена суміш усіх вище.
+
+Кожен віртуальний користувач — окремий потік із власним httpx.Client. Звіт (JSON)
+містить перцентилі латентності й пропускну здатність по кожному кроку, а також коміт,
+параметри прогону і розмір даних, щоб звіти з різних комітів можна було порівнювати
+(benchmarks.compare).
+
+    python -m benchmarks.load --scenario mix --concurrency 16 --duration 30
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stats import format_table, summarize
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64  # ~16 KB
+QUESTIONS = [
+    "Які пільги на комунальні послуги для учасника бойових дій?",
+    "Як отримати земельну ділянку ветерану?",
+    "Які документи потрібні для одноразової допомоги?",
+    "Чи є безоплатний проїзд для членів сімʼї загиблого?",
+]
+MIX_WEIGHTS = {"case_page": 60, "login": 10, "upload": 15, "ask": 10, "pdf": 5}
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.error_samples: dict[str, str] = {}
+
+    def record(self, step: str, seconds: float, ok: bool, detail: str = "") -> None:
+        with self._lock:
+            if ok:
+                self.latencies[step].append(seconds)
+            else:
+                self.errors[step] += 1
+                self.error_samples.setdefault(step, detail[:200])
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, manifest: dict, recorder: Recorder, rnd: random.Random):
+        self.client = httpx.Client(base_url=base_url, timeout=60.0)
+        self.manifest = manifest
+        self.recorder = recorder
+        self.rnd = rnd
+        self.fanout = ThreadPoolExecutor(max_workers=4)
+        self.tokens: dict[str, str] = {}
+
+    def close(self) -> None:
+        self.client.close()
+        self.fanout.shutdown(wait=False)
+
+    def request(self, step: str, method: str, url: str, token: str | None = None, **kwargs) -> httpx.Response | None:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        try:
+            r = self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(step, time.perf_counter() - started, False, repr(e))
+            return None
+        ok = r.status_code < 400
+        self.recorder.record(step, time.perf_counter() - started, ok, f"{r.status_code} {r.text}")
+        return r
+
+    def pick_user(self) -> dict:
+        return self.rnd.choice(self.manifest["users"])
+
+    def login(self, user: dict) -> str | None:
+        r = self.request(
+            "login", "POST", "/auth/login",
+            json={"email": user["email"], "password": self.manifest["password"]},
+        )
+        if r is None or r.status_code != 200:
+            return None
+        token = r.json()["access_token"]
+        self.tokens[user["email"]] = token
+        return token
+
+    def token_for(self, user: dict) -> str | None:
+        return self.tokens.get(user["email"]) or self.login(user)
+
+    # =======================
+    # СЦЕНАРІЇ
+    # =======================
+    def scenario_login(self) -> None:
+        self.login(self.pick_user())
+
+    def scenario_case_page(self) -> None:
+        user = self.pick_user()
+        token = self.token_for(user)
+        if not token or not user["cases"]:
+            return
+        case_id = self.rnd.choice(user["cases"])["id"]
+        started = time.perf_counter()
+        futures = [
+            self.fanout.submit(self.request, f"case_page:{name}", "GET", url, token)
+            for name, url in (
+                ("case", f"/cases/{case_id}"),
+                ("documents", f"/cases/{case_id}/documents"),
+                ("history", f"/cases/{case_id}/history"),
+                ("artifacts", f"/cases/{case_id}/artifacts"),
+            )
+        ]
+        responses = [f.result() for f in futures]
+        ok = all(r is not None and r.status_code < 400 for r in responses)
+        self.recorder.record("case_page", time.perf_counter() - started, ok, "fan-out request failed")
+
+    def scenario_upload(self) -> None:
+        user = self.pick_user()
+        token = self.token_for(user)
+        cases = [c for c in user["cases"] if c["doc_ids"]]
+        if not token or not cases:
+            return
+        case = self.rnd.choice(cases)
+        doc_id = self.rnd.choice(case["doc_ids"])
+        self.request(
+            "upload", "POST", f"/cases/{case['id']}/documents/{doc_id}/upload", token,
+            files={"file": ("scan.png", PNG, "image/png")},
+        )
+
+    def scenario_ask(self) -> None:
+        user = self.pick_user()
+        token = self.token_for(user)
+        if token:
+            self.request("ask", "POST", "/ai/ask", token, json={"question": self.rnd.choice(QUESTIONS)})
+
+    def scenario_pdf(self) -> None:
+        user = self.pick_user()
+        token = self.token_for(user)
+        if token and user["cases"]:
+            case_id = self.rnd.choice(user["cases"])["id"]
+            self.request("pdf", "POST", f"/cases/{case_id}/application/pdf", token)
+
+    def scenario_mix(self) -> None:
+        names, weights = zip(*MIX_WEIGHTS.items())
+        getattr(self, f"scenario_{self.rnd.choices(names, weights)[0]}")()
+
+
+SCENARIOS = ["login", "case_page", "upload", "ask", "pdf", "mix"]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(base_url: str, manifest: dict, scenario: str, concurrency: int, duration: float,
+        iterations: int | None, warmup: float, seed: int) -> dict:
+    recorder = Recorder()
+    stop_at = [0.0]
+    counters = {"done": 0}
+    lock = threading.Lock()
+
+    def worker(n: int) -> None:
+        vu = VirtualUser(base_url, manifest, recorder, random.Random(seed + n))
+        fn = getattr(vu, f"scenario_{scenario}")
+        try:
+            while time.perf_counter() < stop_at[0]:
+                if iterations is not None:
+                    with lock:
+                        if counters["done"] >= iterations:
+                            break
+                        counters["done"] += 1
+                fn()
+        finally:
+            vu.close()
+
+    if warmup > 0:
+        # прогрів (імпорти, пул з'єднань, кеші) — не входить у звіт
+        warm = Recorder()
+        vu = VirtualUser(base_url, manifest, warm, random.Random(seed - 1))
+        fn = getattr(vu, f"scenario_{scenario}")
+        until = time.perf_counter() + warmup
+        while time.perf_counter() < until:
+            fn()
+        vu.close()
+
+    started = time.perf_counter()
+    stop_at[0] = started + duration
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    steps = {
+        step: summarize(recorder.latencies.get(step, []), recorder.errors.get(step, 0), elapsed)
+        for step in sorted(set(recorder.latencies) | set(recorder.errors))
+    }
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "base_url": base_url,
+            "scenario": scenario,
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "iterations": iterations,
+            "warmup_s": warmup,
+            "seed": seed,
+        },
+        "data": manifest.get("counts", {}),
+        "elapsed_s": round(elapsed, 3),
+        "steps": steps,
+        "error_samples": dict(recorder.error_samples),
+    }
+
+
+def print_report(report: dict) -> None:
+    rows = [
+        [step, s["count"], s["errors"], s["rps"], s["p50_ms"], s["p90_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]]
+        for step, s in report["steps"].items()
+    ]
+    print(f"commit {report['commit']}  scenario={report['params']['scenario']}  "
+          f"concurrency={report['params']['concurrency']}  elapsed={report['elapsed_s']}s")
+    print(format_table(rows, ["step", "count", "errors", "rps", "p50", "p90", "p95", "p99", "max"]))
+    for step, sample in report["error_samples"].items():
+        print(f"! {step}: {sample}")
+
+
+def main() -> None:
+    from benchmarks.datagen import OUT_DIR
+
+    parser = argparse.ArgumentParser(description="Load scenarios against a running API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--manifest", type=Path, default=OUT_DIR / "manifest.json")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mix")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--iterations", type=int, default=None, help="stop after N scenario runs")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds, not reported")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=None, help="JSON report path")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text(encoding="utf-8"))
+    report = run(
+        args.base_url, manifest, args.scenario, args.concurrency, args.duration,
+        args.iterations, args.warmup, args.seed,
+    )
+    print_report(report)
+
+    out = args.out or OUT_DIR / "results" / f"{report['commit']}_{args.scenario}_{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"report: {out}")
+
+
+if __name__ == "__main__":
+    main()
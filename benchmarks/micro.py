@@ -0,0 +1,224 @@
+"""
+Мікробенчмарки "гарячих" функцій з порогом регресії.
+
+Функції: pdf_service._wrap / _parse / application_text_to_pdf_bytes,
+ai.slugify_filename / _build_application_prompt, benefits._to_out,
+cases._recalc_case_status (SQLite у пам'яті). Вхідні дані — українські тексти
+різного розміру.
+
+    python -m benchmarks.micro                       # порівняти з базовою лінією
+    python -m benchmarks.micro --save-baseline       # записати базову лінію
+    python -m benchmarks.micro -k parse --threshold 15
+
+Кожен випадок: timeit.autorange (≥0.2 с на серію), --repeat серій; у звіт іде мінімум
+і медіана часу одного виклику. Регресія — мінімум гірший за базовий більше ніж на
+--threshold відсотків (код виходу 1). Базова лінія залежить від машини: у CI її
+варто знімати на тому ж раннері з базового коміту.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "micro.json"
+
+PARAGRAPH = (
+    "Відповідно до Закону України «Про статус ветеранів війни, гарантії їх соціального захисту» "
+    "прошу надати мені пільгу на оплату житлово-комунальних послуг у розмірі 75 відсотків. "
+    "Я є учасником бойових дій, що підтверджується посвідченням серії АБ № 123456, виданим "
+    "Міністерством у справах ветеранів України. Проживаю за адресою: м. Київ, вул. Хрещатик, 1."
+)
+
+
+def application_text(paragraphs: int, attachments: int) -> str:
+    body = "\n\n".join(PARAGRAPH for _ in range(paragraphs))
+    items = "\n".join(f"- Додаток {i + 1}: копія документа, що підтверджує статус" for i in range(attachments))
+    return (
+        "[TO]\nДо Управління соціального захисту населення\nДарницької районної в місті Києві державної адміністрації\n"
+        "[FROM]\nШевченко Марʼяна Петрівна\nmariana@example.com\nм. Київ\n"
+        f"[BODY]\n{body}\n"
+        f"[ATTACHMENTS]\n{items}\n"
+    )
+
+
+SIZES = {"small": (1, 1), "medium": (4, 4), "large": (30, 12)}
+TITLES = {
+    "short": "Пільги ЖКП",
+    "medium": "Компенсація за житлово-комунальні послуги для учасників бойових дій",
+    "long": "Одноразова грошова допомога членам сімей загиблих (померлих) ветеранів війни — " * 3,
+}
+
+
+def _cases() -> dict:
+    """name -> callable без аргументів. Важкі імпорти й підготовка — тут, поза виміром."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+
+    from app.models.benefit import Benefit
+    from app.models.user import User
+    from app.routers.ai import _build_application_prompt, slugify_filename
+    from app.routers.benefits import _to_out
+    from app.services import pdf_service
+
+    cases = {}
+    texts = {size: application_text(*args) for size, args in SIZES.items()}
+
+    for size, text in texts.items():
+        cases[f"pdf._parse[{size}]"] = lambda t=text: pdf_service._parse(t)
+
+    font_ok = pdf_service.FONT_PATH.exists()
+    if font_ok:
+        pdf_service._ensure_font_registered()
+        c = canvas.Canvas(None, pagesize=A4)
+        width = A4[0] - 36 * mm  # як usable_w у pdf_service
+        for size, text in texts.items():
+            body = pdf_service._parse(text)["body"]
+            cases[f"pdf._wrap[{size}]"] = lambda b=body: pdf_service._wrap(c, b, pdf_service.FONT_NAME, 11, width)
+        for size in ("small", "large"):
+            cases[f"pdf.application_text_to_pdf_bytes[{size}]"] = (
+                lambda t=texts[size]: pdf_service.application_text_to_pdf_bytes(t)
+            )
+    else:
+        print(f"skip pdf._wrap / application_text_to_pdf_bytes: font not found at {pdf_service.FONT_PATH}")
+
+    for name, title in TITLES.items():
+        cases[f"ai.slugify_filename[{name}]"] = lambda t=title: slugify_filename(t)
+
+    user = User(id=1, email="mariana@example.com", full_name="Шевченко Марʼяна Петрівна", region="Київ", status="ubd")
+    for name, extra in (("short", ""), ("long", PARAGRAPH * 5)):
+        benefit = Benefit(
+            id=1, title=TITLES["medium"], category="housing", description=PARAGRAPH,
+            authority="Органи соцзахисту / ЦНАП", required_documents="", eligible_statuses="",
+        )
+        cases[f"ai._build_application_prompt[{name}]"] = (
+            lambda b=benefit, e=extra: _build_application_prompt(user, b, e)
+        )
+
+    for name, docs in (("few", 3), ("many", 40)):
+        benefit = Benefit(
+            id=1, title=TITLES["medium"], category="housing", description=PARAGRAPH,
+            authority="Органи соцзахисту / ЦНАП",
+            required_documents="\n".join(f"Документ {i}: довідка з місця проживання" for i in range(docs)),
+            eligible_statuses="veteran,ubd,family,disabled",
+        )
+        cases[f"benefits._to_out[{name}]"] = lambda b=benefit: _to_out(b)
+
+    cases.update(_recalc_cases())
+    return cases
+
+
+def _recalc_cases() -> dict:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.db.base import Base
+    from app.models import benefit, case, case_artifact, case_document, case_history, user  # noqa: F401
+    from app.models.benefit import Benefit
+    from app.models.case import Case
+    from app.models.case_document import CaseDocument
+    from app.models.user import User
+    from app.routers.cases import _recalc_case_status
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    statuses = ["approved", "uploaded", "required", "rejected"]
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=1, email="u@example.com", password_hash="x"))
+        conn.execute(insert(Benefit).values(id=1, title="b"))
+        for case_id, docs in ((1, 5), (2, 50)):
+            conn.execute(insert(Case).values(id=case_id, user_id=1, benefit_id=1))
+            conn.execute(
+                insert(CaseDocument),
+                [{"case_id": case_id, "title": f"Документ {i}", "status": statuses[i % 4]} for i in range(docs)],
+            )
+    db = sessionmaker(bind=engine, autoflush=False)()
+    return {
+        "cases._recalc_case_status[5 docs]": lambda: _recalc_case_status(db, 1),
+        "cases._recalc_case_status[50 docs]": lambda: _recalc_case_status(db, 2),
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    timer = timeit.Timer(fn)
+    # autorange підбирає кількість викликів на серію ≥0.2 с; далі repeat таких серій
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(runs) * 1e6, 3),
+        "median_us": round(statistics.median(runs) * 1e6, 3),
+        "loops": number,
+    }
+
+
+def _machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def main() -> None:
+    from benchmarks.stats import format_table
+
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for hot pure functions")
+    parser.add_argument("-k", "--filter", default="", help="substring of benchmark name")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown of min time, %%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    cases = {k: v for k, v in _cases().items() if args.filter in k}
+    results = {}
+    for name, fn in cases.items():
+        fn()  # прогрів
+        results[name] = measure(fn, args.repeat)
+
+    if args.save_baseline:
+        baseline = {"machine": _machine(), "results": results}
+        if args.baseline.exists() and args.filter:
+            # часткове оновлення: решту випадків лишаємо як були
+            old = json.loads(args.baseline.read_text(encoding="utf-8"))
+            old["results"].update(results)
+            baseline = {"machine": _machine(), "results": old["results"]}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(format_table(
+            [[n, r["min_us"], r["median_us"], r["loops"]] for n, r in results.items()],
+            ["benchmark", "min µs", "median µs", "loops"],
+        ))
+        print(f"baseline saved: {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else None
+    if baseline and baseline.get("machine") != _machine():
+        print(f"warning: baseline recorded on {baseline.get('machine')}, running on {_machine()}")
+    base_results = (baseline or {}).get("results", {})
+
+    rows, regressions = [], []
+    for name, r in results.items():
+        b = base_results.get(name)
+        delta, flag = "—", ""
+        if b:
+            d = (r["min_us"] - b["min_us"]) / b["min_us"] * 100
+            delta = f"{d:+.1f}%"
+            if d > args.threshold:
+                flag = "REGRESSION"
+                regressions.append(f"{name}: {b['min_us']} → {r['min_us']} µs ({delta})")
+        rows.append([name, r["min_us"], r["median_us"], b["min_us"] if b else "—", delta, flag])
+
+    print(format_table(rows, ["benchmark", "min µs", "median µs", "baseline µs", "Δ min", ""]))
+    if regressions:
+        print(f"\nregressions (> {args.threshold}%):\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
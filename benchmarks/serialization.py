@@ -0,0 +1,191 @@
+"""
+Списки на 10k рядків: ORM + Pydantic + stdlib JSON проти проєкції колонок + orjson.
+
+"orm"  — як FastAPI обробляв ці ендпоінти раніше: повні ORM-об'єкти,
+         валідація response_model (from_attributes), серіалізація і JSONResponse;
+"fast" — справжні хендлери (db.query(*columns) -> dataclass-рядки -> ORJSONResponse).
+
+Для кожного ендпоінта — p50/p99 часу побудови тіла відповіді і пік пам'яті
+(tracemalloc) за один виклик; тіла обох шляхів порівнюються як JSON.
+
+    python -m benchmarks.serialization --rows 10000 --runs 30
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+def _setup(rows: int):
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.db.base import Base
+    from app.models import benefit, case, case_artifact, case_document, case_history, user  # noqa: F401
+    from app.models.benefit import Benefit
+    from app.models.case import Case
+    from app.models.case_document import CaseDocument
+    from app.models import history_event
+    from app.models.case_history import CaseHistory
+    from app.models.user import User
+    from benchmarks.datagen import DOCUMENTS, HISTORY_COMMENTS, LOREM
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    now = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=1, email="admin@example.com", password_hash="x", role="admin"))
+        conn.execute(insert(Benefit), [
+            {
+                "id": i, "title": f"Компенсація за житлово-комунальні послуги ({i})", "category": "housing",
+                "description": LOREM, "authority": "Органи соцзахисту / ЦНАП",
+                "required_documents": "\n".join(DOCUMENTS[:5]), "eligible_statuses": "veteran,ubd,family",
+            }
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Case), [
+            {
+                "id": i, "user_id": 1, "benefit_id": 1 + i % rows, "status": "in_review",
+                "title": f"Компенсація ЖКП — справа {i}", "description": LOREM[:120],
+                "note": "Потрібна консультація", "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(1, rows + 1)
+        ])
+        # документи й історія — у справі 1 (списки по одній справі)
+        conn.execute(insert(CaseDocument), [
+            {"id": i, "case_id": 1, "title": DOCUMENTS[i % len(DOCUMENTS)], "status": "uploaded",
+             "comment": None if i % 2 else "Перевірено", "file_name": f"scan_{i}.png"}
+            for i in range(1, rows + 1)
+        ])
+        events = [history_event.parse(comment, "in_review") for comment in HISTORY_COMMENTS]
+        conn.execute(insert(CaseHistory), [
+            {"id": i, "case_id": 1, "status": "in_review", "event": events[i % len(events)][0],
+             "params": events[i % len(events)][1], "created_at": now + timedelta(seconds=i)}
+            for i in range(1, rows + 1)
+        ])
+    db = sessionmaker(bind=engine, autoflush=False)()
+    return db, db.get(User, 1)
+
+
+def _orm_cases(db, user):
+    """Старі реалізації ендпоінтів + обробка відповіді FastAPI (validate -> serialize -> JSONResponse)."""
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.models.benefit import Benefit
+    from app.models.case import Case
+    from app.models.case_document import CaseDocument
+    from app.models.case_history import CaseHistory
+    from app.routers.benefits import _to_out
+    from app.schemas.benefit import BenefitOut
+    from app.schemas.case import CaseOut
+    from app.schemas.case_document import CaseDocumentOut
+    from app.schemas.case_history import CaseHistoryOut
+
+    def respond(schema, content):
+        adapter = TypeAdapter(list[schema])
+        value = adapter.validate_python(content, from_attributes=True)
+        return JSONResponse(adapter.dump_python(value, mode="json"))
+
+    def list_cases():
+        return respond(CaseOut, db.query(Case).filter(Case.user_id == user.id).order_by(Case.id.desc()).all())
+
+    def admin_list_cases():
+        return respond(CaseOut, db.query(Case).order_by(Case.id.desc()).all())
+
+    def list_documents():
+        docs = db.query(CaseDocument).filter(CaseDocument.case_id == 1).order_by(CaseDocument.id).all()
+        for d in docs:
+            if d.comment is None:
+                d.comment = ""
+        return respond(CaseDocumentOut, docs)
+
+    def case_history():
+        return respond(
+            CaseHistoryOut,
+            db.query(CaseHistory).filter(CaseHistory.case_id == 1).order_by(CaseHistory.created_at.desc()).all(),
+        )
+
+    def list_benefits():
+        return respond(BenefitOut, [_to_out(x) for x in db.query(Benefit).order_by(Benefit.id.desc()).all()])
+
+    return {
+        "list_cases": list_cases,
+        "admin_list_cases": admin_list_cases,
+        "list_documents": list_documents,
+        "case_history": case_history,
+        "list_benefits": list_benefits,
+    }
+
+
+def _fast_cases(db, user):
+    from app.routers import admin, benefits, cases
+
+    return {
+        "list_cases": lambda: cases.list_cases(with_progress=False, db=db, current_user=user),
+        "admin_list_cases": lambda: admin.admin_list_cases(db=db, current_user=user),
+        "list_documents": lambda: cases.list_documents(case_id=1, db=db, current_user=user),
+        "case_history": lambda: cases.case_history(case_id=1, db=db, current_user=user),
+        "list_benefits": lambda: benefits.list_benefits(db=db),
+    }
+
+
+def measure(fn, db, runs: int) -> dict:
+    from benchmarks.stats import percentile
+
+    times = []
+    for _ in range(runs):
+        db.expunge_all()  # без identity map з попереднього прогону, як у новій сесії запиту
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    times.sort()
+
+    db.expunge_all()
+    tracemalloc.start()
+    body = fn().body
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(percentile(times, 50) * 1000, 2),
+        "p99_ms": round(percentile(times, 99) * 1000, 2),
+        "peak_mib": round(peak / 2**20, 2),
+        "body": body,
+    }
+
+
+def main() -> None:
+    from benchmarks.stats import format_table
+
+    parser = argparse.ArgumentParser(description="List endpoint serialization: ORM+Pydantic vs projection+orjson")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    db, user = _setup(args.rows)
+    orm, fast = _orm_cases(db, user), _fast_cases(db, user)
+
+    rows = []
+    for name in orm:
+        for fn in (orm[name], fast[name]):
+            db.expunge_all()
+            fn()  # прогрів
+        o = measure(orm[name], db, args.runs)
+        f = measure(fast[name], db, args.runs)
+        same = json.loads(o["body"]) == json.loads(f["body"])
+        rows.append([
+            name, o["p50_ms"], f["p50_ms"], o["p99_ms"], f["p99_ms"], o["peak_mib"], f["peak_mib"],
+            f"{o['p50_ms'] / f['p50_ms']:.1f}x" if f["p50_ms"] else "—",
+            "yes" if same else "NO",
+        ])
+
+    print(f"{args.rows} rows, {args.runs} runs")
+    print(format_table(rows, [
+        "endpoint", "orm p50", "fast p50", "orm p99", "fast p99", "orm MiB", "fast MiB", "speedup", "same JSON",
+    ]))
+
+
+if __name__ == "__main__":
+    main()
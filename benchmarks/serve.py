@@ -0,0 +1,53 @@
+"""
+Запуск API для бенчмарків: БД з datagen + фейковий LLM.
+
+    python -m benchmarks.serve --db sqlite:///./benchmarks/out/bench.db --llm-latency-ms 300 --workers 2
+
+Налаштування передаються через змінні оточення, тож кожен воркер uvicorn
+(factory create_app) ставить фейковий LLM у себе.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def create_app():
+    from benchmarks import fake_llm
+
+    fake_llm.install(
+        latency_ms=int(os.environ.get("BENCH_LLM_LATENCY_MS", "300")),
+        jitter_ms=int(os.environ.get("BENCH_LLM_JITTER_MS", "50")),
+    )
+    from app.main import app
+
+    return app
+
+
+def main() -> None:
+    from benchmarks.datagen import OUT_DIR
+
+    parser = argparse.ArgumentParser(description="Run the API against benchmark data with a fake LLM")
+    parser.add_argument("--db", default=f"sqlite:///{OUT_DIR / 'bench.db'}")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=int, default=300)
+    parser.add_argument("--llm-jitter-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.db
+    os.environ["BENCH_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["BENCH_LLM_JITTER_MS"] = str(args.llm_jitter_ms)
+    uvicorn.run(
+        "benchmarks.serve:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Час старту воркера: холодний імпорт app.main і час до першої відповіді.
+
+- import — окремий процес python, `import app.main` (без звернень до БД);
+- first request — процес uvicorn з app.main:app від запуску до першої 200 на GET /,
+  плюс латентність першого запиту до БД (GET /benefits) у щойно запущеному воркері.
+
+Кожен вимір — новий процес (--runs разів), у звіті мінімум / p50 / p95.
+--importtime показує найважчі пакети з `python -X importtime`.
+
+    python -m benchmarks.startup --runs 10 --importtime
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stats import format_table, percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _env(db_url: str) -> dict:
+    return {**os.environ, "DATABASE_URL": db_url, "PYTHONPATH": str(ROOT)}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(db_url: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=_env(db_url), cwd=ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(db_url: str, timeout: float = 60.0) -> tuple[float, float]:
+    """(секунд від запуску процесу до першої 200 на /, латентність першого GET /benefits)."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(db_url), cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10.0) as client:
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError("worker did not answer in time")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready = time.perf_counter() - started
+
+            t = time.perf_counter()
+            client.get("/benefits").raise_for_status()
+            first_db = time.perf_counter() - t
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return ready, first_db
+
+
+def heaviest_imports(db_url: str, top: int) -> list[list]:
+    """Пакети верхнього рівня з найбільшим сумарним часом імпорту (мс)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], env=_env(db_url), cwd=ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    totals: dict[str, int] = {}
+    for line in out.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if not m:
+            continue
+        cumulative, name = int(m.group(1)), m.group(3)
+        if "." not in name:
+            totals[name] = max(totals.get(name, 0), cumulative)
+    ranked = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [[name, round(us / 1000, 1)] for name, us in ranked]
+
+
+def _row(name: str, values: list[float]) -> list:
+    values = sorted(values)
+    ms = lambda v: round(v * 1000, 1)  # noqa: E731
+    return [name, len(values), ms(values[0]), ms(percentile(values, 50)), ms(percentile(values, 95))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker startup: cold import and time to first request")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", action="store_true", help="show the heaviest imported packages")
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp) / 'startup.db'}"
+        # схема і стартові дані — як у розгортанні, окремою командою
+        subprocess.run([sys.executable, "manage.py", "setup"], env=_env(db_url), cwd=ROOT,
+                       check=True, stdout=subprocess.DEVNULL)
+
+        imports = [measure_import(db_url) for _ in range(args.runs)]
+        ready, first_db = zip(*(measure_first_request(db_url) for _ in range(args.runs)))
+
+        print(format_table(
+            [
+                _row("import app.main", imports),
+                _row("spawn → first 200 on /", list(ready)),
+                _row("first GET /benefits", list(first_db)),
+            ],
+            ["measure", "runs", "min ms", "p50 ms", "p95 ms"],
+        ))
+        if args.importtime:
+            print()
+            print(format_table(heaviest_imports(db_url, args.top), ["package", "cumulative ms"]))
+
+
+if __name__ == "__main__":
+    main()
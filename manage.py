@@ -0,0 +1,98 @@
+"""
+Службові команди (не виконуються при старті застосунку).
+
+    python manage.py init-db     # таблиці + повнотекстовий індекс справ + міграції
+    python manage.py migrate     # незастосовані міграції (app/db/migrations)
+    python manage.py migrate --status
+    python manage.py seed        # стартові гарантії, якщо таблиця порожня
+    python manage.py setup       # init-db + seed (нове середовище)
+    python manage.py archive     # перенести закриті справи в архів зараз (без чекання воркера)
+    python manage.py rebuild-stats  # повний перерахунок case_stats (після імпорту даних / ручних правок БД)
+
+БД — з DATABASE_URL, як і в застосунку.
+"""
+import argparse
+import logging
+
+from app.db import migrations
+from app.db.init_db import create_schema, seed_benefits
+from app.db.session import SessionLocal, engine
+
+
+def init_db() -> None:
+    create_schema(engine)
+    migrate()
+
+
+def migrate() -> None:
+    applied = migrations.upgrade(engine)
+    for m in applied:
+        print(f"applied {m.version:04d} {m.name}")
+    print(
+        f"OK: schema version {migrations.current_version(engine)} "
+        f"({engine.url.render_as_string(hide_password=True)})"
+    )
+
+
+def migrate_status() -> None:
+    print(f"current version: {migrations.current_version(engine)}")
+    waiting = migrations.pending(engine)
+    for m in waiting:
+        print(f"pending {m.version:04d} {m.name}")
+    if not waiting:
+        print("OK: no pending migrations")
+
+
+def seed() -> None:
+    db = SessionLocal()
+    try:
+        added = seed_benefits(db)
+    finally:
+        db.close()
+    print(f"OK: {added} benefits added" if added else "OK: benefits already present, nothing to seed")
+
+
+def archive() -> None:
+    from app.services import case_archive
+
+    moved = case_archive.archive_all(engine)
+    print(f"OK: {moved} closed cases archived")
+
+
+def rebuild_stats() -> None:
+    from app.services import case_stats
+
+    db = SessionLocal()
+    try:
+        groups = case_stats.rebuild(db)
+    finally:
+        db.close()
+    print(f"OK: case_stats rebuilt, {groups} groups")
+
+
+COMMANDS = {
+    "init-db": [init_db],
+    "migrate": [migrate],
+    "seed": [seed],
+    "setup": [init_db, seed],
+    "archive": [archive],
+    "rebuild-stats": [rebuild_stats],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Veteran Aid management commands")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--status", action="store_true", help="migrate: show pending migrations only")
+    args = parser.parse_args()
+    # прогрес міграцій і backfill — у лог
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if args.command == "migrate" and args.status:
+        migrate_status()
+        return
+    for fn in COMMANDS[args.command]:
+        fn()
+
+
+if __name__ == "__main__":
+    main()
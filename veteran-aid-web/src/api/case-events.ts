@@ -0,0 +1,28 @@
+import { http } from "@/api/http";
+
+export type CaseEventTopic = "case" | "documents" | "history" | "progress" | "artifacts";
+
+export type CaseEvent = {
+  case_id: number;
+  user_id: number | null;
+  status: string | null;
+  topics: CaseEventTopic[];
+  ts: number;
+};
+
+// EventSource не вміє слати заголовки, тому токен іде в query (?token=)
+export function subscribeCaseEvents(token: string, onEvent: (e: CaseEvent) => void): () => void {
+  const base = http.defaults.baseURL ?? "";
+  const url = `${base}/events/cases?token=${encodeURIComponent(token)}`;
+  const source = new EventSource(url);
+
+  source.addEventListener("case", (msg) => {
+    try {
+      onEvent(JSON.parse((msg as MessageEvent<string>).data) as CaseEvent);
+    } catch {
+      // пошкоджена подія — ігноруємо
+    }
+  });
+
+  return () => source.close();
+}
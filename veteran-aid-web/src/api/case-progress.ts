@@ -16,3 +16,11 @@ export async function fetchCaseProgress(caseId: number): Promise<CaseProgress> {
   const res = await http.get<CaseProgress>(`/cases/${caseId}/progress`);
   return res.data;
 }
+
+export async function fetchCasesProgress(caseIds: number[]): Promise<CaseProgress[]> {
+  if (caseIds.length === 0) return [];
+  const res = await http.get<CaseProgress[]>("/cases/progress", {
+    params: { ids: caseIds.join(",") },
+  });
+  return res.data;
+}
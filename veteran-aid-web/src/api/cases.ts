@@ -12,7 +12,10 @@ export type CaseItem = {
 };
 
 export async function fetchCases(): Promise<CaseItem[]> {
-  const res = await http.get<CaseItem[]>("/cases");
+  // закриті справи бекенд переносить в архів — без include_archived вони б зникли зі списку
+  const res = await http.get<CaseItem[]>("/cases", {
+    params: { include_archived: true },
+  });
   return res.data;
 }
 
@@ -2,14 +2,21 @@
 
 import { QueryClient, QueryClientProvider } from "@tanstack/react-query";
 import { AuthProvider } from "@/auth/auth-context";
+import CaseEventsListener from "@/components/CaseEventsListener";
 import { useState } from "react";
 
 export default function Providers({ children }: { children: React.ReactNode }) {
-  const [queryClient] = useState(() => new QueryClient());
+  // зміни справ приходять через SSE, тож не перезапитуємо все при фокусі вікна
+  const [queryClient] = useState(
+    () => new QueryClient({ defaultOptions: { queries: { refetchOnWindowFocus: false } } })
+  );
 
   return (
     <QueryClientProvider client={queryClient}>
-      <AuthProvider>{children}</AuthProvider>
+      <AuthProvider>
+        <CaseEventsListener />
+        {children}
+      </AuthProvider>
     </QueryClientProvider>
   );
 }
@@ -0,0 +1,36 @@
+"use client";
+
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { useAuth } from "@/auth/useAuth";
+import { subscribeCaseEvents } from "@/api/case-events";
+
+// Слухає стрічку змін справ і інвалідовує лише ті запити, яких стосується подія
+export default function CaseEventsListener() {
+  const { token } = useAuth();
+  const qc = useQueryClient();
+
+  useEffect(() => {
+    if (!token) return;
+
+    return subscribeCaseEvents(token, (e) => {
+      const id = e.case_id;
+      for (const topic of e.topics) {
+        if (topic === "case") {
+          qc.invalidateQueries({ queryKey: ["case", id] });
+          qc.invalidateQueries({ queryKey: ["cases"] });
+        } else if (topic === "documents") {
+          qc.invalidateQueries({ queryKey: ["case-documents", id] });
+        } else if (topic === "history") {
+          qc.invalidateQueries({ queryKey: ["case-history", id] });
+        } else if (topic === "progress") {
+          qc.invalidateQueries({ queryKey: ["case-progress", id] });
+        } else if (topic === "artifacts") {
+          qc.invalidateQueries({ queryKey: ["case-artifacts", id] });
+        }
+      }
+    });
+  }, [token, qc]);
+
+  return null;
+}